@@ -0,0 +1,71 @@
+"""
+Benchmark: SVC vs approximate-kernel backends (Nystroem, random Fourier
+features) on the bundled CSV replicated to larger sizes. Reports training
+time, single-row inference latency and held-out AUC. Replicated rows get a
+little multiplicative jitter so they are not exact duplicates; SVC is
+skipped above --svc-max-rows because its training time explodes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.config import DATA_FILE
+from src.evaluation import evaluate_artifact, roc_from_metrics
+from src.model_registry import train_model
+from src.predictor import predict_risk
+
+NUMERIC = ["Age", "Total_Bilirubin", "Direct_Bilirubin", "Alkaline_Phosphotase", "Alamine_Aminotransferase",
+           "Aspartate_Aminotransferase", "Total_Protiens", "Albumin", "Albumin_and_Globulin_Ratio"]
+
+def replicate_csv(rows: int, path: str, seed: int = 0):
+    df = pd.read_csv(DATA_FILE)
+    big = df.sample(n=rows, replace=True, random_state=seed).reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    cols = [c for c in NUMERIC if c in big.columns]
+    big[cols] = (big[cols] * rng.normal(1.0, 0.03, size=(rows, len(cols)))).round(2)
+    big.to_csv(path, index=False)
+
+def single_row_latency(model, X, repeats: int = 300) -> float:
+    start = time.perf_counter()
+    for i in range(repeats):
+        predict_risk(model, X[i % len(X):i % len(X) + 1])
+    return (time.perf_counter() - start) / repeats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", nargs="+", type=int, default=[5_000, 50_000, 200_000])
+    parser.add_argument("--backends", nargs="+", default=["svc", "nystroem", "rff"])
+    parser.add_argument("--svc-max-rows", type=int, default=50_000)
+    parser.add_argument("--n-components", type=int, default=300)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore", FutureWarning)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"liver_{rows}.csv")
+            replicate_csv(rows, path)
+            for backend in args.backends:
+                if backend == "svc" and rows > args.svc_max_rows:
+                    print(f"{rows:>9,} rows | {backend:>8}: skipped (> --svc-max-rows)")
+                    continue
+                start = time.perf_counter()
+                artifact = train_model(path, {"backend": backend, "n_components": args.n_components})
+                train_s = time.perf_counter() - start
+                latency = single_row_latency(artifact["model"], artifact["X_test"])
+                auc = roc_from_metrics(evaluate_artifact(artifact))[2]
+                extra = f" ({len(artifact['model'].support_):,} SVs)" if backend == "svc" else ""
+                print(f"{rows:>9,} rows | {backend:>8}: train {train_s:8.2f}s | "
+                      f"{latency * 1e6:8.1f} us/row | AUC {auc:.4f}{extra}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: row-by-row get_warnings() vs columnar rule_flags()/evaluate_rules().
+
+Replicates data/indian_liver_patient.csv up to --rows rows (default 1M),
+checks both paths agree and prints the speedup.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.clinical_rules import evaluate_rules, get_warnings, rule_flags
+from src.data_loader import load_data
+
+def replicate(df: pd.DataFrame, rows: int) -> pd.DataFrame:
+    reps = -(-rows // len(df))
+    return pd.concat([df] * reps, ignore_index=True).head(rows)
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    df = replicate(load_data(), args.rows)
+    records = df.to_dict("records")
+    print(f"Rows: {len(df):,}")
+
+    scalar, scalar_s = _timed(lambda: [get_warnings(r) for r in records])
+    _, flags_s = _timed(rule_flags, df)
+    (_, vectorized), vector_s = _timed(evaluate_rules, df)
+
+    assert scalar == vectorized, "evaluate_rules disagrees with get_warnings"
+    print(f"get_warnings loop : {scalar_s:8.3f}s ({len(df) / scalar_s:,.0f} rows/sec)")
+    print(f"rule_flags        : {flags_s:8.3f}s ({scalar_s / flags_s:.0f}x)")
+    print(f"evaluate_rules    : {vector_s:8.3f}s ({scalar_s / vector_s:.0f}x, incl. per-row message lists)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: per-row db.insert_patient() vs PatientStore.insert_many().
+
+Each run uses a fresh database in a temporary directory.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.db import PatientStore, create_db, insert_patient
+
+def sample_records(n: int):
+    return [{
+        "name": f"Patient {i}",
+        "disease_prob": "42.0%",
+        "risk_label": "High Risk" if i % 3 == 0 else "Low Risk",
+        "age": 20 + i % 60,
+        "gender": i % 2,
+        "total_bilirubin": 0.9,
+        "direct_bilirubin": 0.2,
+        "alkaline_phosphotase": 180,
+        "alamine_aminotransferase": 30,
+        "aspartate_aminotransferase": 35,
+        "total_protiens": 6.8,
+        "albumin": 3.4,
+        "ag_ratio": 1.0,
+    } for i in range(n)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000, help="rows for the per-row baseline")
+    parser.add_argument("--batch-rows", type=int, default=100_000, help="rows for insert_many")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = create_db(os.path.join(tmp, "per_row.db"))
+        records = sample_records(args.rows)
+        start = time.perf_counter()
+        for r in records:
+            insert_patient(r, db_path=db)
+        per_row = args.rows / (time.perf_counter() - start)
+
+        db = create_db(os.path.join(tmp, "batched.db"))
+        records = sample_records(args.batch_rows)
+        with PatientStore(db) as store:
+            start = time.perf_counter()
+            store.insert_many(records)
+            batched = args.batch_rows / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            streamed = sum(1 for _ in store.iter_patients(batch_size=1000))
+            read = streamed / (time.perf_counter() - start)
+
+    print(f"insert_patient (per row)  : {per_row:12,.0f} inserts/sec")
+    print(f"PatientStore.insert_many  : {batched:12,.0f} inserts/sec ({batched / per_row:.0f}x)")
+    print(f"PatientStore.iter_patients: {read:12,.0f} rows/sec")
+
+if __name__ == "__main__":
+    main()
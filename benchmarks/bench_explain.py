@@ -0,0 +1,89 @@
+"""
+Benchmark: per-patient feature attributions (explain.Explainer) against the
+predict path they sit next to in the app (predictor.predict_risk through the
+scaler, and the NumPy export svm_kernel.KernelSVM), and against computing the
+same Shapley values model-agnostically - scoring every coalition of features
+against every background row with the SVC, as a generic explainer would.
+Also reports batch throughput and the one-off build cost at training time.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+def latencies_ms(fn, rows, repeats: int) -> np.ndarray:
+    out = []
+    for i in range(repeats):
+        row = rows[i % len(rows):i % len(rows) + 1]
+        start = time.perf_counter()
+        fn(row)
+        out.append((time.perf_counter() - start) * 1e3)
+    return np.array(out)
+
+def model_agnostic_shapley(model, explainer, x_scaled: np.ndarray) -> np.ndarray:
+    """Interventional Shapley values with the SVC scoring 2^d x n_background hybrid rows."""
+    masks, weights = explainer.masks, explainer.weights
+    background = explainer.background
+    hybrid = np.where(masks[:, None, :] > 0, x_scaled[None, None, :], background[None, :, :])
+    values = model.decision_function(hybrid.reshape(-1, len(x_scaled))).reshape(len(masks), -1).mean(axis=1)
+    return values @ weights.T
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=300)
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    parser.add_argument("--agnostic-repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore", FutureWarning)
+
+    from src.explain import build_explainer
+    from src.model_registry import load_or_train
+    from src.predictor import predict_risk
+    from src.svm_kernel import export_kernel, load_kernel
+
+    artifact = load_or_train()
+    model, scaler = artifact["model"], artifact["scaler"]
+    start = time.perf_counter()
+    explainer = build_explainer(artifact)
+    build_s = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        kernel = load_kernel(export_kernel(artifact, os.path.join(tmp, "kernel.npz")))
+        size_kib = Path(explainer.save(os.path.join(tmp, "explain.npz"))).stat().st_size / 1024
+    print(f"Support vectors: {len(model.support_vectors_)} | background rows: {len(explainer.background)} | "
+          f"method: {explainer.method} | build {build_s * 1000:.0f} ms | stored {size_kib:.0f} KiB")
+
+    X_raw = scaler.inverse_transform(artifact["X_test"])
+    runs = {
+        "predict (sklearn)": lambda row: predict_risk(model, scaler.transform(row)),
+        "predict (numpy kernel)": kernel.predict_risk,
+        "explain (cached factors)": explainer.explain,
+    }
+    for name, fn in runs.items():
+        ms = latencies_ms(fn, X_raw, args.repeats)
+        print(f"{name:>28}: p50 {np.percentile(ms, 50):8.2f} ms | p99 {np.percentile(ms, 99):8.2f} ms")
+
+    agnostic = latencies_ms(lambda row: model_agnostic_shapley(model, explainer, scaler.transform(row)[0]),
+                            X_raw, args.agnostic_repeats)
+    print(f"{'explain (model-agnostic)':>28}: p50 {np.percentile(agnostic, 50):8.2f} ms "
+          f"({len(explainer.masks) * len(explainer.background):,} SVC rows per patient)")
+    expected = model_agnostic_shapley(model, explainer, artifact["X_test"][0])
+    got = explainer.explain(X_raw[:1])["contributions"][0]
+    print(f"{'':>28}  max |difference| to the cached-factor values: {np.abs(expected - got).max():.3g} "
+          f"(features treated as independent in the cache)")
+
+    batch = np.resize(X_raw, (args.batch_rows, X_raw.shape[1]))
+    start = time.perf_counter()
+    explainer.explain(batch)
+    batch_s = time.perf_counter() - start
+    print(f"{f'batch of {len(batch)}':>28}: {len(batch) / batch_s:10,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
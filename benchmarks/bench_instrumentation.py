@@ -0,0 +1,48 @@
+"""
+Benchmark: per-call overhead of instrumentation.timed as a decorator and as a
+context manager, disabled vs enabled, against an uninstrumented call.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import instrumentation
+from src.instrumentation import timed
+
+def noop():
+    return None
+
+decorated = timed("bench.decorated")(noop)
+
+def block():
+    with timed("bench.block"):
+        return None
+
+def ns_per_call(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    base = ns_per_call(noop, args.calls)
+    print(f"{'plain call':>28}: {base:7.1f} ns")
+    for enabled in (False, True):
+        instrumentation.enable() if enabled else instrumentation.disable()
+        state = "enabled" if enabled else "disabled"
+        for name, fn in (("decorator", decorated), ("context manager", block)):
+            t = ns_per_call(fn, args.calls)
+            print(f"{name + ' (' + state + ')':>28}: {t:7.1f} ns (+{t - base:.1f} ns)")
+    print("p50/p99 recorded:", {k: (f"{v['p50_s'] * 1e9:.0f} ns", f"{v['p99_s'] * 1e9:.0f} ns")
+                                for k, v in instrumentation.snapshot()["stages"].items()})
+
+if __name__ == "__main__":
+    main()
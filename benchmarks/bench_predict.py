@@ -0,0 +1,41 @@
+"""
+Benchmark: predict_proba + predict (two kernel passes) vs predictor.predict_risk
+(one pass), for single-row requests and for the held-out test set.
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.model_registry import load_or_train
+from src.predictor import predict_risk
+
+def per_call(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=500)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore", FutureWarning)
+
+    artifact = load_or_train()
+    model, X = artifact["model"], artifact["X_test"]
+    print(f"Support vectors: {len(model.support_)}")
+
+    for name, rows, repeats in (("single row", X[:1], args.repeats), (f"batch of {len(X)}", X, max(args.repeats // 50, 5))):
+        two_pass = per_call(lambda: (model.predict_proba(rows)[:, 1], model.predict(rows)), repeats)
+        one_pass = per_call(lambda: predict_risk(model, rows), repeats)
+        print(f"{name:>16}: predict_proba+predict {two_pass * 1000:8.3f} ms | "
+              f"predict_risk {one_pass * 1000:8.3f} ms | saved {(two_pass - one_pass) * 1000:.3f} ms "
+              f"({two_pass / one_pass:.1f}x)")
+
+if __name__ == "__main__":
+    main()
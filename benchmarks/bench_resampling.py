@@ -0,0 +1,103 @@
+"""
+Benchmark: retraining as labelled patients accumulate in the DB.
+Starts from the bundled CSV's rows plus --history labelled patients already
+in the DB, then repeatedly inserts a batch of labelled patients, pulls only the new ones (labelled_training_data with a
+watermark) and compares full SMOTE over everything against
+IncrementalSMOTE.partial_fit_resample; the model is then refitted on the
+resampled set either way (--backend, rff by default to keep fits cheap).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.approx_model import make_model
+from src.config import DATA_FILE
+from src.data_loader import load_data
+from src.db import PatientStore, create_db
+from src.model_registry import labelled_training_data, prepare_training_data, resolve_params
+from src.resampling import IncrementalSMOTE
+
+def patient_batch(X: pd.DataFrame, y: pd.Series, rows: int, rng) -> tuple:
+    idx = rng.integers(len(X), size=rows)
+    batch = X.iloc[idx].to_numpy() * rng.normal(1.0, 0.03, size=(rows, X.shape[1]))
+    records = pd.DataFrame(batch, columns=X.columns).rename(columns={"albumin_and_globulin_ratio": "ag_ratio"})
+    records["gender"] = np.where(X["gender"].to_numpy()[idx] == 1, "Male", "Female")
+    records["name"] = "synthetic"
+    records["disease_prob"] = 0.5
+    records["model_key"] = "bench"
+    return records.to_dict("records"), y.to_numpy()[idx]
+
+def record_outcomes(store: PatientStore, outcomes: np.ndarray):
+    with store.connection() as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM patients WHERE outcome IS NULL ORDER BY id")]
+    store.set_outcomes(zip(ids, outcomes.tolist()))
+
+def fit(X, y, params):
+    from sklearn.preprocessing import StandardScaler
+    make_model(params).fit(StandardScaler().fit_transform(X), y)
+
+def main(argv=None):
+    from imblearn.over_sampling import SMOTE
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=200_000, help="labelled patients in the DB at the start")
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=2_000, help="labelled patients added per step")
+    parser.add_argument("--backend", default="rff")
+    args = parser.parse_args(argv)
+    params = resolve_params({"backend": args.backend})
+
+    X_csv, y_csv = prepare_training_data(load_data(DATA_FILE))
+    fill_values = X_csv.mean().to_dict()
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PatientStore(create_db(os.path.join(tmp, "bench.db")))
+        records, outcomes = patient_batch(X_csv, y_csv, args.history, rng)
+        store.insert_many(records)
+        record_outcomes(store, outcomes)
+        X_hist, y_hist, watermark = labelled_training_data(store, "bench", None, fill_values)
+        X_all = np.vstack([X_csv.to_numpy(), X_hist.to_numpy()])
+        y_all = np.concatenate([y_csv.to_numpy(), y_hist.to_numpy()])
+
+        start = time.perf_counter()
+        incremental = IncrementalSMOTE(random_state=0)
+        incremental.fit_resample(X_all, y_all)
+        print(f"initial: {len(y_all):,} rows, IncrementalSMOTE fit {time.perf_counter() - start:.2f}s")
+
+        for step in range(1, args.steps + 1):
+            records, outcomes = patient_batch(X_csv, y_csv, args.batch, rng)
+            store.insert_many(records)
+            record_outcomes(store, outcomes)
+
+            start = time.perf_counter()
+            X_new, y_new, watermark = labelled_training_data(store, "bench", watermark, fill_values)
+            pull_s = time.perf_counter() - start
+            X_all, y_all = np.vstack([X_all, X_new.to_numpy()]), np.concatenate([y_all, y_new.to_numpy()])
+
+            start = time.perf_counter()
+            X_full, y_full = SMOTE(random_state=0).fit_resample(X_all, y_all)
+            full_s = time.perf_counter() - start
+            start = time.perf_counter()
+            X_inc, y_inc = incremental.partial_fit_resample(X_new.to_numpy(), y_new.to_numpy())
+            inc_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fit(X_inc, y_inc, params)
+            fit_s = time.perf_counter() - start
+            print(f"step {step}: {len(y_all):>9,} rows | pull new {pull_s:6.2f}s | SMOTE full {full_s:6.2f}s | "
+                  f"incremental {inc_s:6.3f}s ({full_s / inc_s:5.1f}x) | {args.backend} fit {fit_s:6.2f}s | "
+                  f"resampled {len(y_inc):,} vs {len(y_full):,}")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: similar-patient lookup with similarity.SimilarityIndex vs a
+per-request full scan of the patients table.
+
+The index is built over --rows synthetic dataset rows plus --db-rows stored
+patients (synced from a temporary database), then queried with random
+patients (k nearest). The baseline reads every stored patient from SQLite and
+computes distances for each request, which is what a lookup without an
+index costs.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from synthetic import generate_patients, write_csv  # noqa: E402  (benchmarks/ is the script directory)
+
+from src.data_loader import normalize_frame
+from src.db import PatientStore, create_db
+from src.model_registry import load_or_train
+from src.similarity import SimilarityIndex
+
+def db_records(rows: int, seed: int) -> list:
+    df = normalize_frame(generate_patients(rows, seed)).rename(columns={"albumin_and_globulin_ratio": "ag_ratio"})
+    df = df.drop(columns=["dataset"]).assign(name="synthetic", disease_prob=0.5, risk_label="Low Risk")
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic dataset rows in the index")
+    parser.add_argument("--db-rows", type=int, default=100_000, help="stored patients in the index")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--baseline-queries", type=int, default=3)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore", FutureWarning)
+
+    artifact = load_or_train()
+    features = artifact["features"]
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_csv(os.path.join(tmp, "patients.csv"), args.rows, seed=1)
+        db_path = create_db(os.path.join(tmp, "app.db"))
+        store = PatientStore(db_path)
+        store.insert_many(db_records(args.db_rows, seed=2))
+
+        start = time.perf_counter()
+        index = SimilarityIndex(artifact)
+        index.add_dataset(csv_path)
+        index.sync(store)
+        build_s = time.perf_counter() - start
+        path = index.save(os.path.join(tmp, "index.npz"))
+        start = time.perf_counter()
+        index = SimilarityIndex.load(path, artifact)
+        load_s = time.perf_counter() - start
+        print(f"Index: {len(index):,} rows | build {build_s:.1f}s | load {load_s * 1000:.0f} ms | "
+              f"{Path(path).stat().st_size / 2**20:.0f} MiB on disk")
+
+        queries = normalize_frame(generate_patients(args.queries, seed=3))[features].to_numpy(dtype=float)
+        latencies = []
+        for q in queries:
+            start = time.perf_counter()
+            index.query(q, k=args.k)
+            latencies.append(time.perf_counter() - start)
+        print(f"{'index query':>16}: p50 {np.percentile(latencies, 50) * 1000:7.2f} ms | "
+              f"p99 {np.percentile(latencies, 99) * 1000:7.2f} ms (k={args.k})")
+
+        start = time.perf_counter()
+        store.insert(db_records(1, seed=4)[0])
+        changed = index.sync(store)
+        print(f"{'sync 1 insert':>16}: {(time.perf_counter() - start) * 1000:7.2f} ms ({changed} row)")
+
+        def full_scan(q):
+            rows = list(store.iter_patients(batch_size=10_000))
+            X = np.array([[r["ag_ratio" if f == "albumin_and_globulin_ratio" else f] or np.nan for f in features]
+                          for r in rows], dtype=float)
+            X = np.where(np.isnan(X), [artifact["fill_values"][f] for f in features], X)
+            d = (((X - q) / index.scale) ** 2).sum(axis=1)
+            return np.argsort(d)[:args.k]
+
+        start = time.perf_counter()
+        for q in queries[:args.baseline_queries]:
+            full_scan(q)
+        scan_s = (time.perf_counter() - start) / args.baseline_queries
+        print(f"{'table scan':>16}: {scan_s * 1000:7.0f} ms per query over {args.db_rows:,} stored patients only")
+        store.close()
+
+if __name__ == "__main__":
+    main()
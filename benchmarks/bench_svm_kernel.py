@@ -0,0 +1,114 @@
+"""
+Benchmark: sklearn/pandas inference path (one-row DataFrame -> StandardScaler
+-> predictor.predict_risk on the SVC) vs the NumPy-only export
+(svm_kernel.KernelSVM on raw rows), for single rows and batches, plus load
+time and peak memory of a fresh process that loads the model and scores one
+row each way.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+def per_call(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (VmHWM; ru_maxrss would include the forking parent's)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def child(mode: str, path: str):
+    """Load and score one row in this (fresh) process; prints load seconds and peak RSS."""
+    start = time.perf_counter()
+    if mode == "sklearn":
+        import pandas as pd
+        from src.model_registry import load_artifact
+        from src.predictor import predict_risk
+
+        artifact = load_artifact(path)
+        loaded = time.perf_counter() - start
+        row = pd.DataFrame([artifact["fill_values"]])[artifact["features"]]
+        predict_risk(artifact["model"], artifact["scaler"].transform(row.to_numpy()))
+    else:
+        from src.svm_kernel import load_kernel
+
+        kernel = load_kernel(path)
+        loaded = time.perf_counter() - start
+        kernel.predict_risk(np.ones((1, len(kernel.features))))
+    print(json.dumps({"load_s": loaded, "maxrss_mb": peak_rss_mb()}))
+
+def fresh_process(mode: str, path: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, path], capture_output=True, text=True,
+                         check=True, env=dict(os.environ, PYTHONWARNINGS="ignore")).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return child(*args.child)
+    warnings.simplefilter("ignore", FutureWarning)
+
+    import pandas as pd
+    from src.model_registry import artifact_path, load_or_train
+    from src.predictor import predict_risk
+    from src.svm_kernel import export_kernel, load_kernel
+
+    artifact = load_or_train()
+    model, scaler, features = artifact["model"], artifact["scaler"], artifact["features"]
+    with tempfile.TemporaryDirectory() as tmp:
+        npz = export_kernel(artifact, os.path.join(tmp, "kernel.npz"))
+        kernel = load_kernel(npz)
+        print(f"Support vectors: {kernel.n_support} | artifact {Path(artifact_path(artifact['key'])).stat().st_size / 1024:.0f} KiB"
+              f" | export {Path(npz).stat().st_size / 1024:.0f} KiB")
+
+        X_raw = scaler.inverse_transform(artifact["X_test"])
+        row = X_raw[:1]
+        record = dict(zip(features, row[0]))
+
+        def sklearn_single():
+            df = pd.DataFrame([record], columns=features)
+            return predict_risk(model, scaler.transform(df.to_numpy()))
+
+        single_sk = per_call(sklearn_single, args.repeats)
+        single_np = per_call(lambda: kernel.predict_risk(row), args.repeats)
+        print(f"{'single row':>16}: sklearn+pandas {single_sk * 1e6:8.1f} us | numpy {single_np * 1e6:8.1f} us "
+              f"({single_sk / single_np:.1f}x)")
+
+        batch = np.resize(X_raw, (args.batch_rows, X_raw.shape[1]))
+        batch_sk = per_call(lambda: predict_risk(model, scaler.transform(batch)), 3)
+        batch_np = per_call(lambda: kernel.predict_risk(batch), 3)
+        print(f"{f'batch of {len(batch)}':>16}: sklearn {len(batch) / batch_sk:10,.0f} rows/s | "
+              f"numpy {len(batch) / batch_np:10,.0f} rows/s ({batch_sk / batch_np:.1f}x)")
+
+        sk = fresh_process("sklearn", artifact_path(artifact["key"]))
+        nk = fresh_process("kernel", npz)
+        print(f"{'fresh process':>16}: sklearn load {sk['load_s'] * 1000:6.0f} ms, peak RSS {sk['maxrss_mb']:6.1f} MB | "
+              f"numpy load {nk['load_s'] * 1000:6.0f} ms, peak RSS {nk['maxrss_mb']:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Benchmark: wall-clock time of the cross-validated hyperparameter search with
+1, 4 and 8 worker processes (fold cache disabled, so every run does all tasks).
+Speedup is bounded by the number of CPU cores available.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.config import DATA_FILE
+from src.training import DEFAULT_GRID, search
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4, 8])
+    args = parser.parse_args(argv)
+
+    print(f"CPU cores: {os.cpu_count()}")
+    baseline = None
+    for workers in args.workers:
+        result = search(args.data, DEFAULT_GRID, n_splits=args.folds, workers=workers, use_cache=False)
+        baseline = baseline or result["seconds"]
+        print(f"{workers:>2} worker(s): {result['tasks']} fold tasks in {result['seconds']:7.2f}s "
+              f"({baseline / result['seconds']:.2f}x) best AUC {result['results'][0]['mean_auc']:.4f}")
+
+if __name__ == "__main__":
+    main()
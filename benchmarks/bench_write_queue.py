@@ -0,0 +1,90 @@
+"""
+Benchmark: latency of saving a prediction from concurrent app sessions,
+synchronously (db.insert_patient: connect + commit per click) vs through
+write_queue.WriteBehindQueue on a store whose every transaction takes at
+least --delay-ms (a slow disk). Also reports how many transactions the queue
+needed for all the records.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.db import PatientStore, create_db, insert_patient
+from src.write_queue import WriteBehindQueue
+
+def _record(i):
+    return {"name": f"Patient {i}", "disease_prob": 0.4, "risk_label": "Low Risk", "age": 50, "gender": 1,
+            "albumin": 3.9, "model_key": "bench"}
+
+class SlowStore(PatientStore):
+    """Every transaction takes at least `delay` seconds."""
+
+    def __init__(self, *args, delay=0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.transactions = 0
+
+    def insert_many(self, records):
+        time.sleep(self.delay)
+        self.transactions += 1
+        return super().insert_many(records)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent submitting threads")
+    parser.add_argument("--per-session", type=int, default=100, help="records per session")
+    parser.add_argument("--sync-rows", type=int, default=200, help="rows for the synchronous baseline")
+    parser.add_argument("--delay-ms", type=float, default=50.0, help="minimum cost of one queued transaction")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_db(os.path.join(tmp, "app.db"))
+        sync = []
+        for i in range(args.sync_rows):
+            start = time.perf_counter()
+            insert_patient(_record(i), db_path=db_path)
+            sync.append(time.perf_counter() - start)
+
+        store = SlowStore(db_path, delay=args.delay_ms / 1e3)
+        writer = WriteBehindQueue(store, batch_size=100, flush_interval=0.05)
+        latencies, lock = [], threading.Lock()
+
+        def session(offset):
+            mine = []
+            for i in range(args.per_session):
+                start = time.perf_counter()
+                writer.submit(_record(offset + i))
+                mine.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(mine)
+
+        threads = [threading.Thread(target=session, args=(n * args.per_session,)) for n in range(args.sessions)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        submitted_s = time.perf_counter() - start
+        writer.close()
+        drained_s = time.perf_counter() - start
+        store.close()
+
+    sync_ms, queued_ms = np.array(sync) * 1e3, np.array(latencies) * 1e3
+    print(f"{'insert_patient (sync)':>24}: p50 {np.percentile(sync_ms, 50):8.3f} ms | "
+          f"p99 {np.percentile(sync_ms, 99):8.3f} ms")
+    print(f"{'WriteBehindQueue.submit':>24}: p50 {np.percentile(queued_ms, 50):8.3f} ms | "
+          f"p99 {np.percentile(queued_ms, 99):8.3f} ms ({args.sessions} sessions)")
+    print(f"{'':>24}  {len(latencies)} records in {store.transactions} transactions "
+          f"(>= {args.delay_ms:.0f} ms each); submitted in {submitted_s:.2f}s, on disk after {drained_s:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cold import cost of the entry-point modules, measured with `python -X importtime`.
+
+Each module is imported in a fresh interpreter (best of --repeats); the
+reported time is the summed cumulative import time minus that of an empty
+interpreter, with the heaviest packages it pulled in. --out writes the
+numbers in benchmarks/run_suite.py's result format (so --compare works on
+them); run_suite.py also includes them as its "imports" benchmark.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py src.db src.predictor --out imports.json
+"""
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules the scripts, app and server start from
+ENTRY_MODULES = [
+    "src.db",
+    "src.clinical_rules",
+    "src.predictor",
+    "src.model_registry",
+    "src.batch_scoring",
+    "src.serve",
+    "src.data_visualization",
+    "src.training",
+    "src.app",
+]
+
+def _importtime(code: str):
+    """
+    Parse `python -X importtime -c code`: cumulative microseconds of each
+    top-level import, and the largest cumulative time per root package.
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    top, roots = {}, {}
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header or unrelated output
+        cumulative, name = int(parts[1]), parts[2]
+        module = name.strip()
+        if len(name) - len(name.lstrip()) == 1:  # nested imports are indented further
+            top[module] = cumulative
+        root = module.split(".")[0]
+        roots[root] = max(roots.get(root, 0), cumulative)
+    return top, roots
+
+def import_time(module: str, repeats: int = 3) -> dict:
+    """
+    Seconds to import module in a fresh interpreter (beyond what interpreter
+    startup imports) and the packages costing over 10 ms, heaviest first.
+    """
+    best, packages = float("inf"), []
+    for _ in range(repeats):
+        startup, _ = _importtime("pass")
+        top, roots = _importtime(f"import {module}")
+        total = sum(us for name, us in top.items() if name not in startup) / 1e6
+        if total < best:
+            best = total
+            heavy = {name: us for name, us in roots.items()
+                     if name not in startup and name != module.split(".")[0] and us > 10_000}
+            packages = [(name, us / 1e6) for name, us in sorted(heavy.items(), key=lambda kv: -kv[1])]
+    return {"seconds": best, "packages": packages}
+
+def available(module: str) -> bool:
+    """Whether the module's third-party requirements are installed (e.g. streamlit for src.app)."""
+    if module == "src.app":
+        return importlib.util.find_spec("streamlit") is not None
+    return True
+
+def results(modules=None, repeats: int = 3, verbose: bool = True) -> dict:
+    """run_suite-style metrics: {"import.<module>": {"value", "unit", "better"}}."""
+    out = {}
+    for module in modules or ENTRY_MODULES:
+        if not available(module):
+            if verbose:
+                print(f"{module:>28}: skipped (dependencies not installed)")
+            continue
+        r = import_time(module, repeats)
+        out[f"import.{module}"] = {"value": r["seconds"] * 1e3, "unit": "ms", "better": "lower"}
+        if verbose:
+            heavy = ", ".join(f"{name} {s * 1e3:.0f}ms" for name, s in r["packages"][:5])
+            print(f"{module:>28}: {r['seconds'] * 1e3:8.1f} ms  [{heavy}]")
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", help="modules to time (default: ENTRY_MODULES)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", help="write results as JSON (run_suite.py format)")
+    args = parser.parse_args()
+
+    metrics = results(args.modules, args.repeats)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"results": metrics}, f, indent=2)
+        print("Results written to", args.out)
+
+if __name__ == "__main__":
+    main()
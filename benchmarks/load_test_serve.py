@@ -0,0 +1,88 @@
+"""
+Load test for src/serve.py.
+
+Starts the service in-process (or targets --host/--port of a running one),
+opens --concurrency keep-alive connections that each send --requests
+/predict calls, and reports p50/p99 latency, requests/sec and how many
+micro-batches the server used.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data_loader import load_data
+from src.model_registry import FEATURES, load_or_train
+from src.serve import InferenceServer
+
+async def http_post(reader, writer, path: str, payload) -> tuple:
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode().partition(":")
+        if key.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def _client(host, port, patients, n, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(n):
+        start = time.perf_counter()
+        status, _ = await http_post(reader, writer, "/predict", patients[i % len(patients)])
+        latencies.append(time.perf_counter() - start)
+        assert status == 200, status
+    writer.close()
+
+def _percentile(values, q):
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        server = InferenceServer(load_or_train(), max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+        await server.start(host, 0)
+        port = server.port
+
+    patients = load_data().head(500)[FEATURES].dropna()
+    patients = patients.assign(gender=patients["gender"].map({1: "Male", 0: "Female"})).to_dict("records")
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, patients, args.requests, latencies)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    print(f"Requests    : {len(latencies)} over {args.concurrency} connections")
+    print(f"Throughput  : {len(latencies) / elapsed:,.0f} req/sec")
+    print(f"Latency p50 : {_percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"Latency p99 : {_percentile(latencies, 99) * 1000:.2f} ms")
+    if server:
+        print(f"Micro-batches: {server.batcher.batches} (avg {server.batcher.rows / max(server.batcher.batches, 1):.1f} rows)")
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="target a running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="requests per connection")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
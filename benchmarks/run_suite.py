@@ -0,0 +1,259 @@
+"""
+Reproducible benchmark suite for the whole pipeline (runs offline).
+
+For each --rows size a synthetic CSV with the bundled dataset's schema is
+generated (benchmarks/synthetic.py, fixed seed), then the suite times:
+- data_loader.load_data, cold (CSV parse) and warm (normalized-frame cache)
+- clinical_rules.get_warnings per row and evaluate_rules over the frame
+- model training (SVC on at most --train-rows rows, rff backend on all rows)
+- single-row (p50/p99) and batch inference with predictor.predict_risk,
+  and feature attributions with explain.Explainer
+- db.insert_patient and PatientStore.insert_many throughput
+- data_visualization.generate_plots
+plus, once per run, the cold import time of the entry-point modules
+(benchmarks/import_time.py).
+Results go to a JSON file; --compare BASE NEW flags regressions between two
+result files (exit status 1 if any metric got worse by more than --threshold).
+
+    python benchmarks/run_suite.py --rows 10000 100000 --out results.json
+    python benchmarks/run_suite.py --compare base.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import import_time  # noqa: E402  (benchmarks/ is the script directory)
+from synthetic import write_csv  # noqa: E402
+
+from src import data_loader
+from src.batch_scoring import feature_matrix
+from src.clinical_rules import evaluate_rules, get_warnings
+from src.data_loader import load_data
+from src.data_visualization import generate_plots
+from src.db import PatientStore, create_db, insert_patient
+from src.explain import build_explainer
+from src.model_registry import train_model
+from src.predictor import predict_risk
+
+BENCHMARKS = ("imports", "load", "rules", "train", "inference", "db", "plots")
+PER_SIZE = BENCHMARKS[1:]
+
+def best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {"value": float(value), "unit": unit, "better": better}
+
+def bench_load(csv_path, rows, tmp, args):
+    cache_dir = os.path.join(tmp, "cache")
+    load_data(csv_path, cache_dir=cache_dir)  # populate the cache
+    return {
+        "load_data.cold": metric(best_of(lambda: load_data(csv_path, use_cache=False), args.repeats), "s", "lower"),
+        "load_data.warm": metric(best_of(lambda: load_data(csv_path, cache_dir=cache_dir), args.repeats), "s", "lower"),
+    }
+
+def bench_rules(csv_path, rows, tmp, args):
+    df = load_data(csv_path, use_cache=False)
+    records = df.head(args.per_row_limit).to_dict("records")
+    per_row = best_of(lambda: [get_warnings(r) for r in records], args.repeats)
+    columnar = best_of(lambda: evaluate_rules(df), args.repeats)
+    return {
+        "get_warnings": metric(len(records) / per_row, "rows/s", "higher"),
+        "evaluate_rules": metric(len(df) / columnar, "rows/s", "higher"),
+    }
+
+def _train(csv_path, rows, tmp, args, backend, max_rows):
+    path = csv_path
+    if rows > max_rows:
+        path = os.path.join(tmp, f"train_{max_rows}.csv")
+        write_csv(path, max_rows, seed=args.seed)
+    start = time.perf_counter()
+    artifact = train_model(path, {"backend": backend})
+    return artifact, time.perf_counter() - start
+
+def bench_train(csv_path, rows, tmp, args):
+    artifact, svc_s = _train(csv_path, rows, tmp, args, "svc", args.train_rows)
+    args._artifact = artifact  # reused by bench_inference
+    _, rff_s = _train(csv_path, rows, tmp, args, "rff", args.approx_train_rows)
+    return {
+        "train.svc": metric(svc_s, "s", "lower"),
+        "train.rff": metric(rff_s, "s", "lower"),
+    }
+
+def bench_inference(csv_path, rows, tmp, args):
+    artifact = getattr(args, "_artifact", None) or _train(csv_path, rows, tmp, args, "svc", args.train_rows)[0]
+    model, scaler = artifact["model"], artifact["scaler"]
+    X = feature_matrix(load_data(csv_path).head(args.batch_rows), artifact)
+
+    latencies = []
+    for i in range(args.single_calls):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        predict_risk(model, scaler.transform(row))
+        latencies.append(time.perf_counter() - start)
+    batch_s = best_of(lambda: predict_risk(model, scaler.transform(X)), args.repeats)
+
+    explainer = build_explainer(artifact)
+    explain_latencies = []
+    for i in range(min(args.single_calls, 200)):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        explainer.explain(row)
+        explain_latencies.append(time.perf_counter() - start)
+    return {
+        "predict.single_p50": metric(np.percentile(latencies, 50) * 1e3, "ms", "lower"),
+        "predict.single_p99": metric(np.percentile(latencies, 99) * 1e3, "ms", "lower"),
+        "predict.batch": metric(len(X) / batch_s, "rows/s", "higher"),
+        "explain.single_p50": metric(np.percentile(explain_latencies, 50) * 1e3, "ms", "lower"),
+        "explain.single_p99": metric(np.percentile(explain_latencies, 99) * 1e3, "ms", "lower"),
+    }
+
+def _records(csv_path, n):
+    df = load_data(csv_path).head(n).rename(columns={"albumin_and_globulin_ratio": "ag_ratio"})
+    df = df.drop(columns=["dataset"]).assign(name="synthetic", disease_prob=0.5, risk_label="Low Risk")
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def bench_db(csv_path, rows, tmp, args):
+    single = _records(csv_path, min(rows, args.db_single_rows))
+    many = _records(csv_path, min(rows, args.db_many_rows))
+    db_path = create_db(os.path.join(tmp, f"bench_{rows}.db"))
+
+    start = time.perf_counter()
+    for r in single:
+        insert_patient(r, db_path=db_path)
+    single_s = time.perf_counter() - start
+
+    with PatientStore(db_path) as store:
+        start = time.perf_counter()
+        store.insert_many(many)
+        many_s = time.perf_counter() - start
+    return {
+        "db.insert_patient": metric(len(single) / single_s, "rows/s", "higher"),
+        "db.insert_many": metric(len(many) / many_s, "rows/s", "higher"),
+    }
+
+def bench_plots(csv_path, rows, tmp, args):
+    out = os.path.join(tmp, f"plots_{rows}")
+    start = time.perf_counter()
+    generate_plots(csv_path, out, workers=1, force=True)
+    return {"generate_plots": metric(time.perf_counter() - start, "s", "lower")}
+
+def environment() -> dict:
+    import pandas as pd
+    import sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def run(args) -> dict:
+    warnings.simplefilter("ignore", FutureWarning)
+    results = {}
+    if "imports" in args.only:
+        results.update(import_time.results(repeats=args.repeats))
+    default_cache = data_loader.CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        # load_data calls without cache_dir (training, inference, plots) cache into tmp, not the repo's .cache/
+        data_loader.CACHE_DIR = os.path.join(tmp, "cache")
+        try:
+            for rows in args.rows:
+                csv_path = write_csv(os.path.join(tmp, f"patients_{rows}.csv"), rows, seed=args.seed)
+                args._artifact = None
+                for name in (n for n in args.only if n in PER_SIZE):
+                    start = time.perf_counter()
+                    with open(os.devnull, "w") as devnull:  # silence library prints (DB/plot progress)
+                        stdout, sys.stdout = sys.stdout, devnull
+                        try:
+                            metrics = globals()[f"bench_{name}"](csv_path, rows, tmp, args)
+                        finally:
+                            sys.stdout = stdout
+                    for key, m in metrics.items():
+                        results[f"{key}@{rows}"] = m
+                        print(f"{key + '@' + str(rows):>36}: {m['value']:>14,.3f} {m['unit']}")
+                    print(f"{'(' + name + ' took ' + format(time.perf_counter() - start, '.1f') + 's)':>36}")
+        finally:
+            data_loader.CACHE_DIR = default_cache
+    return {"environment": environment(), "config": {"rows": args.rows, "seed": args.seed}, "results": results}
+
+def compare(base: dict, new: dict, threshold: float) -> list:
+    """Print a comparison table; returns the keys that regressed by more than threshold."""
+    regressions = []
+    print(f"{'metric':>36} {'base':>14} {'new':>14} {'change':>9}")
+    for key in sorted(set(base["results"]) & set(new["results"])):
+        b, n = base["results"][key], new["results"][key]
+        if not b["value"]:
+            continue
+        change = n["value"] / b["value"] - 1
+        worse = change > threshold if b["better"] == "lower" else change < -threshold
+        flag = "  REGRESSION" if worse else ""
+        print(f"{key:>36} {b['value']:>14,.3f} {n['value']:>14,.3f} {change:>+8.1%}{flag}")
+        if worse:
+            regressions.append(key)
+    missing = sorted(set(base["results"]) ^ set(new["results"]))
+    if missing:
+        print("Only in one run:", ", ".join(missing))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3, help="best-of repeats for the cheap timings")
+    parser.add_argument("--train-rows", type=int, default=20_000, help="row cap for SVC training")
+    parser.add_argument("--approx-train-rows", type=int, default=1_000_000, help="row cap for rff training")
+    parser.add_argument("--per-row-limit", type=int, default=50_000, help="rows for per-row get_warnings")
+    parser.add_argument("--batch-rows", type=int, default=10_000)
+    parser.add_argument("--single-calls", type=int, default=500)
+    parser.add_argument("--db-single-rows", type=int, default=1_000)
+    parser.add_argument("--db-many-rows", type=int, default=100_000)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    report = run(args)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Results written to", args.out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
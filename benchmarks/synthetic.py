@@ -0,0 +1,93 @@
+"""
+Synthetic patients with the schema of data/indian_liver_patient.csv.
+
+Each class (Dataset 1 = liver disease, 2 = healthy) is sampled independently
+per column from distributions fitted to the bundled CSV: lognormal for the
+lab values, normal for age, clipped to the observed ranges and rounded like
+the original. Output is deterministic for a given seed and row count, and
+large files are written chunk by chunk so 10M rows don't need to fit in memory.
+
+    python benchmarks/synthetic.py --rows 1000000 --out /tmp/patients_1m.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Age", "Gender", "Total_Bilirubin", "Direct_Bilirubin", "Alkaline_Phosphotase",
+           "Alamine_Aminotransferase", "Aspartate_Aminotransferase", "Total_Protiens", "Albumin",
+           "Albumin_and_Globulin_Ratio", "Dataset"]
+
+DISEASE_RATE = 0.714  # share of Dataset == 1
+MISSING_AG_RATIO = 0.0007
+
+# column -> (log mean, log std, min, max, decimals) per Dataset value
+LAB_PARAMS = {
+    1: {
+        "Total_Bilirubin": (0.974, 1.355, 0.4, 75.0, 1),
+        "Direct_Bilirubin": (0.066, 1.541, 0.1, 19.7, 1),
+        "Alkaline_Phosphotase": (5.568, 0.812, 56, 2110, 0),
+        "Alamine_Aminotransferase": (4.233, 1.432, 9, 2000, 0),
+        "Aspartate_Aminotransferase": (4.392, 1.619, 9, 4929, 0),
+        "Total_Protiens": (1.858, 0.169, 2.7, 10.8, 1),
+        "Albumin": (1.074, 0.285, 0.8, 5.5, 1),
+        "Albumin_and_Globulin_Ratio": (-0.177, 0.416, 0.3, 2.8, 2),
+    },
+    2: {
+        "Total_Bilirubin": (0.105, 0.630, 0.4, 7.3, 1),
+        "Direct_Bilirubin": (-1.058, 0.879, 0.1, 3.6, 1),
+        "Alkaline_Phosphotase": (5.226, 0.620, 56, 1580, 0),
+        "Alamine_Aminotransferase": (3.379, 0.662, 9, 181, 0),
+        "Aspartate_Aminotransferase": (3.503, 0.781, 9, 285, 0),
+        "Total_Protiens": (1.880, 0.169, 3.4, 10.1, 1),
+        "Albumin": (1.165, 0.261, 0.9, 6.0, 1),
+        "Albumin_and_Globulin_Ratio": (-0.009, 0.292, 0.3, 2.0, 2),
+    },
+}
+# (age mean, age std, male share) per Dataset value
+DEMOGRAPHICS = {1: (44.9, 15.5, 0.778), 2: (40.7, 18.1, 0.683)}
+
+def generate_patients(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A frame of `rows` synthetic patients with the raw CSV columns."""
+    rng = np.random.default_rng(seed)
+    dataset = np.where(rng.random(rows) < DISEASE_RATE, 1, 2)
+    out = {c: np.empty(rows) for c in COLUMNS if c not in ("Gender", "Dataset")}
+    gender = np.empty(rows, dtype=object)
+    for cls in (1, 2):
+        mask = dataset == cls
+        n = int(mask.sum())
+        age_mean, age_std, male = DEMOGRAPHICS[cls]
+        out["Age"][mask] = np.clip(np.rint(rng.normal(age_mean, age_std, n)), 4, 90)
+        gender[mask] = np.where(rng.random(n) < male, "Male", "Female")
+        for c, (mu, sigma, low, high, decimals) in LAB_PARAMS[cls].items():
+            out[c][mask] = np.round(np.clip(rng.lognormal(mu, sigma, n), low, high), decimals)
+    out["Albumin_and_Globulin_Ratio"][rng.random(rows) < MISSING_AG_RATIO] = np.nan
+
+    df = pd.DataFrame(out)
+    for c in ("Age", "Alkaline_Phosphotase", "Alamine_Aminotransferase", "Aspartate_Aminotransferase"):
+        df[c] = df[c].astype(np.int64)
+    df["Gender"] = gender
+    df["Dataset"] = dataset
+    return df[COLUMNS]
+
+def write_csv(path: str, rows: int, seed: int = 0, chunksize: int = 1_000_000) -> str:
+    """Write `rows` synthetic patients to a CSV, chunk by chunk (chunk i uses seed (seed, i))."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    for i, start in enumerate(range(0, rows, chunksize)):
+        chunk = generate_patients(min(chunksize, rows - start), seed=[seed, i])
+        chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    os.replace(tmp, path)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+    print("Wrote", write_csv(args.out, args.rows, args.seed))
+
+if __name__ == "__main__":
+    main()
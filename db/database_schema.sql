@@ -1,4 +1,8 @@
 -- DATABASE SCHEMA DESIGN
+-- Fresh installs run this file; existing databases are upgraded by the
+-- numbered scripts in db/migrations/ (see src/db.py:migrate).
+-- Keep both in sync.
+
 -- Table: patients
 CREATE TABLE IF NOT EXISTS patients (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -8,7 +12,7 @@ CREATE TABLE IF NOT EXISTS patients (
     date DATETIME DEFAULT CURRENT_TIMESTAMP,
 
     -- AI Results
-    disease_prob TEXT,    -- e.g. "85.2%"
+    disease_prob REAL,    -- probability 0.0-1.0, e.g. 0.852
     risk_label TEXT,      -- "High Risk" / "Low Risk"
 
     -- Vitals (Inputs) (snake_case names)
@@ -21,5 +25,21 @@ CREATE TABLE IF NOT EXISTS patients (
     aspartate_aminotransferase INTEGER,
     total_protiens REAL,
     albumin REAL,
-    ag_ratio REAL
-);
\ No newline at end of file
+    ag_ratio REAL,
+
+    -- Model artifact key that produced disease_prob
+    model_key TEXT,
+
+    -- Confirmed diagnosis, filled in later (1=Liver Disease, 0=Healthy)
+    outcome INTEGER,
+    outcome_date DATETIME,
+    outcome_seq INTEGER   -- order outcomes were recorded in (watermark for incremental readers)
+);
+
+-- Indexes for history queries (date range, risk threshold, name prefix)
+CREATE INDEX IF NOT EXISTS idx_patients_date ON patients (date);
+CREATE INDEX IF NOT EXISTS idx_patients_risk_label ON patients (risk_label, date);
+CREATE INDEX IF NOT EXISTS idx_patients_disease_prob ON patients (disease_prob);
+CREATE INDEX IF NOT EXISTS idx_patients_name ON patients (name);
+CREATE INDEX IF NOT EXISTS idx_patients_outcome ON patients (model_key, outcome_seq);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_patients_outcome_seq ON patients (outcome_seq);
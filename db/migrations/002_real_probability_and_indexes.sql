@@ -0,0 +1,40 @@
+-- v1 -> v2: store disease_prob as REAL (0.0-1.0) instead of TEXT like "85.2%",
+-- and add indexes for date range, risk and name prefix queries.
+-- parse_prob() is registered by src/db.py:migrate.
+
+ALTER TABLE patients RENAME TO patients_v1;
+
+CREATE TABLE patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    date DATETIME DEFAULT CURRENT_TIMESTAMP,
+    disease_prob REAL,
+    risk_label TEXT,
+    age INTEGER,
+    gender INTEGER,
+    total_bilirubin REAL,
+    direct_bilirubin REAL,
+    alkaline_phosphotase INTEGER,
+    alamine_aminotransferase INTEGER,
+    aspartate_aminotransferase INTEGER,
+    total_protiens REAL,
+    albumin REAL,
+    ag_ratio REAL
+);
+
+INSERT INTO patients (id, name, date, disease_prob, risk_label, age, gender,
+                      total_bilirubin, direct_bilirubin, alkaline_phosphotase,
+                      alamine_aminotransferase, aspartate_aminotransferase,
+                      total_protiens, albumin, ag_ratio)
+SELECT id, name, date, parse_prob(disease_prob), risk_label, age, gender,
+       total_bilirubin, direct_bilirubin, alkaline_phosphotase,
+       alamine_aminotransferase, aspartate_aminotransferase,
+       total_protiens, albumin, ag_ratio
+FROM patients_v1;
+
+DROP TABLE patients_v1;
+
+CREATE INDEX idx_patients_date ON patients (date);
+CREATE INDEX idx_patients_risk_label ON patients (risk_label, date);
+CREATE INDEX idx_patients_disease_prob ON patients (disease_prob);
+CREATE INDEX idx_patients_name ON patients (name);
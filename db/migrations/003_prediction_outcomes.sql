@@ -0,0 +1,15 @@
+-- v2 -> v3: record which model version made each prediction and the confirmed
+-- outcome (1 = liver disease, 0 = healthy) once it is known, so evaluation
+-- metrics can be updated incrementally from labelled patients.
+-- outcome_seq orders outcomes by when they were recorded (assigned as
+-- MAX(outcome_seq) + 1 by PatientStore.set_outcomes, inside the write lock):
+-- incremental readers (evaluation, similarity, retraining) use it as their
+-- watermark, since outcome_date has one-second resolution.
+
+ALTER TABLE patients ADD COLUMN model_key TEXT;
+ALTER TABLE patients ADD COLUMN outcome INTEGER;
+ALTER TABLE patients ADD COLUMN outcome_date DATETIME;
+ALTER TABLE patients ADD COLUMN outcome_seq INTEGER;
+
+CREATE INDEX idx_patients_outcome ON patients (model_key, outcome_seq);
+CREATE UNIQUE INDEX idx_patients_outcome_seq ON patients (outcome_seq);
@@ -0,0 +1,29 @@
+"""
+Export the current SVC artifact to a NumPy-only .npz (see src/svm_kernel.py).
+New SVC artifacts are exported when they are saved; this covers older ones
+or writing the export somewhere else.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure the src package is importable when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.model_registry import load_or_train
+from src.svm_kernel import export_kernel, load_kernel
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", help="output .npz (default: next to the artifact in MODEL_DIR)")
+    args = parser.parse_args(argv)
+
+    artifact = load_or_train()
+    path = export_kernel(artifact, args.out)
+    kernel = load_kernel(path)
+    print(f"Exported {artifact['key']} ({kernel.n_support} support vectors, "
+          f"{Path(path).stat().st_size / 1024:.0f} KiB) -> {path}")
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,15 @@ import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
 
-from db import create_db, insert_patient
+from src.db import create_db, insert_patient
 
 def main():
     db = create_db()
     sample = {
         "name": "Sample Patient",
-        "disease_prob": "12.3%",
+        "disease_prob": 0.123,
         "risk_label": "Low Risk",
         "age": 45,
         "gender": 1,
@@ -1,24 +1,35 @@
 """
 Simple orchestration script to:
 - load data
+- precompute dashboard aggregates
 - generate plots
 """
+import time
 import sys
 from pathlib import Path
 
 # Ensure src is importable when running from scripts/
 ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
 
-from data_loader import load_data, print_schema
-from data_visualization import generate_plots
-from config import DATA_FILE, OUTPUT_DIR
+from src.aggregates import build_aggregates, save_aggregates
+from src.data_loader import load_data, memory_footprint, print_schema
+from src.data_visualization import generate_plots
+from src.config import AGGREGATES_FILE, DATA_FILE, OUTPUT_DIR
 
 def main():
     print("Loading data from:", DATA_FILE)
     df = load_data()
     print("Rows:", len(df))
     print_schema(df)
+    usage = memory_footprint()
+    print(f"Memory: {usage['inferred_bytes'] / 1024:.0f} KiB inferred dtypes -> "
+          f"{usage['typed_bytes'] / 1024:.0f} KiB typed schema")
+
+    # Precompute aggregates for the dashboard
+    start = time.perf_counter()
+    save_aggregates(build_aggregates(DATA_FILE), AGGREGATES_FILE)
+    print(f"Aggregates saved to: {AGGREGATES_FILE} ({time.perf_counter() - start:.2f}s)")
 
     # Generate plots
     generate_plots(output_dir=OUTPUT_DIR)
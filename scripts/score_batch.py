@@ -0,0 +1,29 @@
+"""
+Score a lab export CSV in chunks and write probabilities, labels and
+clinical warnings to an output CSV.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure the src package is importable when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.batch_scoring import DEFAULT_CHUNKSIZE, score_csv
+from src.model_registry import load_or_train
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", help="CSV with the same columns as data/indian_liver_patient.csv")
+    parser.add_argument("output", help="where to write the scored CSV")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    artifact = load_or_train()
+    stats = score_csv(args.input, args.output, artifact, chunksize=args.chunksize)
+    print(f"Scored {stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:.0f} rows/sec) -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Train the model (SVC unless --backend says otherwise) and save it to the
+model registry (config.MODEL_DIR).
+Hyperparameters default to the selected ones (see scripts/tune_model.py).
+Skips training when an artifact for the same data hash and hyperparameters
+already exists, unless --force is given. With --with-outcomes, patients whose
+outcome was recorded in the database since are then added to the training set
+(see model_registry.retrain_with_outcomes).
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ensure the src package is importable when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.config import DATA_FILE, DB_PATH, MODEL_DIR
+from src.approx_model import BACKENDS
+from src.model_registry import (artifact_key, artifact_path, file_hash, load_or_train, resolve_params,
+                                retrain_with_outcomes, selected_params)
+
+def _gamma(value: str):
+    return value if value in ("scale", "auto") else float(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=DATA_FILE, help="training CSV")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--backend", choices=BACKENDS, help="svc, or nystroem/rff for large training sets")
+    parser.add_argument("--kernel")
+    parser.add_argument("--C", type=float)
+    parser.add_argument("--gamma", type=_gamma)
+    parser.add_argument("--smote-k", type=int, dest="smote_k_neighbors")
+    parser.add_argument("--n-components", type=int, dest="n_components", help="feature map size (nystroem/rff)")
+    parser.add_argument("--force", action="store_true", help="retrain even if an artifact exists")
+    parser.add_argument("--with-outcomes", action="store_true",
+                        help="add patients with a recorded outcome (from --db) to the training set")
+    parser.add_argument("--db", default=DB_PATH, help="patients database for --with-outcomes")
+    args = parser.parse_args(argv)
+
+    params = selected_params(args.model_dir)
+    for name in ("backend", "kernel", "C", "gamma", "smote_k_neighbors", "n_components"):
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    params = resolve_params(params)
+    path = artifact_path(artifact_key(file_hash(args.data), params), args.model_dir)
+
+    existed = os.path.exists(path) and not args.force
+    start = time.perf_counter()
+    artifact = load_or_train(args.data, params, model_dir=args.model_dir, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    print("Artifact:", path)
+    print("Data hash:", artifact["data_hash"])
+    print("Params:", artifact["params"])
+    print(f"{'Loaded existing' if existed else 'Trained'} artifact in {elapsed:.2f}s (trained at {artifact['trained_at']})")
+
+    if args.with_outcomes:
+        from src.db import PatientStore
+
+        store = PatientStore(args.db)
+        try:
+            start = time.perf_counter()
+            retrained = retrain_with_outcomes(artifact, store, args.model_dir)
+        finally:
+            store.close()
+        if retrained is None:
+            print("No outcomes recorded since the artifact was trained")
+        else:
+            print("Retrained artifact:", artifact_path(retrained["key"], args.model_dir))
+            print(f"Added outcomes up to #{retrained['outcome_watermark']} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Cross-validated hyperparameter search (kernel, C, gamma, SMOTE k_neighbors).
+Fold scores are cached in the model dir, so re-runs only compute new
+combinations. The best params are trained into the model registry and
+selected as the app's model unless --no-export is given.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure the src package is importable when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.approx_model import BACKENDS
+from src.config import DATA_FILE, MODEL_BACKEND, MODEL_DIR
+from src.training import DEFAULT_GRID, export_best, search
+
+def _gamma(value: str):
+    return value if value in ("scale", "auto") else float(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=DATA_FILE, help="training CSV")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="run fold tasks in N processes")
+    parser.add_argument("--backend", nargs="+", default=[MODEL_BACKEND], choices=BACKENDS)
+    parser.add_argument("--kernel", nargs="+", default=DEFAULT_GRID["kernel"])
+    parser.add_argument("--C", nargs="+", type=float, default=DEFAULT_GRID["C"])
+    parser.add_argument("--gamma", nargs="+", type=_gamma, default=DEFAULT_GRID["gamma"])
+    parser.add_argument("--smote-k", nargs="+", type=int, default=DEFAULT_GRID["smote_k_neighbors"])
+    parser.add_argument("--no-cache", action="store_true", help="ignore and don't update cached fold scores")
+    parser.add_argument("--no-export", action="store_true", help="only report, don't select the best params")
+    args = parser.parse_args(argv)
+
+    grid = {"backend": args.backend, "kernel": args.kernel, "C": args.C, "gamma": args.gamma, "smote_k_neighbors": args.smote_k}
+    result = search(args.data, grid, n_splits=args.folds, workers=args.workers,
+                    model_dir=args.model_dir, use_cache=not args.no_cache)
+
+    print(f"{result['tasks']} fold tasks ({result['computed']} computed, "
+          f"{result['tasks'] - result['computed']} cached) in {result['seconds']:.2f}s with {args.workers} worker(s)")
+    for r in result["results"][:10]:
+        p = r["params"]
+        print(f" AUC {r['mean_auc']:.4f} ± {r['std_auc']:.4f}  backend={p['backend']} kernel={p['kernel']} C={p['C']} "
+              f"gamma={p['gamma']} smote_k={p['smote_k_neighbors']}")
+    print("Best params:", result["best_params"])
+
+    if not args.no_export:
+        artifact = export_best(result, args.data, args.model_dir)
+        print(f"Selected model {artifact['key']}")
+
+if __name__ == "__main__":
+    main()
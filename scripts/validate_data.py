@@ -0,0 +1,33 @@
+"""
+Validate a lab export CSV chunk by chunk (required columns, physical
+bounds, null and duplicate rates) and print the report.
+Exits with status 1 if validation fails.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure the src package is importable when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.config import DATA_FILE
+from src.validation import print_report, validate_csv
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default=DATA_FILE)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1, help="validate chunks in N processes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = validate_csv(args.path, chunksize=args.chunksize, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print_report(report)
+    print(f"Validated in {elapsed:.2f}s ({report['rows'] / elapsed:,.0f} rows/sec)")
+    return 0 if report["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Precomputed summary tables for the dashboard.
+
+The pipeline streams the dataset once (build_aggregates) and stores compact
+sufficient statistics in an .npz file:
+- per-feature, per-class histograms on fixed bin edges (log-spaced for the
+  long-tailed lab values), plus missing-value counts
+- running sums for the pairwise-complete correlation matrix
+- clinical_rules trigger counts per class
+Histograms, quantiles, correlations and rule rates are derived from these in
+O(bins), and new patients are folded in with add_rows without rereading
+anything: sync_aggregates catches the file up with patients inserted into
+the DB since its stored id watermark. That runs when the dashboard is
+viewed, never on the insert path.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from .clinical_rules import PHYSICAL_BOUNDS, RULES, rule_flags
+from .config import AGGREGATES_FILE, DATA_FILE
+from .data_loader import iter_chunks, normalize_frame
+
+# Bump when bins or stored statistics change so old files are rebuilt
+AGG_VERSION = 2
+
+N_BINS = 100
+
+# Feature -> (low, high, spacing); the lab values are heavily right-skewed
+BIN_SPECS = {
+    "age": (*PHYSICAL_BOUNDS["age"], "linear"),
+    "gender": (-0.5, 1.5, "linear"),
+    "total_bilirubin": (*PHYSICAL_BOUNDS["total_bilirubin"], "log"),
+    "direct_bilirubin": (*PHYSICAL_BOUNDS["direct_bilirubin"], "log"),
+    "alkaline_phosphotase": (*PHYSICAL_BOUNDS["alkaline_phosphotase"], "log"),
+    "alamine_aminotransferase": (*PHYSICAL_BOUNDS["alamine_aminotransferase"], "log"),
+    "aspartate_aminotransferase": (*PHYSICAL_BOUNDS["aspartate_aminotransferase"], "log"),
+    "total_protiens": (*PHYSICAL_BOUNDS["total_protiens"], "linear"),
+    "albumin": (*PHYSICAL_BOUNDS["albumin"], "linear"),
+    "albumin_and_globulin_ratio": (*PHYSICAL_BOUNDS["albumin_and_globulin_ratio"], "linear"),
+}
+FEATURES = list(BIN_SPECS)
+
+# Patients inserted from the app have no confirmed diagnosis yet
+CLASSES = ["liver_disease", "healthy", "unlabelled"]
+
+_file_lock = threading.Lock()
+
+def bin_edges(feature: str) -> np.ndarray:
+    low, high, spacing = BIN_SPECS[feature]
+    if spacing == "log":
+        return np.expm1(np.linspace(np.log1p(low), np.log1p(high), N_BINS + 1))
+    return np.linspace(low, high, N_BINS + 1)
+
+def empty_aggregates() -> Dict[str, Any]:
+    p, c = len(FEATURES), len(CLASSES)
+    return {
+        "version": AGG_VERSION,
+        "edges": np.stack([bin_edges(f) for f in FEATURES]),
+        "hist": np.zeros((p, c, N_BINS), dtype=np.int64),  # values outside the edges go to the end bins
+        "missing": np.zeros((p, c), dtype=np.int64),
+        "rows": np.zeros(c, dtype=np.int64),
+        "rule_counts": np.zeros((len(RULES), c), dtype=np.int64),
+        # pairwise-complete sums: [i, j] is over rows where features i and j are both present
+        "pair_n": np.zeros((p, p)),
+        "pair_sx": np.zeros((p, p)),  # sum of x_i
+        "pair_sxx": np.zeros((p, p)),  # sum of x_i^2
+        "pair_sxy": np.zeros((p, p)),  # sum of x_i * x_j
+        "last_id": np.int64(0),  # highest patients.id folded in (see sync_aggregates)
+    }
+
+def _class_codes(df: pd.DataFrame) -> np.ndarray:
+    """Index into CLASSES per row: dataset label, else DB outcome (1/0), else unlabelled."""
+    codes = np.full(len(df), CLASSES.index("unlabelled"))
+    if "dataset" in df.columns:
+        labels = df["dataset"].astype(object).to_numpy()
+        codes[labels == "liver_disease"] = CLASSES.index("liver_disease")
+        codes[labels == "healthy"] = CLASSES.index("healthy")
+    elif "outcome" in df.columns:
+        outcome = pd.to_numeric(df["outcome"], errors="coerce").to_numpy()
+        codes[outcome == 1] = CLASSES.index("liver_disease")
+        codes[outcome == 0] = CLASSES.index("healthy")
+    return codes
+
+def _feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    return np.column_stack([
+        pd.to_numeric(df[f], errors="coerce").to_numpy(dtype=float, na_value=np.nan) if f in df.columns
+        else np.full(len(df), np.nan)
+        for f in FEATURES
+    ])
+
+def add_rows(agg: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    """Fold a normalized frame (see data_loader.normalize_frame) into agg in place."""
+    if not len(df):
+        return agg
+    codes = _class_codes(df)
+    n_classes = len(CLASSES)
+    X = _feature_matrix(df)
+    present = ~np.isnan(X)
+
+    agg["rows"] += np.bincount(codes, minlength=n_classes)
+    for j in range(len(FEATURES)):
+        ok = present[:, j]
+        bins = np.clip(np.searchsorted(agg["edges"][j], X[ok, j], side="right") - 1, 0, N_BINS - 1)
+        agg["hist"][j] += np.bincount(codes[ok] * N_BINS + bins, minlength=n_classes * N_BINS).reshape(n_classes, N_BINS)
+        agg["missing"][j] += np.bincount(codes[~ok], minlength=n_classes)
+
+    M = present.astype(float)
+    Xz = np.where(present, X, 0.0)
+    agg["pair_n"] += M.T @ M
+    agg["pair_sx"] += Xz.T @ M
+    agg["pair_sxx"] += (Xz ** 2).T @ M
+    agg["pair_sxy"] += Xz.T @ Xz
+
+    flags = rule_flags(df).to_numpy()
+    for c in range(n_classes):
+        agg["rule_counts"][:, c] += flags[codes == c].sum(axis=0)
+    return agg
+
+def build_aggregates(path: str = None, chunksize: int = 100_000) -> Dict[str, Any]:
+    """Aggregates for a CSV, streamed chunk by chunk (one chunk in memory at a time)."""
+    agg = empty_aggregates()
+    for chunk in iter_chunks(path or DATA_FILE, chunksize):
+        add_rows(agg, chunk)
+    return agg
+
+def save_aggregates(agg: Dict[str, Any], path: str = None) -> str:
+    path = path or AGGREGATES_FILE
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    meta = {"version": agg["version"], "features": FEATURES, "classes": CLASSES, "rules": [r["name"] for r in RULES]}
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp, meta=json.dumps(meta), **{k: v for k, v in agg.items() if k != "version"})
+    os.replace(tmp, path)
+    return path
+
+def load_aggregates(path: str = None) -> Dict[str, Any]:
+    """Stored aggregates, or None if the file is missing or from another AGG_VERSION/layout."""
+    path = path or AGGREGATES_FILE
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        if (meta["version"] != AGG_VERSION or meta["features"] != FEATURES or meta["classes"] != CLASSES
+                or meta["rules"] != [r["name"] for r in RULES]):
+            return None
+        agg = {k: data[k] for k in data.files if k != "meta"}
+    agg["version"] = meta["version"]
+    return agg
+
+def sync_aggregates(store, path: str = None, batch_size: int = 10_000) -> int:
+    """
+    Fold patients inserted since the stored id watermark (db.PatientStore.iter_since)
+    into the stored aggregates. Does nothing if no aggregates have been
+    precomputed. Statistics and watermark are saved together atomically, so a
+    concurrent sync in another process can at worst redo work, never lose or
+    double-count rows. Returns the number of patients folded in.
+    """
+    with _file_lock:
+        agg = load_aggregates(path)
+        if agg is None:
+            return 0
+        added, batch = 0, []
+        for row in store.iter_since(int(agg["last_id"]), batch_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                added += _add_patients(agg, batch)
+                batch = []
+        added += _add_patients(agg, batch)
+        if added:
+            save_aggregates(agg, path)
+    return added
+
+def _add_patients(agg: Dict[str, Any], rows) -> int:
+    if not rows:
+        return 0
+    df = normalize_frame(pd.DataFrame(rows).rename(columns={"ag_ratio": "albumin_and_globulin_ratio"}))
+    add_rows(agg, df)
+    agg["last_id"] = np.int64(rows[-1]["id"])
+    return len(rows)
+
+def _class_mask(classes) -> np.ndarray:
+    classes = CLASSES if classes is None else ([classes] if isinstance(classes, str) else list(classes))
+    return np.isin(CLASSES, classes)
+
+def histogram(agg: Dict[str, Any], feature: str, classes=None):
+    """(bin edges, counts) for a feature over the given class name(s) (default: all)."""
+    j = FEATURES.index(feature)
+    return agg["edges"][j], agg["hist"][j][_class_mask(classes)].sum(axis=0)
+
+def quantiles(agg: Dict[str, Any], feature: str, qs=(0.05, 0.25, 0.5, 0.75, 0.95), classes=None) -> np.ndarray:
+    """Quantiles interpolated within histogram bins (accurate to one bin width)."""
+    edges, counts = histogram(agg, feature, classes)
+    total = counts.sum()
+    if total == 0:
+        return np.full(len(qs), np.nan)
+    cum = np.concatenate([[0], np.cumsum(counts)]) / total
+    return np.interp(qs, cum, edges)
+
+def feature_summary(agg: Dict[str, Any], classes=None) -> pd.DataFrame:
+    """count, missing, mean and quantiles per feature."""
+    mask = _class_mask(classes)
+    rows = []
+    for j, f in enumerate(FEATURES):
+        edges, counts = histogram(agg, f, classes)
+        centers = (edges[:-1] + edges[1:]) / 2
+        n = counts.sum()
+        p5, p25, p50, p75, p95 = quantiles(agg, f, classes=classes)
+        rows.append({
+            "feature": f,
+            "count": int(n),
+            "missing": int(agg["missing"][j][mask].sum()),
+            # exact for all classes (running sums), bin-centre approximation per class
+            "mean": agg["pair_sx"][j, j] / agg["pair_n"][j, j] if classes is None and agg["pair_n"][j, j]
+                    else (counts @ centers / n if n else np.nan),
+            "p5": p5, "p25": p25, "median": p50, "p75": p75, "p95": p95,
+        })
+    return pd.DataFrame(rows).set_index("feature")
+
+def correlation(agg: Dict[str, Any]) -> pd.DataFrame:
+    """Pearson correlation over pairwise-complete rows (same as DataFrame.corr())."""
+    n, sx, sxx, sxy = agg["pair_n"], agg["pair_sx"], agg["pair_sxx"], agg["pair_sxy"]
+    sy, syy = sx.T, sxx.T  # sums of x_j / x_j^2 over the same rows
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+    return pd.DataFrame(np.clip(corr, -1, 1), index=FEATURES, columns=FEATURES)
+
+def rule_rates(agg: Dict[str, Any]) -> pd.DataFrame:
+    """Share of patients triggering each clinical rule, per class and overall."""
+    counts = agg["rule_counts"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = counts / agg["rows"]
+        overall = counts.sum(axis=1) / agg["rows"].sum()
+    df = pd.DataFrame(rates, index=[r["name"] for r in RULES], columns=CLASSES)
+    df["all"] = overall
+    return df
@@ -1,12 +1,5 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from sklearn.svm import SVC
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from imblearn.over_sampling import SMOTE
-from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
+import numpy as np
 import os
 import sys
 
@@ -17,14 +10,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # TEAM MODULE IMPORTS (The "Integration" Part)
 # -----------------------------------------------------------------------------
 try:
-    from src.config import DATA_FILE
-    from src.db import init_db, save_patient, get_validated_patients # Mocked imports matching structure
+    from src.config import AGGREGATES_FILE, DATA_FILE, METRICS_FILE
+    from src.db import PatientStore, create_db
     from src.clinical_rules import get_warnings
     from src.ui.ui_theme_config import apply_theme # Mocked
 except ImportError:
     # Fallback if running standalone for testing
     pass
 
+# Heavy modules (pandas, plotly, sklearn via training or unpickling, the
+# aggregates helpers) are imported inside the pages that use them so the app
+# starts quickly.
+from src import instrumentation
+from src.evaluation import load_metrics, metrics_path, roc_from_metrics, save_metrics, update_from_db
+from src.model_registry import load_model_info, load_or_train
+from src.predictor import predict_risk
+
 # -----------------------------------------------------------------------------
 # CORE LOGIC (Purnendu's Work)
 # -----------------------------------------------------------------------------
@@ -32,42 +33,99 @@ except ImportError:
 @st.cache_resource
 def load_and_train_model():
     """
-    Loads data, balances classes with SMOTE, scales features, and trains the SVM.
-    Returns: model, scaler, test_data (X_test, y_test)
+    Loads the persisted model artifact (SMOTE + scaler + SVM) from the model
+    registry. Training only happens when no artifact exists for the current
+    data file hash and hyperparameters (see scripts/train_model.py).
+    Unpickles sklearn: only pages that need the fitted model call this.
+    Returns: artifact dict (model, scaler, key, ...) or None
     """
-    # Load Data (Simulating Srija's Loader)
     try:
-        data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'indian_liver_patient.csv')
-        df = pd.read_csv(data_path)
-    except:
+        with instrumentation.timed("app.load_model"):
+            return load_or_train()
+    except FileNotFoundError:
         st.error("Dataset not found. Please ensure 'data/indian_liver_patient.csv' exists.")
-        return None, None, None, None
+        return None
 
-    # Preprocessing
-    df = df.fillna(df.mean(numeric_only=True))
-    df['Gender'] = df['Gender'].apply(lambda x: 1 if x == 'Male' else 0)
-    df['Dataset'] = df['Dataset'].map({1: 1, 2: 0}) # 1=Disease, 0=Healthy
+@st.cache_resource
+def load_model_metadata():
+    """
+    Key, features, fill values and scaler stats of the model artifact, read
+    from its JSON sidecar (model_registry.load_model_info). Predictions go
+    through the NumPy export, so the default path never unpickles sklearn.
+    Falls back to the full artifact when it has to be trained first.
+    Returns: dict (key, features, scaler, ...) or None
+    """
+    try:
+        with instrumentation.timed("app.load_model_info"):
+            info = load_model_info()
+    except FileNotFoundError:
+        st.error("Dataset not found. Please ensure 'data/indian_liver_patient.csv' exists.")
+        return None
+    return info if info is not None else load_and_train_model()
 
-    X = df.drop('Dataset', axis=1)
-    y = df['Dataset']
+@st.cache_resource
+def load_inference_kernel(model_key):
+    """NumPy-only SVC export for the artifact (src/svm_kernel.py), or None for other backends."""
+    from src.svm_kernel import kernel_path, load_kernel
+    path = kernel_path(model_key)
+    return load_kernel(path) if os.path.exists(path) else None
 
-    # Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+@st.cache_resource
+def get_explainer(model_key):
+    """Per-feature contributions for the model's predictions (src/explain.py), built at training time."""
+    from src.explain import Explainer, explain_path, load_or_build
+    try:
+        explainer = Explainer.load(explain_path(model_key))  # SVC explainers need only the .npz
+    except ValueError:
+        explainer = None  # model-based explainers need the fitted model
+    return explainer if explainer is not None else load_or_build(load_and_train_model())
 
-    # SMOTE (Critical Step)
-    smote = SMOTE(random_state=42)
-    X_res, y_res = smote.fit_resample(X_train, y_train)
+@st.cache_resource
+def get_patient_store():
+    """Creates/migrates the patients DB once per process and shares a pooled store."""
+    create_db()
+    return PatientStore()
 
-    # Scaling
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_res)
-    X_test_scaled = scaler.transform(X_test)
+@st.cache_resource
+def get_similarity_index(model_key):
+    """Persisted similar-patient index for the model (src/similarity.py), caught up with the DB."""
+    from src.similarity import load_or_build
+    index = load_or_build(load_model_metadata(), get_patient_store())
+    index.start_autosave()
+    return index
+
+@st.cache_resource
+def get_drift_monitor(model_key):
+    """Persisted input drift sketches for the model (src/drift.py)."""
+    from src.drift import load_or_build
+    return load_or_build(load_model_metadata())
+
+@st.cache_resource
+def get_write_queue():
+    """Background writer so saving a prediction never blocks the page (src/write_queue.py)."""
+    from src.write_queue import WriteBehindQueue
+    return WriteBehindQueue(get_patient_store())
 
-    # SVM Training
-    model = SVC(kernel='rbf', probability=True, random_state=42)
-    model.fit(X_train_scaled, y_res)
+@st.cache_data
+def build_analytics_figures(model_key, metrics_version, _metrics):
+    """Plotly figures for stored metrics; rebuilt only when metrics_version changes."""
+    import plotly.express as px
+    import plotly.graph_objects as go
 
-    return model, scaler, X_test_scaled, y_test
+    fig_cm = px.imshow(_metrics["confusion"], text_auto=True, color_continuous_scale='Blues',
+                       labels=dict(x="Predicted", y="Actual"))
+
+    fpr, tpr, roc_auc = roc_from_metrics(_metrics)
+    fig_roc = go.Figure()
+    fig_roc.add_trace(go.Scatter(x=fpr, y=tpr, name=f'AUC = {roc_auc:.2f}'))
+    fig_roc.add_trace(go.Scatter(x=[0,1], y=[0,1], line=dict(dash='dash'), name='Random'))
+    return fig_cm, fig_roc
+
+@st.cache_data
+def load_population_aggregates(path, mtime_ns):
+    """Precomputed aggregates (scripts/run_pipeline.py); reloaded when the file changes."""
+    from src.aggregates import load_aggregates
+    return load_aggregates(path)
 
 def main():
     st.set_page_config(page_title="HepaGuard AI | Enterprise Edition", layout="wide", page_icon="🏥")
@@ -75,15 +133,18 @@ def main():
     # 1. Init Database
     # init_db() 
     
-    # 2. Load Model
-    model, scaler, X_test, y_test = load_and_train_model()
-    if model is None: return
+    # 2. Load Model (metadata + scaler stats; the fitted model is loaded on demand)
+    artifact = load_model_metadata()
+    if artifact is None: return
 
     # 3. Sidebar Navigation
     st.sidebar.image("https://cdn-icons-png.flaticon.com/512/3004/3004458.png", width=50)
     st.sidebar.title("HepaGuard AI")
     st.sidebar.caption("System Architect: Purnendu")
-    app_mode = st.sidebar.radio("Module Selection", ["New Prediction", "Model Analytics", "Patient Records"])
+    modes = ["New Prediction", "Model Analytics", "Population Insights", "Patient Records"]
+    if st.query_params.get("diagnostics") == "1":  # hidden page: open the app with ?diagnostics=1
+        modes.append("Diagnostics")
+    app_mode = st.sidebar.radio("Module Selection", modes)
     st.sidebar.markdown("---")
 
     # -------------------------------------------------------------------------
@@ -116,22 +177,43 @@ def main():
         if st.button("🚀 Analyze Risk Probability"):
             # Prepare Input
             gen_val = 1 if gender == 'Male' else 0
-            input_vector = pd.DataFrame([[age, gen_val, tb, db, alp, alt, ast, prot, alb, ag]], 
-                                      columns=['Age', 'Gender', 'Total_Bilirubin', 'Direct_Bilirubin', 
-                                               'Alkaline_Phosphotase', 'Alamine_Aminotransferase',
-                                               'Aspartate_Aminotransferase', 'Total_Protiens', 
-                                               'Albumin', 'Albumin_and_Globulin_Ratio'])
+            # one row in artifact["features"] order (age, gender, total_bilirubin, ...)
+            input_vector = np.array([[age, gen_val, tb, db, alp, alt, ast, prot, alb, ag]], dtype=float)
             
-            # Scale & Predict
-            input_scaled = scaler.transform(input_vector)
-            prob = model.predict_proba(input_scaled)[0][1]
-            pred = model.predict(input_scaled)[0]
+            # Scale & Predict (the exported kernel has the scaler folded in)
+            kernel = load_inference_kernel(artifact["key"])
+            with instrumentation.timed("app.predict"):
+                if kernel is not None:
+                    result = kernel.predict_risk(input_vector)
+                else:
+                    result = predict_risk(load_and_train_model()["model"], artifact["scaler"].transform(input_vector))
+            prob, pred = result["probability"][0], result["label"][0]
+
+            # Why: per-feature contributions against the training background
+            explainer = get_explainer(artifact["key"])
+            with instrumentation.timed("app.explain"):
+                explanation = explainer.explain(input_vector)
+
+            # Past patients closest to this one (before this prediction is stored)
+            similar_index = get_similarity_index(artifact["key"])
+            similar_index.sync(get_patient_store())  # saved by its autosave thread, not on the click path
+            similar = similar_index.query(input_vector[0], k=5)
+
+            # Persist in the background (batched with other sessions' predictions)
+            get_write_queue().submit({
+                "name": name, "disease_prob": float(prob), "risk_label": "High Risk" if pred else "Low Risk",
+                "age": age, "gender": gen_val, "total_bilirubin": tb, "direct_bilirubin": db,
+                "alkaline_phosphotase": alp, "alamine_aminotransferase": alt, "aspartate_aminotransferase": ast,
+                "total_protiens": prot, "albumin": alb, "ag_ratio": ag, "model_key": artifact["key"],
+            })
             
             # Display Results
             st.divider()
             r1, r2 = st.columns([1, 2])
             
             with r1:
+                import pandas as pd
+                import plotly.graph_objects as go
                 fig = go.Figure(go.Indicator(
                     mode = "gauge+number",
                     value = prob * 100,
@@ -139,20 +221,42 @@ def main():
                     gauge = {'axis': {'range': [None, 100]}, 'bar': {'color': "#ff4b4b" if prob > 0.5 else "#4ecdc4"}}
                 ))
                 st.plotly_chart(fig, use_container_width=True)
+
+                st.markdown("#### 👥 Similar Past Patients")
+                df_similar = pd.DataFrame(similar)
+                df_similar["outcome"] = df_similar["outcome"].map({1: "Liver Disease", 0: "Healthy", -1: "Pending"})
+                st.dataframe(df_similar[["outcome", "distance", "age", "total_bilirubin", "alamine_aminotransferase",
+                                         "albumin", "source", "ref"]].round(2), hide_index=True)
                 
             with r2:
-                if prob > 0.6:
+                if pred:
                     st.error(f"### ⚠️ HIGH RISK DETECTED ({prob*100:.1f}%)")
                     st.markdown("The SVM model indicates a strong likelihood of liver pathology.")
                 else:
                     st.success(f"### ✅ LOW RISK ({prob*100:.1f}%)")
                     st.markdown("Biomarkers appear within safe operational ranges.")
                     
-                # Clinical Logic Injection (Simulating src.clinical_rules)
+                st.markdown("#### 🔍 What Drives This Prediction:")
+                st.caption(f"Percentage points each value adds to (or removes from) the "
+                           f"{explainer.base_probability * 100:.1f}% average risk of the training patients.")
+                df_why = pd.DataFrame(explainer.top_features(explanation, k=len(explainer.features)),
+                                      columns=["feature", "contribution", "score"])
+                df_why["value"] = input_vector[0][[explainer.features.index(f) for f in df_why["feature"]]]
+                df_why["contribution"] *= 100
+                fig_why = go.Figure(go.Bar(
+                    x=df_why["contribution"][::-1], y=df_why["feature"][::-1], orientation="h",
+                    marker_color=["#ff4b4b" if c > 0 else "#4ecdc4" for c in df_why["contribution"][::-1]],
+                    customdata=df_why["value"][::-1], hovertemplate="%{y} = %{customdata}<br>%{x:+.1f} pts<extra></extra>"))
+                fig_why.update_layout(height=320, margin=dict(l=0, r=0, t=10, b=0), xaxis_title="Risk points")
+                st.plotly_chart(fig_why, use_container_width=True)
+
+                # Clinical Logic Injection (src.clinical_rules)
                 st.markdown("#### 🩺 Clinical Insights:")
-                if tb > 1.2: st.warning("- **Total Bilirubin** is elevated (>1.2). Possible Jaundice.")
-                if alt > 50: st.warning("- **ALT** is elevated. Liver inflammation indicated.")
-                if alb < 3.5: st.warning("- **Albumin** is low. Synthetic function impaired.")
+                warnings = get_warnings(dict(zip(explainer.features, input_vector[0])))
+                for warning in warnings:
+                    st.warning(f"- {warning}")
+                if not warnings:
+                    st.info("No biomarker is outside its reference range.")
 
     # -------------------------------------------------------------------------
     # MODULE B: MODEL ANALYTICS
@@ -160,35 +264,124 @@ def main():
     elif app_mode == "Model Analytics":
         st.title("📊 SVM Model Performance Audit")
         
-        y_pred = model.predict(X_test)
+        # Metrics are computed once per model version at training time; only
+        # outcomes recorded since the last visit are folded in here.
+        metrics = load_metrics(artifact if os.path.exists(metrics_path(artifact["key"])) else load_and_train_model())
+        if update_from_db(metrics, get_patient_store(), artifact["key"]):
+            save_metrics(metrics, artifact["key"])
+        st.caption(f"Held-out test set: {metrics['n_test']} patients | "
+                   f"confirmed outcomes from the database: {metrics['n_live']}")
+        fig_cm, fig_roc = build_analytics_figures(artifact["key"], (metrics["n_live"], metrics["watermark"]), metrics)
         
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Confusion Matrix")
-            cm = confusion_matrix(y_test, y_pred)
-            fig_cm = px.imshow(cm, text_auto=True, color_continuous_scale='Blues',
-                               labels=dict(x="Predicted", y="Actual"))
             st.plotly_chart(fig_cm)
             
         with col2:
             st.subheader("ROC Curve")
-            y_prob = model.predict_proba(X_test)[:, 1]
-            fpr, tpr, _ = roc_curve(y_test, y_prob)
-            roc_auc = auc(fpr, tpr)
-            
-            fig_roc = go.Figure()
-            fig_roc.add_trace(go.Scatter(x=fpr, y=tpr, name=f'AUC = {roc_auc:.2f}'))
-            fig_roc.add_trace(go.Scatter(x=[0,1], y=[0,1], line=dict(dash='dash'), name='Random'))
             st.plotly_chart(fig_roc)
 
+        # Incoming lab values vs the training data (sliding window of recent patients)
+        from src.drift import drift_path
+        st.subheader("Input Drift")
+        monitor = get_drift_monitor(artifact["key"])
+        if monitor.sync(get_patient_store()):
+            monitor.save(drift_path(artifact["key"]), artifact["key"])
+        drift = monitor.scores()
+        drifted = drift.index[drift["drift"]].tolist()
+        if drifted:
+            st.warning(f"⚠️ Input drift detected in: {', '.join(drifted)}. "
+                       "Recent patients no longer look like the training data; consider retraining.")
+        elif drift["window_n"].max() == 0:
+            st.info("No patients recorded yet to compare with the training data.")
+        else:
+            st.success(f"No significant drift over the last {int(drift['window_n'].max())} patients.")
+        st.dataframe(drift[["psi", "ks", "ks_critical", "mean_shift", "ref_mean", "window_mean", "window_n", "drift"]]
+                     .round(3))
+
     # -------------------------------------------------------------------------
-    # MODULE C: DATABASE HISTORY
+    # MODULE C: POPULATION INSIGHTS (precomputed aggregates, O(bins))
+    # -------------------------------------------------------------------------
+    elif app_mode == "Population Insights":
+        st.title("📈 Population Insights")
+        import plotly.express as px
+        import plotly.graph_objects as go
+        from src.aggregates import (CLASSES, FEATURES, correlation, feature_summary, histogram, rule_rates,
+                                    sync_aggregates)
+
+        if not os.path.exists(AGGREGATES_FILE):
+            st.info("No aggregates yet. Run scripts/run_pipeline.py to precompute them.")
+            return
+        # fold in patients saved since the last visit (off the insert path; a no-op when nothing is new)
+        sync_aggregates(get_patient_store(), AGGREGATES_FILE)
+        agg = load_population_aggregates(AGGREGATES_FILE, os.stat(AGGREGATES_FILE).st_mtime_ns)
+        if agg is None:
+            st.warning("Aggregates are out of date. Re-run scripts/run_pipeline.py.")
+            return
+        st.caption(" | ".join(f"{c}: {int(n)}" for c, n in zip(CLASSES, agg["rows"])))
+
+        feature = st.selectbox("Feature", FEATURES, index=FEATURES.index("total_bilirubin"))
+        fig_hist = go.Figure()
+        for cls in CLASSES:
+            edges, counts = histogram(agg, feature, cls)
+            if counts.sum():
+                fig_hist.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=edges[1:] - edges[:-1], name=cls))
+        fig_hist.update_layout(barmode="overlay", xaxis_title=feature, yaxis_title="patients")
+        fig_hist.update_traces(opacity=0.6)
+        st.plotly_chart(fig_hist, use_container_width=True)
+        st.dataframe(feature_summary(agg).round(2))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Correlation Matrix")
+            st.plotly_chart(px.imshow(correlation(agg).round(2), text_auto=True, color_continuous_scale="RdBu_r",
+                                      zmin=-1, zmax=1))
+        with col2:
+            st.subheader("Clinical Rule Trigger Rates")
+            st.dataframe((rule_rates(agg) * 100).round(1).rename(columns=lambda c: f"{c} (%)"))
+
+    # -------------------------------------------------------------------------
+    # MODULE D: DATABASE HISTORY
     # -------------------------------------------------------------------------
     elif app_mode == "Patient Records":
         st.title("🗄️ Secure Database Records")
-        st.info("Start Database Service to view records.")
-        # df_hist = get_all_patients()
-        # st.dataframe(df_hist)
+        import pandas as pd
+        store = get_patient_store()
+        total = store.count_patients()
+        if total == 0:
+            st.info("No patient records saved yet.")
+            return
+
+        page_size = 50
+        pages = -(-total // page_size)
+        page = st.number_input(f"Page (of {pages})", 1, pages, 1)
+        st.caption(f"{total} records, newest first")
+        df_hist = pd.DataFrame(store.page_patients(page=page, page_size=page_size))
+        df_hist["disease_prob"] = (df_hist["disease_prob"] * 100).round(1)
+        st.dataframe(df_hist.rename(columns={"disease_prob": "disease_prob (%)"}))
+
+    # -------------------------------------------------------------------------
+    # HIDDEN: DIAGNOSTICS (stage latencies from src.instrumentation)
+    # -------------------------------------------------------------------------
+    elif app_mode == "Diagnostics":
+        st.title("⏱️ Diagnostics")
+        if not instrumentation.is_enabled():
+            st.info("Instrumentation is off. Start the app with METRICS_ENABLED=1 to record stage latencies.")
+        snap = instrumentation.snapshot()
+        if snap["stages"]:
+            import pandas as pd
+            df_stages = pd.DataFrame(snap["stages"]).T
+            for c in ("mean_s", "p50_s", "p95_s", "p99_s", "max_s"):
+                df_stages[c.replace("_s", " (ms)")] = df_stages[c].astype(float) * 1000
+            st.dataframe(df_stages[["count", "mean (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "max (ms)"]].round(3))
+        if snap["counters"]:
+            st.json(snap["counters"])
+        c1, c2 = st.columns(2)
+        if c1.button("Export JSON"):
+            st.success(f"Written to {instrumentation.export_json(METRICS_FILE)}")
+        if c2.button("Reset"):
+            instrumentation.reset()
 
 if __name__ == "__main__":
     main()
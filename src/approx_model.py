@@ -0,0 +1,133 @@
+"""
+Approximate-kernel classifier for large training sets.
+
+Kernel SVC training grows roughly quadratically to cubically with the number
+of rows and its inference cost grows with the support vector count. Here the
+RBF kernel is approximated by an explicit feature map (Nystroem landmarks or
+random Fourier features) followed by a linear logistic SGD model fitted in
+mini-batches with partial_fit, so training is linear in rows and inference
+costs O(n_components) per row regardless of the training set size.
+Once fitted, the feature map and linear model are applied in plain NumPy:
+sklearn's per-call input validation costs more than the maths for single rows.
+"""
+from typing import Any, Dict
+
+import numpy as np
+
+# Defaults for the approximate backends (merged by model_registry.resolve_params)
+APPROX_PARAMS = {
+    "n_components": 300,
+    "alpha": 1e-4,
+    "batch_size": 10_000,
+    "epochs": 5,
+}
+
+BACKENDS = ("svc", "nystroem", "rff")
+
+class ApproxKernelClassifier:
+    """
+    Kernel feature map + SGDClassifier(loss="log_loss") with the classifier
+    interface predict_risk and evaluation use (classes_, decision_function,
+    probability_from_score, predict_proba, predict).
+    - method: "nystroem" or "rff" (sklearn RBFSampler)
+    - gamma: RBF gamma; "scale" uses 1 / (n_features * X.var()) like SVC
+    """
+
+    def __init__(self, method: str = "nystroem", gamma="scale", n_components: int = 300, alpha: float = 1e-4,
+                 batch_size: int = 10_000, epochs: int = 5, random_state: int = None):
+        if method not in ("nystroem", "rff"):
+            raise ValueError(f"Unknown approximate kernel method: {method}")
+        self.method = method
+        self.gamma = gamma
+        self.n_components = n_components
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.random_state = random_state
+
+    def _gamma(self, X: np.ndarray) -> float:
+        if self.gamma == "scale":
+            return 1.0 / (X.shape[1] * X.var())
+        if self.gamma == "auto":
+            return 1.0 / X.shape[1]
+        return float(self.gamma)
+
+    def fit(self, X, y):
+        from sklearn.kernel_approximation import Nystroem, RBFSampler
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        gamma = self._gamma(X)
+        if self.method == "nystroem":
+            self.feature_map_ = Nystroem(gamma=gamma, n_components=min(self.n_components, len(X)),
+                                         random_state=self.random_state)
+        else:
+            self.feature_map_ = RBFSampler(gamma=gamma, n_components=self.n_components,
+                                           random_state=self.random_state)
+        self.feature_map_.fit(X)
+        if self.method == "nystroem":
+            self._sq_norms = (self.feature_map_.components_ ** 2).sum(axis=1)
+
+        self.classes_ = np.unique(y)
+        self.classifier_ = self._new_classifier()
+        rng = np.random.default_rng(self.random_state)
+        for _ in range(self.epochs):
+            self._fit_batches(X, y, rng)
+        return self
+
+    def partial_fit(self, X, y):
+        """One more pass over new rows with the already fitted feature map (call fit first)."""
+        self._fit_batches(np.asarray(X, dtype=np.float64), np.asarray(y), np.random.default_rng(self.random_state))
+        return self
+
+    def _new_classifier(self):
+        from sklearn.linear_model import SGDClassifier
+        return SGDClassifier(loss="log_loss", alpha=self.alpha, random_state=self.random_state)
+
+    def _fit_batches(self, X: np.ndarray, y: np.ndarray, rng):
+        order = rng.permutation(len(X))
+        for start in range(0, len(X), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            self.classifier_.partial_fit(self.transform(X[idx]), y[idx], classes=self.classes_)
+
+    def transform(self, X) -> np.ndarray:
+        """Kernel feature map (same result as feature_map_.transform)."""
+        X = np.asarray(X, dtype=np.float64)
+        fm = self.feature_map_
+        if self.method == "nystroem":
+            sq_dist = (X ** 2).sum(axis=1)[:, None] - 2 * X @ fm.components_.T + self._sq_norms
+            return np.exp(-fm.gamma * np.maximum(sq_dist, 0)) @ fm.normalization_.T
+        projection = X @ fm.random_weights_ + fm.random_offset_
+        return np.cos(projection, out=projection) * np.sqrt(2.0 / fm.n_components)
+
+    def decision_function(self, X) -> np.ndarray:
+        return self.transform(X) @ self.classifier_.coef_[0] + self.classifier_.intercept_[0]
+
+    def probability_from_score(self, score: np.ndarray) -> np.ndarray:
+        """P(classes_[1]) from decision_function values (the log-loss sigmoid)."""
+        return 1.0 / (1.0 + np.exp(-np.asarray(score, dtype=float)))
+
+    def predict_proba(self, X) -> np.ndarray:
+        p1 = self.probability_from_score(self.decision_function(X))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+def make_model(params: Dict[str, Any], probability: bool = True):
+    """
+    Unfitted estimator for resolved params (see model_registry.resolve_params).
+    probability=False skips SVC's Platt calibration (e.g. for CV scoring).
+    """
+    backend = params.get("backend", "svc")
+    if backend == "svc":
+        from sklearn.svm import SVC
+        model = SVC(kernel=params["kernel"], C=params["C"], gamma=params["gamma"], random_state=params["random_state"])
+        if probability:
+            model.set_params(probability=True)  # passing it at all is deprecated in newer sklearn
+        return model
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend} (expected one of {BACKENDS})")
+    return ApproxKernelClassifier(backend, gamma=params["gamma"], n_components=params["n_components"],
+                                  alpha=params["alpha"], batch_size=params["batch_size"],
+                                  epochs=params["epochs"], random_state=params["random_state"])
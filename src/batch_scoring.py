@@ -0,0 +1,78 @@
+"""
+Bulk scoring of lab exports.
+
+score_batch() scores a DataFrame in one vectorized pass; score_csv() streams a
+CSV of any size through it in fixed-size chunks, so memory is bounded by the
+chunk size rather than the file size.
+"""
+import os
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from .clinical_rules import evaluate_rules
+from .data_loader import _map_gender, _normalize_columns
+from .model_registry import load_or_train
+from .predictor import predict_risk
+
+DEFAULT_CHUNKSIZE = 10_000
+
+def feature_matrix(df: pd.DataFrame, artifact: Dict[str, Any]) -> np.ndarray:
+    """Build the model input matrix (artifact feature order) from a normalized frame."""
+    features = artifact["features"]
+    missing = [c for c in features if c not in df.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {missing}")
+
+    X = pd.DataFrame(index=df.index)
+    for c in features:
+        if c == "gender":
+            X[c] = _map_gender(df[c]).astype(float)
+        else:
+            X[c] = pd.to_numeric(df[c], errors="coerce")
+    X = X.fillna(artifact["fill_values"])
+    return X.to_numpy(dtype=float)
+
+def score_batch(df: pd.DataFrame, artifact: Dict[str, Any] = None, threshold: float = None) -> pd.DataFrame:
+    """
+    Score a frame of patients (raw or normalized column names).
+    - df: one row per patient
+    - artifact: model artifact (defaults to model_registry.load_or_train())
+    - threshold: high-risk probability cut-off (defaults to config.RISK_THRESHOLD)
+    Returns a frame aligned with df with disease_prob, prediction and warnings columns.
+    """
+    artifact = artifact or load_or_train()
+    df = _normalize_columns(df.copy())
+
+    X = artifact["scaler"].transform(feature_matrix(df, artifact))
+    result = predict_risk(artifact["model"], X, threshold)
+
+    _, messages = evaluate_rules(df)
+    warnings = ["; ".join(m) for m in messages]
+    return pd.DataFrame({"disease_prob": result["probability"], "prediction": result["label"],
+                         "warnings": warnings}, index=df.index)
+
+def score_csv(input_path: str, output_path: str, artifact: Dict[str, Any] = None,
+              chunksize: int = DEFAULT_CHUNKSIZE, threshold: float = None) -> Dict[str, float]:
+    """
+    Stream input_path through score_batch() chunk by chunk and append the
+    input columns plus scores to output_path (CSV).
+    Returns dict with rows, seconds and rows_per_sec.
+    """
+    artifact = artifact or load_or_train()
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+
+    rows = 0
+    start = time.perf_counter()
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        scored = chunk.join(score_batch(chunk, artifact, threshold))
+        scored.to_csv(output_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows += len(chunk)
+    seconds = time.perf_counter() - start
+
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0}
@@ -1,3 +1,12 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .instrumentation import timed
+
+if TYPE_CHECKING:  # pandas is only needed by the columnar functions
+    import pandas as pd
+
 # MEDICAL THRESHOLDS (Source: Standard Ranges)
 # Keys are in normalized (lower_case_with_underscores) form.
 NORMAL_RANGES = {
@@ -9,9 +18,82 @@ NORMAL_RANGES = {
     "albumin": (3.5, 5.5),
 }
 
+# PHYSICALLY PLAUSIBLE BOUNDS, for data validation rather than diagnosis:
+# values outside these are almost certainly entry or unit errors.
+PHYSICAL_BOUNDS = {
+    "age": (0, 120),  # years
+    "total_bilirubin": (0, 100),  # mg/dL
+    "direct_bilirubin": (0, 50),
+    "alkaline_phosphotase": (0, 5000),  # U/L
+    "alamine_aminotransferase": (0, 10000),
+    "aspartate_aminotransferase": (0, 10000),
+    "total_protiens": (0, 20),  # g/dL
+    "albumin": (0, 10),
+    "albumin_and_globulin_ratio": (0, 10),
+}
+
+# WARNING RULES, declared as data and evaluated in this order.
+# - column: measurement to test (normalized key)
+# - denominator: optional second column; the rule then tests column / denominator
+#   (skipped when the denominator is 0)
+# - direction: "above" (value > threshold) or "below" (value < threshold)
+RULES = [
+    {
+        "name": "high_bilirubin",  # Jaundice
+        "column": "total_bilirubin",
+        "direction": "above",
+        "threshold": NORMAL_RANGES["total_bilirubin"][1],
+        "message": "High Bilirubin (>1.2) - Jaundice indicated.",
+    },
+    {
+        "name": "high_alt",
+        "column": "alamine_aminotransferase",
+        "direction": "above",
+        "threshold": NORMAL_RANGES["alamine_aminotransferase"][1],
+        "message": "High ALT - Sign of liver cell damage.",
+    },
+    {
+        "name": "low_albumin",  # chronic
+        "column": "albumin",
+        "direction": "below",
+        "threshold": NORMAL_RANGES["albumin"][0],
+        "message": "Low Albumin - Possible chronic liver disease.",
+    },
+    {
+        "name": "ast_alt_ratio",
+        "column": "aspartate_aminotransferase",
+        "denominator": "alamine_aminotransferase",
+        "direction": "above",
+        "threshold": 2,
+        "message": "AST/ALT ratio > 2 - suggests alcoholic liver disease or advanced fibrosis.",
+    },
+]
+
 def _normalize_key(k: str) -> str:
     return k.strip().lower().replace(" ", "_")
 
+def _rule_value(rule: dict, normalized: dict):
+    """Value a rule tests for one patient, or None if it can't be evaluated."""
+    value = normalized.get(rule["column"])
+    if value is None:
+        return None
+    try:
+        value = float(value)
+        if "denominator" in rule:
+            denominator = normalized.get(rule["denominator"])
+            if denominator is None or float(denominator) == 0:
+                return None
+            value = value / float(denominator)
+    except (ValueError, TypeError, ZeroDivisionError):
+        return None
+    return value
+
+def _triggers(rule: dict, value):
+    if rule["direction"] == "above":
+        return value > rule["threshold"]
+    return value < rule["threshold"]
+
+@timed("rules")
 def get_warnings(patient_data: dict) -> list:
     """
     patient_data: mapping of measurements (keys normalized or original).
@@ -21,43 +103,56 @@ def get_warnings(patient_data: dict) -> list:
     normalized = { _normalize_key(k): v for k, v in patient_data.items() }
 
     warnings = []
+    for rule in RULES:
+        value = _rule_value(rule, normalized)
+        if value is not None and _triggers(rule, value):
+            warnings.append(rule["message"])
+    return warnings
+
+def _numeric_column(df: "pd.DataFrame", columns: dict, key: str) -> np.ndarray:
+    """Column as float64 (unparseable/missing -> NaN, which never triggers a rule)."""
+    import pandas as pd
+
+    if key not in columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[columns[key]], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def rule_flags(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Boolean flag matrix (rows x RULES names, same index as df) for a frame of
+    patients with normalized or original column names.
+    """
+    import pandas as pd
+
+    # last column wins on clashes, like the dict comprehension in get_warnings
+    columns = {_normalize_key(c): c for c in df.columns}
+
+    flags = np.zeros((len(df), len(RULES)), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j, rule in enumerate(RULES):
+            values = _numeric_column(df, columns, rule["column"])
+            if "denominator" in rule:
+                denominator = _numeric_column(df, columns, rule["denominator"])
+                values = np.where(denominator != 0, values / denominator, np.nan)
+            flags[:, j] = _triggers(rule, values)
+    return pd.DataFrame(flags, columns=[r["name"] for r in RULES], index=df.index)
+
+@timed("rules.batch")
+def evaluate_rules(df: "pd.DataFrame"):
+    """
+    Columnar version of get_warnings() over a whole frame (one patient per row).
+    Returns (flags, messages):
+    - flags: see rule_flags()
+    - messages: list with one list of warning strings per row, identical to get_warnings(row)
+    """
+    flags = rule_flags(df)
+
+    # build the message list for each distinct combination of triggered rules once,
+    # then copy it per row
+    # (one bit per rule in an int64, so up to 63 rules)
+    codes = flags.to_numpy().astype(np.int64) @ (1 << np.arange(len(RULES), dtype=np.int64))
+    combos, inverse = np.unique(codes, return_inverse=True)
+    templates = [[r["message"] for j, r in enumerate(RULES) if int(code) >> j & 1] for code in combos]
+    messages = [templates[i].copy() for i in inverse.tolist()]
 
-    # Jaundice / bilirubin
-    tb = normalized.get("total_bilirubin")
-    if tb is not None:
-        try:
-            if float(tb) > NORMAL_RANGES["total_bilirubin"][1]:
-                warnings.append("High Bilirubin (>1.2) - Jaundice indicated.")
-        except (ValueError, TypeError):
-            pass
-
-    # High ALT
-    alt = normalized.get("alamine_aminotransferase")
-    if alt is not None:
-        try:
-            if float(alt) > NORMAL_RANGES["alamine_aminotransferase"][1]:
-                warnings.append("High ALT - Sign of liver cell damage.")
-        except (ValueError, TypeError):
-            pass
-
-    # Low albumin -> chronic
-    albumin = normalized.get("albumin")
-    if albumin is not None:
-        try:
-            if float(albumin) < NORMAL_RANGES["albumin"][0]:
-                warnings.append("Low Albumin - Possible chronic liver disease.")
-        except (ValueError, TypeError):
-            pass
-
-    # AST/ALT ratio (if both present)
-    ast = normalized.get("aspartate_aminotransferase")
-    if ast is not None and alt is not None:
-        try:
-            ratio = float(ast) / float(alt) if float(alt) != 0 else None
-            if ratio is not None:
-                if ratio > 2:
-                    warnings.append("AST/ALT ratio > 2 - suggests alcoholic liver disease or advanced fibrosis.")
-        except (ValueError, TypeError, ZeroDivisionError):
-            pass
-
-    return warnings
\ No newline at end of file
+    return flags, messages
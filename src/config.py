@@ -7,4 +7,28 @@ DATA_FILE = os.getenv("DATA_FILE", os.path.join(DATA_DIR, "indian_liver_patient.
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", os.path.join(REPO_ROOT, "outputs"))
 
 # Database config
-DB_PATH = os.getenv("DB_PATH", os.path.join(REPO_ROOT, "db", "app.db"))
\ No newline at end of file
+DB_PATH = os.getenv("DB_PATH", os.path.join(REPO_ROOT, "db", "app.db"))
+
+# Trained model artifacts (see src/model_registry.py)
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(REPO_ROOT, "models"))
+
+# Mode for files written through tempfile.mkstemp (created 0600): what open() would give under the umask
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+# Model backend for new artifacts: "svc", or "nystroem"/"rff" for large training sets (see src/approx_model.py)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "svc")
+
+# Probability above which a patient is labelled high risk (UI, batch scoring, service)
+RISK_THRESHOLD = float(os.getenv("RISK_THRESHOLD", "0.6"))
+
+# Cache for normalized data frames (see data_loader.load_data)
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(REPO_ROOT, ".cache"))
+
+# Precomputed dashboard aggregates (see src/aggregates.py)
+AGGREGATES_FILE = os.getenv("AGGREGATES_FILE", os.path.join(OUTPUT_DIR, "aggregates.npz"))
+
+# Stage latency instrumentation (see src/instrumentation.py); off unless set
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+METRICS_FILE = os.getenv("METRICS_FILE", os.path.join(OUTPUT_DIR, "metrics.json"))
@@ -1,40 +1,223 @@
+import hashlib
 import os
+import numpy as np
 import pandas as pd
-from .config import DATA_FILE
+from .config import CACHE_DIR, DATA_FILE
+from .instrumentation import count, timed
+
+# Bump when the schema or mappings below change so stale caches are ignored
+LOADER_VERSION = 2
+
+# Compact dtypes for the normalized columns. Integer columns are read as
+# float32 and only downcast when every value is present, integral and in
+# range (see _fitting_dtype).
+SCHEMA = {
+    "age": "int16",
+    "gender": "int8",  # 1=Male, 0=Female (mapped, see _map_gender)
+    "total_bilirubin": "float32",
+    "direct_bilirubin": "float32",
+    "alkaline_phosphotase": "int16",
+    "alamine_aminotransferase": "int16",
+    "aspartate_aminotransferase": "int16",
+    "total_protiens": "float32",
+    "albumin": "float32",
+    "albumin_and_globulin_ratio": "float32",
+    "dataset": "category",
+}
+
+MALE_VALUES = ("male", "m", "1", "true")
+DATASET_LABELS = {"1": "liver_disease", "2": "healthy", "Liver Disease": "liver_disease", "Healthy": "healthy",
+                  "liver_disease": "liver_disease", "healthy": "healthy"}
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
     return df
 
-def load_data(path: str = None, dropna: bool = False) -> pd.DataFrame:
+def _read_dtypes(raw_columns, numeric: bool = True) -> dict:
+    """
+    read_csv dtype mapping for raw (un-normalized) column names.
+    - numeric: also read the lab columns as float32 (read_csv raises on
+      non-numeric cells; without it they are parsed as inferred and coerced
+      by normalize_frame)
+    """
+    dtypes = {}
+    for c in raw_columns:
+        target = SCHEMA.get(c.strip().lower().replace(" ", "_"))
+        if target in ("category", "int8"):
+            dtypes[c] = "category"
+        elif target is not None and numeric:
+            dtypes[c] = "float32"
+    return dtypes
+
+def _map_gender(s: pd.Series) -> pd.Series:
+    """1 for male (robust to multiple forms), else 0; mapped once per distinct value."""
+    cat = s.astype("category")
+    is_male = cat.cat.categories.astype(str).str.strip().str.lower().isin(MALE_VALUES)
+    # trailing 0 is picked up by code -1 (missing), like str(nan) -> "nan" -> 0
+    male = np.append(np.asarray(is_male, dtype=np.int8), np.int8(0))
+    return pd.Series(male[cat.cat.codes.to_numpy()], index=s.index, dtype="int8")
+
+def _map_dataset(s: pd.Series) -> pd.Series:
+    cat = s.astype("category")
+    labels = cat.cat.categories.astype(str).str.strip().str.replace(r"\.0$", "", regex=True).map(DATASET_LABELS)
+    labels = np.append(np.asarray(labels, dtype=object), None)  # code -1 (missing) -> None
+    mapped = pd.Series(labels[cat.cat.codes.to_numpy()], index=s.index)
+    return mapped.astype(pd.CategoricalDtype(["liver_disease", "healthy"]))
+
+def _fitting_dtype(values: pd.Series, dtype: str) -> str:
+    """
+    dtype if the values can be cast to it losslessly. Integer targets fall back
+    to int32 for integral values out of their range and to float32 for missing
+    or fractional values (or values beyond int32).
+    """
+    if not dtype.startswith("int"):
+        return dtype
+    arr = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(arr).any() or not np.array_equal(arr, np.round(arr)):
+        return "float32"
+    if len(arr) == 0:
+        return dtype
+    lo, hi = arr.min(), arr.max()
+    for candidate in (dtype, "int32"):
+        info = np.iinfo(candidate)
+        if info.min <= lo and hi <= info.max:
+            return candidate
+    return "float32"
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize column names, map gender/dataset and apply the compact SCHEMA dtypes.
+    Works on raw CSV frames and is a no-op on frames it already normalized.
+    """
+    df = _normalize_columns(df)
+
+    # Map dataset (if present) to human-friendly labels
+    if "dataset" in df.columns:
+        df["dataset"] = _map_dataset(df["dataset"])
+
+    # Map gender to 1/0 (robust to multiple forms)
+    if "gender" in df.columns:
+        df["gender"] = _map_gender(df["gender"])
+
+    for c, dtype in SCHEMA.items():
+        if c not in df.columns or c in ("gender", "dataset"):
+            continue
+        values = pd.to_numeric(df[c], errors="coerce")
+        df[c] = values.astype(_fitting_dtype(values, dtype))
+    return df
+
+def _cache_prefix(path: str, cache_dir: str) -> str:
+    """Common prefix of every cache file for one source path."""
+    source = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}_{source}_")
+
+def _cache_path(path: str, cache_dir: str, fmt: str) -> str:
+    """Cache file keyed by source path, mtime and size (cheap to check on every load)."""
+    st = os.stat(path)
+    key = f"{st.st_mtime_ns}|{st.st_size}|{LOADER_VERSION}"
+    return f"{_cache_prefix(path, cache_dir)}{hashlib.sha256(key.encode()).hexdigest()[:8]}.{fmt}"
+
+def _remove_stale_caches(path: str, cache_dir: str, keep: str):
+    """Delete older cache files of the same source (previous mtime/size/LOADER_VERSION)."""
+    prefix = _cache_prefix(path, cache_dir)
+    for entry in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, entry)
+        if stale.startswith(prefix) and stale != keep and not entry.endswith(".tmp"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass  # another process got there first
+
+def _cache_format() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return "feather"
+    except ImportError:
+        return "pkl"
+
+def read_csv_typed(path: str, **kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv with the compact SCHEMA dtypes, returning a normalized frame.
+    Files with non-numeric lab cells are re-read with inferred lab dtypes and
+    those cells become NaN (see validation.py to report them).
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    try:
+        df = pd.read_csv(path, dtype=_read_dtypes(header), **kwargs)
+    except ValueError:
+        count("load.untyped_read")
+        df = pd.read_csv(path, dtype=_read_dtypes(header, numeric=False), **kwargs)
+    return normalize_frame(df)
+
+def iter_chunks(path: str = None, chunksize: int = 100_000, normalize: bool = True):
+    """
+    Stream a CSV in chunks with the compact SCHEMA dtypes, so only one chunk is
+    in memory at a time. Yields normalized frames (raw frames with
+    normalize=False, e.g. to validate them or normalize them in another
+    process). Lab columns are parsed as inferred, so a malformed cell only
+    becomes NaN in normalize_frame instead of failing the whole read.
+    """
+    path = path or DATA_FILE
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Data file not found: {path}")
+    header = pd.read_csv(path, nrows=0).columns
+    for chunk in pd.read_csv(path, dtype=_read_dtypes(header, numeric=False), chunksize=chunksize):
+        yield normalize_frame(chunk) if normalize else chunk
+
+@timed("load")
+def load_data(path: str = None, dropna: bool = False, use_cache: bool = True, cache_dir: str = None) -> pd.DataFrame:
     """
     Load CSV, normalize column names and map common categorical values.
     - path: path to csv (defaults to config.DATA_FILE)
     - dropna: whether to drop rows with NaNs
-    Returns a pandas DataFrame with normalized columns.
+    - use_cache: reuse/write the normalized frame in cache_dir (defaults to
+      config.CACHE_DIR) as Feather (or pickle without pyarrow)
+    Returns a pandas DataFrame with normalized columns and compact dtypes.
     """
     path = path or DATA_FILE
     if not os.path.exists(path):
         raise FileNotFoundError(f"Data file not found: {path}")
-    df = pd.read_csv(path)
-    df = _normalize_columns(df)
 
-    # Map dataset (if present) to human-friendly labels
-    if "dataset" in df.columns:
-        df["dataset"] = df["dataset"].map({1: "liver_disease", 2: "healthy", "1": "liver_disease", "2": "healthy", "Liver Disease": "liver_disease", "Healthy": "healthy"})
+    df = None
+    if use_cache:
+        cache_dir = cache_dir or CACHE_DIR
+        fmt = _cache_format()
+        cache_file = _cache_path(path, cache_dir, fmt)
+        if os.path.exists(cache_file):
+            try:
+                df = pd.read_feather(cache_file) if fmt == "feather" else pd.read_pickle(cache_file)
+            except Exception:
+                df = None  # unreadable cache: rebuild it below
+        count("load.cache_hit" if df is not None else "load.cache_miss")
 
-    # Map gender to 1/0 (robust to multiple forms)
-    if "gender" in df.columns:
-        df["gender"] = df["gender"].apply(lambda x: 1 if str(x).strip().lower() in ("male", "m", "1", "true") else 0)
+    if df is None:
+        df = read_csv_typed(path)
+        if use_cache:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{cache_file}.{os.getpid()}.tmp"
+            if fmt == "feather":
+                df.to_feather(tmp)
+            else:
+                df.to_pickle(tmp)
+            os.replace(tmp, cache_file)
+            _remove_stale_caches(path, cache_dir, cache_file)
 
     if dropna:
         df = df.dropna()
 
     return df
 
+def memory_footprint(path: str = None) -> dict:
+    """Bytes used by the CSV loaded with inferred dtypes vs the compact schema."""
+    path = path or DATA_FILE
+    before = _normalize_columns(pd.read_csv(path)).memory_usage(deep=True).sum()
+    after = load_data(path, use_cache=False).memory_usage(deep=True).sum()
+    return {"inferred_bytes": int(before), "typed_bytes": int(after)}
+
 def print_schema(df: pd.DataFrame):
     print("Columns and dtypes:")
     for c, t in df.dtypes.items():
         print(f" - {c}: {t}")
     print("\nTop 5 rows:")
-    print(df.head())
\ No newline at end of file
+    print(df.head())
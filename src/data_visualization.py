@@ -1,54 +1,223 @@
+"""
+Exploratory plots (correlation heatmap and pairplot) for the pipeline.
+
+Each figure is a job keyed on a hash of the input file, the job's parameters
+and PLOT_VERSION. Keys are recorded in a manifest in the output directory,
+so figures whose inputs haven't changed are skipped. Jobs that do need
+rendering run concurrently in a process pool with the non-interactive Agg
+backend. For large inputs the pairplot switches to a binned density mode (or a
+downsample) so its render time stays bounded as row counts grow.
+"""
+import concurrent.futures
+import hashlib
+import json
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+import time
+
+import pandas as pd
 
 from .data_loader import load_data
-from .config import OUTPUT_DIR
+from .config import OUTPUT_DIR, DATA_FILE
+from .instrumentation import observe, timed
+from .model_registry import file_hash
+
+# Bump when the rendering code changes so cached figures are redrawn
+PLOT_VERSION = 1
+
+MANIFEST_FILE = "plots_manifest.json"
+
+# Pairplot modes: "full" (scatter + KDE), "sample" (full on a stratified
+# downsample), "hist" (binned 2D densities drawn directly with matplotlib,
+# rendering cost independent of row count) and
+# "auto" ("full" up to max_points rows, else "hist")
+PAIRPLOT_MODES = ("auto", "full", "sample", "hist")
+
+# Default max_points: above the bundled CSV (5.5k rows), so the repo's own
+# pairplot stays a full scatter/KDE plot and only larger exports switch mode
+PAIRPLOT_MAX_POINTS = 10_000
+
+def _use_agg():
+    import matplotlib
+    matplotlib.use("Agg")
+
+def _pairplot_mode(rows: int, mode: str, max_points: int) -> str:
+    if mode not in PAIRPLOT_MODES:
+        raise ValueError(f"Unknown pairplot mode: {mode} (expected one of {PAIRPLOT_MODES})")
+    if mode == "auto":
+        return "full" if rows <= max_points else "hist"
+    return mode
+
+def _default_pairplot_vars(numeric_columns) -> list:
+    # Choose clinically relevant columns if available
+    preferred = ["total_bilirubin", "direct_bilirubin", "alkaline_phosphotase",
+                 "alamine_aminotransferase", "aspartate_aminotransferase", "albumin"]
+    found = [c for c in preferred if c in numeric_columns]
+    return found or list(numeric_columns)[:6]  # fallback
+
+def render_heatmap(csv_path: str, out_path: str, params: dict) -> str:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    numeric_df = load_data(csv_path).select_dtypes(include="number")
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(numeric_df.corr(), annot=True, cmap="coolwarm", fmt=".2f")
+    plt.title("Feature Correlation Matrix")
+    plt.tight_layout()
+    plt.savefig(out_path)
+    plt.close()
+    return out_path
+
+def _density_pairplot(df: pd.DataFrame, cols: list, hue: str, out_path: str, bins: int = 50):
+    """Pairplot grid with log-scaled 2D histograms off the diagonal and per-class histograms on it."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+    from matplotlib.colors import LogNorm
+
+    # clip the long lab-value tails so the bins cover the bulk of the data
+    ranges = {c: tuple(np.nanquantile(df[c].to_numpy(dtype=float), [0.005, 0.995])) for c in cols}
+    classes = list(df[hue].cat.categories) if hue else [None]
+    colors = sns.color_palette("husl", len(classes))
+
+    n = len(cols)
+    fig, axes = plt.subplots(n, n, figsize=(2.5 * n, 2.5 * n), squeeze=False)
+    for i, y_col in enumerate(cols):
+        for j, x_col in enumerate(cols):
+            ax = axes[i, j]
+            if i == j:
+                edges = np.linspace(*ranges[x_col], bins + 1)
+                for label, color in zip(classes, colors):
+                    values = df[x_col] if label is None else df.loc[df[hue] == label, x_col]
+                    counts, _ = np.histogram(values.dropna(), bins=edges)
+                    ax.stairs(counts, edges, color=color, label=label)
+            else:
+                pair = df[[x_col, y_col]].dropna().to_numpy(dtype=float)
+                counts, xe, ye = np.histogram2d(pair[:, 0], pair[:, 1], bins=bins,
+                                                range=[ranges[x_col], ranges[y_col]])
+                ax.pcolormesh(xe, ye, counts.T, norm=LogNorm(vmin=1), cmap="viridis")
+            if i == n - 1:
+                ax.set_xlabel(x_col)
+            if j == 0:
+                ax.set_ylabel(y_col)
+    if hue:
+        axes[0, 0].legend(title=hue, fontsize="small")
+    fig.tight_layout()
+    fig.savefig(out_path)
+    plt.close(fig)
 
-def generate_plots(csv_path: str = None, output_dir: str = None, pairplot_vars: list = None) -> dict:
+def render_pairplot(csv_path: str, out_path: str, params: dict) -> str:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df = load_data(csv_path)
+    hue = "dataset" if "dataset" in df.columns else None
+    cols = list(params["vars"]) + ([hue] if hue else [])
+    df = df[cols]
+
+    mode = _pairplot_mode(len(df), params["mode"], params["max_points"])
+    if mode == "sample" and len(df) > params["max_points"]:
+        frac = params["max_points"] / len(df)
+        groups = df.groupby(hue, observed=True) if hue else [(None, df)]
+        df = pd.concat([g.sample(frac=frac, random_state=0) for _, g in groups])
+
+    if mode == "hist":
+        _density_pairplot(df, list(params["vars"]), hue, out_path)
+        return out_path
+    grid = sns.pairplot(df, hue=hue, palette="husl", diag_kind="kde")
+    grid.savefig(out_path)
+    plt.close()
+    return out_path
+
+RENDERERS = {"heatmap": render_heatmap, "pairplot": render_pairplot}
+
+def _render_job(name: str, csv_path: str, out_path: str, params: dict) -> float:
+    """Render one figure to a temp file and move it into place; returns seconds taken."""
+    start = time.perf_counter()
+    base, ext = os.path.splitext(out_path)
+    tmp = f"{base}.{os.getpid()}.tmp{ext}"
+    RENDERERS[name](csv_path, tmp, params)
+    os.replace(tmp, out_path)
+    return time.perf_counter() - start
+
+def _job_key(data_hash: str, name: str, params: dict) -> str:
+    payload = json.dumps({"data": data_hash, "plot": name, "params": params, "version": PLOT_VERSION},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def _load_manifest(output_dir: str) -> dict:
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _save_manifest(manifest: dict, output_dir: str):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+@timed("plots")
+def generate_plots(csv_path: str = None, output_dir: str = None, pairplot_vars: list = None,
+                   pairplot_mode: str = "auto", max_points: int = PAIRPLOT_MAX_POINTS, workers: int = None,
+                   force: bool = False) -> dict:
     """
-    Generate correlation heatmap and pairplot.
+    Generate correlation heatmap and pairplot, skipping figures that are up to date.
     - csv_path: optional CSV path (overrides config)
     - output_dir: where to save images (defaults to config.OUTPUT_DIR)
     - pairplot_vars: list of numeric columns to include in pairplot (limits size)
+    - pairplot_mode: one of PAIRPLOT_MODES; max_points is the row limit for "auto"/"sample"
+    - workers: processes for rendering (default: one per figure to render, 1 renders in-process)
+    - force: re-render even if the manifest says a figure is up to date
     Returns dict with saved file paths.
     """
+    csv_path = csv_path or DATA_FILE
     output_dir = output_dir or OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
 
     df = load_data(csv_path)
-    numeric_df = df.select_dtypes(include=["float64", "int64"])
+    numeric_columns = df.select_dtypes(include="number").columns
+    rows = len(df)
+    del df
 
-    # Heatmap
-    print("Generating Heatmap...")
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(numeric_df.corr(), annot=True, cmap="coolwarm", fmt=".2f")
-    plt.title("Feature Correlation Matrix")
-    heatmap_path = os.path.join(output_dir, "correlation_heatmap.png")
-    plt.tight_layout()
-    plt.savefig(heatmap_path)
-    plt.close()
+    jobs = {
+        "heatmap": ("correlation_heatmap.png", {}),
+        "pairplot": ("pairplot_distribution.png", {
+            "vars": list(pairplot_vars or _default_pairplot_vars(numeric_columns)),
+            "mode": _pairplot_mode(rows, pairplot_mode, max_points),
+            "max_points": max_points,
+        }),
+    }
 
-    # Pairplot: limit variables to avoid extremely large plots
-    print("Generating Pairplot...")
-    if pairplot_vars is None:
-        # Choose clinically relevant columns if available
-        preferred = ["total_bilirubin", "direct_bilirubin", "alkaline_phosphotase",
-                     "alamine_aminotransferase", "aspartate_aminotransferase", "albumin"]
-        pairplot_vars = [c for c in preferred if c in numeric_df.columns]
-        if not pairplot_vars:
-            pairplot_vars = numeric_df.columns.tolist()[:6]  # fallback
-
-    cols = list(pairplot_vars)
-    if "dataset" in df.columns:
-        cols = cols + ["dataset"]
-    pairplot = sns.pairplot(df[cols], hue="dataset" if "dataset" in df.columns else None, palette="husl", diag_kind="kde")
-    pairplot_path = os.path.join(output_dir, "pairplot_distribution.png")
-    pairplot.savefig(pairplot_path)
-    plt.close()
+    data_hash = file_hash(csv_path)
+    manifest = _load_manifest(output_dir)
+    paths, todo = {}, []
+    for name, (filename, params) in jobs.items():
+        path = paths[name] = os.path.join(output_dir, filename)
+        key = _job_key(data_hash, name, params)
+        if not force and manifest.get(name, {}).get("key") == key and os.path.exists(path):
+            print(f"Skipping {name} (up to date)")
+            continue
+        todo.append((name, path, params, key))
+
+    if todo:
+        print("Generating", ", ".join(name for name, *_ in todo), "...")
+        workers = len(todo) if workers is None else workers
+        if workers <= 1:
+            _use_agg()
+            seconds = [_render_job(name, csv_path, path, params) for name, path, params, _ in todo]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+                seconds = list(pool.map(_render_job, *zip(*[(name, csv_path, path, params)
+                                                             for name, path, params, _ in todo])))
+        for (name, path, params, key), s in zip(todo, seconds):
+            observe(f"plots.{name}", s)  # rendered in worker processes, so recorded here
+            manifest[name] = {"key": key, "path": path, "params": params, "seconds": round(s, 3),
+                              "rendered_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        _save_manifest(manifest, output_dir)
 
     print("Plots saved to:", output_dir)
-    return {"heatmap": heatmap_path, "pairplot": pairplot_path}
+    return {"heatmap": paths["heatmap"], "pairplot": paths["pairplot"]}
 
 if __name__ == "__main__":
-    generate_plots()
\ No newline at end of file
+    generate_plots()
@@ -1,23 +1,90 @@
 import sqlite3
 import os
-from typing import Dict, Any
+import glob
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator
 from .config import DB_PATH
+from .instrumentation import count, timed
 
 SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "..", "db", "database_schema.sql")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "db", "migrations")
+
+# Allowed columns (reduce risk)
+PATIENT_COLUMNS = ["name", "disease_prob", "risk_label", "age", "gender",
+                   "total_bilirubin", "direct_bilirubin", "alkaline_phosphotase",
+                   "alamine_aminotransferase", "aspartate_aminotransferase",
+                   "total_protiens", "albumin", "ag_ratio", "model_key"]
+
+def parse_prob(value):
+    """
+    Normalize a disease probability to a 0.0-1.0 float.
+    Accepts floats, numeric strings and legacy percentage text like "85.2%";
+    values above 1 are treated as percentages.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.endswith("%"):
+            return float(value[:-1]) / 100.0
+    value = float(value)
+    return value / 100.0 if value > 1 else value
+
+def _migrations():
+    """Numbered migration scripts as (version, path), e.g. 002_xxx.sql -> 2."""
+    paths = glob.glob(os.path.join(os.path.abspath(MIGRATIONS_DIR), "[0-9][0-9][0-9]_*.sql"))
+    return sorted((int(os.path.basename(p)[:3]), p) for p in paths)
+
+def schema_version() -> int:
+    """Version a fresh install from SCHEMA_FILE corresponds to (latest migration)."""
+    migrations = _migrations()
+    return migrations[-1][0] if migrations else 1
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bring a database to the latest schema in place.
+    Versions are tracked in PRAGMA user_version; a patients table without a
+    version is the original (v1) schema. Each migration runs in one transaction.
+    Returns the resulting version.
+    """
+    conn.create_function("parse_prob", 1, parse_prob)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'patients'").fetchone()
+        if not exists:
+            with open(os.path.abspath(SCHEMA_FILE), "r") as f:
+                conn.executescript(f.read())
+            version = schema_version()
+            conn.execute(f"PRAGMA user_version = {version}")
+            return version
+        version = 1
+
+    for target, path in _migrations():
+        if target <= version:
+            continue
+        with open(path, "r") as f:
+            script = f.read()
+        try:
+            conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {target};\nCOMMIT;")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        version = target
+    return version
 
 def create_db(db_path: str = None):
     db_path = db_path or DB_PATH
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    schema_path = os.path.abspath(SCHEMA_FILE)
-    with open(schema_path, "r") as f:
-        cur.executescript(f.read())
-    conn.commit()
+    version = migrate(conn)
     conn.close()
-    print(f"Database created/verified at: {db_path}")
+    print(f"Database created/verified at: {db_path} (schema v{version})")
     return db_path
 
+@timed("db.write")
 def insert_patient(record: Dict[str, Any], db_path: str = None) -> int:
     """
     Insert a patient record. record keys should be snake_case matching DB columns.
@@ -27,12 +94,8 @@ def insert_patient(record: Dict[str, Any], db_path: str = None) -> int:
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
 
-    # Allowed columns (reduce risk)
-    cols = ["name", "disease_prob", "risk_label", "age", "gender",
-            "total_bilirubin", "direct_bilirubin", "alkaline_phosphotase",
-            "alamine_aminotransferase", "aspartate_aminotransferase",
-            "total_protiens", "albumin", "ag_ratio"]
-    data = {k: record.get(k) for k in cols}
+    data = {k: record.get(k) for k in PATIENT_COLUMNS}
+    data["disease_prob"] = parse_prob(data["disease_prob"])
 
     keys = ", ".join([k for k, v in data.items() if v is not None])
     placeholders = ", ".join(["?" for k, v in data.items() if v is not None])
@@ -53,4 +116,230 @@ def get_patient(patient_id: int, db_path: str = None) -> Dict[str, Any]:
     cur.execute("SELECT * FROM patients WHERE id = ?", (patient_id,))
     row = cur.fetchone()
     conn.close()
-    return dict(row) if row else None
\ No newline at end of file
+    return dict(row) if row else None
+
+# Built once so sqlite's per-connection statement cache can reuse the prepared statement
+_INSERT_SQL = "INSERT INTO patients ({}) VALUES ({})".format(
+    ", ".join(PATIENT_COLUMNS), ", ".join("?" for _ in PATIENT_COLUMNS))
+_SELECT_BY_ID_SQL = "SELECT * FROM patients WHERE id = ?"
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"  # what CURRENT_TIMESTAMP stores (UTC)
+_FILTER_COLUMNS = set(PATIENT_COLUMNS) | {"id", "date", "outcome"}
+# outcome_seq: next number in recording order. Statements run under sqlite's
+# write lock, so concurrent writers can't draw the same number. Only unlabelled
+# patients are updated: incremental readers count each outcome_seq once.
+_SET_OUTCOME_SQL = ("UPDATE patients SET outcome = ?, outcome_date = CURRENT_TIMESTAMP, "
+                    "outcome_seq = (SELECT COALESCE(MAX(outcome_seq), 0) + 1 FROM patients) "
+                    "WHERE id = ? AND outcome IS NULL")
+
+def _row_values(record: Dict[str, Any]) -> tuple:
+    values = [record.get(k) for k in PATIENT_COLUMNS]
+    values[PATIENT_COLUMNS.index("disease_prob")] = parse_prob(record.get("disease_prob"))
+    return tuple(values)
+
+def _as_timestamp(value) -> str:
+    return value.strftime(_DATE_FORMAT) if hasattr(value, "strftime") else str(value)
+
+class PatientStore:
+    """
+    Pooled, thread-safe access to the patients table.
+    - db_path: database file (defaults to config.DB_PATH)
+    - pool_size: max number of open connections shared between threads
+    Connections use WAL journaling (readers don't block the writer) and
+    synchronous=NORMAL, and are reused, so statements stay prepared.
+    """
+
+    def __init__(self, db_path: str = None, pool_size: int = 4, timeout: float = 30.0):
+        self.db_path = db_path or DB_PATH
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._open = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection (opening one if the pool isn't full yet)."""
+        if self._closed:
+            raise RuntimeError("PatientStore is closed")
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._open < self._pool.maxsize
+                if can_open:
+                    self._open += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            else:
+                conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._pool.put(conn)
+
+    def insert(self, record: Dict[str, Any]) -> int:
+        """Insert one patient record. Returns inserted row id."""
+        with timed("db.write"), self.connection() as conn, conn:
+            rowid = conn.execute(_INSERT_SQL, _row_values(record)).lastrowid
+        count("db.rows_written")
+        return rowid
+
+    def insert_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert many patient records in a single transaction.
+        Returns number of rows inserted.
+        """
+        rows = [_row_values(r) for r in records]
+        if not rows:
+            return 0
+        with timed("db.write_many"), self.connection() as conn, conn:
+            conn.executemany(_INSERT_SQL, rows)
+        count("db.rows_written", len(rows))
+        return len(rows)
+
+    def get(self, patient_id: int) -> Dict[str, Any]:
+        with self.connection() as conn:
+            row = conn.execute(_SELECT_BY_ID_SQL, (patient_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _stream(self, sql: str, params: list, batch_size: int) -> Iterator[Dict[str, Any]]:
+        with self.connection() as conn:
+            cur = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+            finally:
+                cur.close()
+
+    def iter_patients(self, filters: Dict[str, Any] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Stream patients (ordered by id) matching equality filters, e.g.
+        {"risk_label": "High Risk"}, fetching batch_size rows at a time.
+        The connection is held until the iterator is exhausted or closed.
+        """
+        filters = filters or {}
+        unknown = set(filters) - _FILTER_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown filter columns: {sorted(unknown)}")
+
+        sql = "SELECT * FROM patients"
+        if filters:
+            sql += " WHERE " + " AND ".join(f"{k} = ?" for k in filters)
+        sql += " ORDER BY id"
+
+        yield from self._stream(sql, list(filters.values()), batch_size)
+
+    def _select(self, where: str, params: list, order: str, limit: int, offset: int = 0):
+        sql = f"SELECT * FROM patients WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?"
+        with self.connection() as conn:
+            return [dict(r) for r in conn.execute(sql, params + [limit, offset])]
+
+    def count_patients(self) -> int:
+        with self.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+    def patients_between(self, start, end, limit: int = 1000, offset: int = 0):
+        """Patients with start <= date < end (datetimes or 'YYYY-MM-DD HH:MM:SS' UTC), newest first."""
+        return self._select("date >= ? AND date < ?", [_as_timestamp(start), _as_timestamp(end)],
+                            "date DESC", limit, offset)
+
+    def high_risk_patients(self, min_prob: float = 0.6, days: int = None, limit: int = 1000, offset: int = 0):
+        """Patients with disease_prob >= min_prob, optionally only from the last `days` days, newest first."""
+        where, params = "disease_prob >= ?", [parse_prob(min_prob)]
+        if days is not None:
+            where += " AND date >= datetime('now', ?)"
+            params.append(f"-{int(days)} days")
+        return self._select(where, params, "date DESC", limit, offset)
+
+    def patients_by_name_prefix(self, prefix: str, limit: int = 100):
+        """Patients whose name starts with prefix (case-sensitive range scan on the name index)."""
+        if not prefix:
+            return self._select("1", [], "name", limit)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self._select("name >= ? AND name < ?", [prefix, upper], "name", limit)
+
+    def page_patients(self, page: int = 1, page_size: int = 50):
+        """One page (1-based) of patient history, newest first."""
+        return self._select("1", [], "date DESC, id DESC", page_size, (max(page, 1) - 1) * page_size)
+
+    def set_outcome(self, patient_id: int, outcome: int):
+        """Record the confirmed diagnosis (1=Liver Disease, 0=Healthy) for a patient."""
+        self.set_outcomes([(patient_id, outcome)])
+
+    def set_outcomes(self, outcomes: Iterable[tuple]):
+        """
+        Record (patient_id, outcome) pairs in one transaction. Each gets the next
+        outcome_seq, the watermark iter_labelled/iter_outcomes resume from.
+        Recording the same outcome again is a no-op. Raises KeyError for unknown
+        patients and ValueError for a different outcome than the recorded one
+        (metrics and training data already counted it); nothing is written then.
+        """
+        with self.connection() as conn, conn:
+            for patient_id, outcome in outcomes:
+                if conn.execute(_SET_OUTCOME_SQL, (int(outcome), patient_id)).rowcount:
+                    continue
+                row = conn.execute("SELECT outcome FROM patients WHERE id = ?", (patient_id,)).fetchone()
+                if row is None:
+                    raise KeyError(f"No patient with id {patient_id}")
+                if row["outcome"] != int(outcome):
+                    raise ValueError(f"Patient {patient_id} already has outcome {row['outcome']}")
+
+    def iter_labelled(self, model_key: str, after: int = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Stream patients scored by model_key (None: by any model) whose outcome was
+        recorded after the outcome_seq watermark `after`, in the order they were recorded.
+        """
+        if model_key is None:
+            sql, params = "SELECT * FROM patients WHERE outcome_seq > ? ORDER BY outcome_seq", [after or 0]
+        else:
+            sql = "SELECT * FROM patients WHERE model_key = ? AND outcome_seq > ? ORDER BY outcome_seq"
+            params = [model_key, after or 0]
+        yield from self._stream(sql, params, batch_size)
+
+    def iter_since(self, after_id: int = 0, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Stream patients inserted after id after_id (ordered by id), e.g. to catch up an index."""
+        yield from self._stream("SELECT * FROM patients WHERE id > ? ORDER BY id", [after_id], batch_size)
+
+    def iter_outcomes(self, after: int = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Stream (id, outcome, outcome_date, outcome_seq) of patients of any model
+        whose outcome was recorded after the outcome_seq watermark `after`, in
+        the order they were recorded.
+        """
+        sql = ("SELECT id, outcome, outcome_date, outcome_seq FROM patients "
+               "WHERE outcome_seq > ? ORDER BY outcome_seq")
+        yield from self._stream(sql, [after or 0], batch_size)
+
+    def close(self):
+        """Close all idle pooled connections."""
+        self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,265 @@
+"""
+Input drift monitoring with constant memory.
+
+DriftMonitor keeps, per feature, a fixed-bin histogram (the aggregates.py
+bin edges) and running count/mean/M2 (Welford, merged per batch with Chan's
+formula) for
+- the reference: the model's training CSV, streamed once
+- a sliding window over the most recent live patients, as a ring of
+  n_windows sub-window sketches: when the newest sub-window is full the
+  oldest one is cleared and reused, so the window covers the last
+  window_size patients (give or take one sub-window)
+Drift scores are computed from the histograms in O(bins) per feature:
+PSI (over PSI_BUCKETS reference-quantile buckets), the KS statistic between the binned CDFs (with its critical value for
+the two sample sizes) and the mean shift in reference standard deviations.
+Memory is n_windows x features x bins counters however many patients have
+been seen. sync() folds in patients inserted since the last call (id
+watermark) and the state is persisted per model key (drift_path).
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import FEATURES, N_BINS, bin_edges
+from .config import DATA_FILE, FILE_MODE, MODEL_DIR
+from .data_loader import iter_chunks, normalize_frame
+
+# Bump when the stored sketches change
+DRIFT_VERSION = 1
+
+# PSI rule of thumb: < 0.1 stable, 0.1-0.2 moderate shift, > 0.2 significant shift
+PSI_THRESHOLD = 0.2
+# PSI is computed over this many buckets of roughly equal reference mass
+# (groups of adjacent fine bins); on all N_BINS bins it mostly measures sampling noise
+PSI_BUCKETS = 10
+# KS critical value coefficient c(alpha) for alpha = 0.01
+KS_ALPHA_COEF = 1.63
+# No flags until the window holds this many values of a feature
+MIN_WINDOW_COUNT = 100
+
+def drift_path(key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"drift_{key}.npz")
+
+def _feature_matrix(df) -> np.ndarray:
+    """FEATURES columns of a normalized frame as float64 (missing columns -> NaN)."""
+    return np.column_stack([
+        pd.to_numeric(df[f], errors="coerce").to_numpy(dtype=float, na_value=np.nan) if f in df.columns
+        else np.full(len(df), np.nan)
+        for f in FEATURES
+    ])
+
+def _merge_moments(n, mean, m2, X: np.ndarray):
+    """Fold the non-missing values of X (rows x features) into per-feature count/mean/M2 in place."""
+    present = ~np.isnan(X)
+    nb = present.sum(axis=0)
+    Xz = np.where(present, X, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_b = np.where(nb > 0, Xz.sum(axis=0) / nb, 0.0)
+        m2_b = (np.where(present, X - mean_b, 0.0) ** 2).sum(axis=0)
+        total = n + nb
+        delta = mean_b - mean
+        ok = total > 0
+        mean[ok] += (delta * nb / np.where(ok, total, 1))[ok]
+        m2 += m2_b + delta ** 2 * n * nb / np.where(ok, total, 1)
+    n += nb
+
+class DriftMonitor:
+    """
+    Reference vs sliding-window sketches per feature (see module docstring).
+    sync, scores and save are serialized, so one monitor can be shared between threads.
+    - window_size: live patients covered by the window
+    - n_windows: sub-windows in the ring (the window advances by window_size / n_windows)
+    """
+
+    def __init__(self, window_size: int = 5000, n_windows: int = 10):
+        p = len(FEATURES)
+        self.window_size = window_size
+        self.n_windows = n_windows
+        self.sub_size = max(window_size // n_windows, 1)
+        self.edges = np.stack([bin_edges(f) for f in FEATURES])
+        self.ref_hist = np.zeros((p, N_BINS), dtype=np.int64)
+        self.ref_n, self.ref_mean, self.ref_m2 = np.zeros(p), np.zeros(p), np.zeros(p)
+        self.win_hist = np.zeros((n_windows, p, N_BINS), dtype=np.int64)
+        self.win_n, self.win_mean, self.win_m2 = np.zeros((n_windows, p)), np.zeros((n_windows, p)), np.zeros((n_windows, p))
+        self.win_rows = np.zeros(n_windows, dtype=np.int64)  # patients per sub-window
+        self.current = 0
+        self.seen = 0  # live patients folded in overall
+        self.last_id = 0  # highest patients.id folded in
+        self._lock = threading.RLock()
+
+    def _bins(self, X: np.ndarray):
+        """(feature, bin) index pairs of the non-missing values of X."""
+        rows, cols = np.nonzero(~np.isnan(X))
+        bins = np.empty(len(cols), dtype=np.int64)
+        for j in range(len(FEATURES)):
+            sel = cols == j
+            bins[sel] = np.searchsorted(self.edges[j], X[rows[sel], j], side="right") - 1
+        return cols, np.clip(bins, 0, N_BINS - 1)
+
+    def _add(self, hist, n, mean, m2, X: np.ndarray):
+        cols, bins = self._bins(X)
+        hist += np.bincount(cols * N_BINS + bins, minlength=hist.size).reshape(hist.shape)
+        _merge_moments(n, mean, m2, X)
+
+    def add_reference(self, df):
+        """Fold a normalized frame (e.g. a data_loader chunk) into the reference sketches."""
+        self._add(self.ref_hist, self.ref_n, self.ref_mean, self.ref_m2, _feature_matrix(df))
+
+    def build_reference(self, data_path: str = None, chunksize: int = 100_000):
+        """Reference sketches for a CSV, streamed chunk by chunk."""
+        for chunk in iter_chunks(data_path or DATA_FILE, chunksize):
+            self.add_reference(chunk)
+
+    def update(self, df):
+        """Fold live patients (a normalized frame, oldest first) into the sliding window."""
+        X = _feature_matrix(df)
+        start = 0
+        while start < len(X):
+            if self.win_rows[self.current] >= self.sub_size:
+                # advance the ring: the oldest sub-window is cleared and becomes the newest
+                self.current = (self.current + 1) % self.n_windows
+                for arr in (self.win_hist, self.win_n, self.win_mean, self.win_m2, self.win_rows):
+                    arr[self.current] = 0
+            take = min(self.sub_size - int(self.win_rows[self.current]), len(X) - start)
+            c = self.current
+            self._add(self.win_hist[c], self.win_n[c], self.win_mean[c], self.win_m2[c], X[start:start + take])
+            self.win_rows[c] += take
+            self.seen += take
+            start += take
+
+    def sync(self, store, batch_size: int = 5000) -> int:
+        """Fold in patients inserted since the last sync (db.PatientStore.iter_since). Returns rows added."""
+        added = 0
+        with self._lock:
+            rows = []
+            for row in store.iter_since(self.last_id, batch_size=batch_size):
+                rows.append(row)
+                if len(rows) >= batch_size:
+                    added += self._update_rows(rows)
+                    rows = []
+            if rows:
+                added += self._update_rows(rows)
+        return added
+
+    def _update_rows(self, rows) -> int:
+        df = normalize_frame(pd.DataFrame(rows).rename(columns={"ag_ratio": "albumin_and_globulin_ratio"}))
+        self.update(df)
+        self.last_id = max(self.last_id, int(rows[-1]["id"]))
+        return len(rows)
+
+    def window(self):
+        """Window totals: (hist, n, mean, var) per feature, merging the sub-windows."""
+        hist = self.win_hist.sum(axis=0)
+        n = self.win_n.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, (self.win_n * self.win_mean).sum(axis=0) / n, np.nan)
+            m2 = (self.win_m2 + self.win_n * (self.win_mean - mean) ** 2).sum(axis=0)
+            var = np.where(n > 1, m2 / (n - 1), np.nan)
+        return hist, n, mean, var
+
+    def scores(self, psi_threshold: float = PSI_THRESHOLD, min_count: int = MIN_WINDOW_COUNT):
+        """
+        Per-feature drift report (DataFrame indexed by feature): psi, ks,
+        ks_critical, mean_shift (in reference std), ref/window mean and count,
+        and drift = window has min_count values and psi > psi_threshold or
+        ks > ks_critical.
+        """
+        with self._lock:
+            hist, n, mean, var = self.window()
+        ref = self.ref_hist.astype(float)
+        win = hist.astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cdf_ref = np.cumsum(ref, axis=1) / ref.sum(axis=1, keepdims=True)
+            cdf_win = np.cumsum(win, axis=1) / win.sum(axis=1, keepdims=True)
+            ks = np.abs(cdf_ref - cdf_win).max(axis=1)
+
+            # bucket of each fine bin: reference CDF at its left edge, in PSI_BUCKETS steps
+            start = np.hstack([np.zeros((len(FEATURES), 1)), cdf_ref[:, :-1]])
+            buckets = np.minimum((np.nan_to_num(start) * PSI_BUCKETS).astype(int), PSI_BUCKETS - 1)
+            offsets = buckets + PSI_BUCKETS * np.arange(len(FEATURES))[:, None]
+            size = PSI_BUCKETS * len(FEATURES)
+            b_ref = np.bincount(offsets.ravel(), ref.ravel(), size).reshape(-1, PSI_BUCKETS)
+            b_win = np.bincount(offsets.ravel(), win.ravel(), size).reshape(-1, PSI_BUCKETS)
+            # proportions with a small floor so empty buckets don't make PSI infinite
+            eps = 1e-4
+            p_ref = np.maximum(b_ref / b_ref.sum(axis=1, keepdims=True), eps)
+            p_win = np.maximum(b_win / b_win.sum(axis=1, keepdims=True), eps)
+            psi = ((p_win - p_ref) * np.log(p_win / p_ref)).sum(axis=1)
+            ks_critical = KS_ALPHA_COEF * np.sqrt((self.ref_n + n) / (self.ref_n * n))
+            ref_std = np.sqrt(self.ref_m2 / np.maximum(self.ref_n - 1, 1))
+            mean_shift = (mean - self.ref_mean) / ref_std
+        enough = n >= min_count
+        psi, ks = np.where(enough, psi, np.nan), np.where(enough, ks, np.nan)
+        return pd.DataFrame({
+            "psi": psi,
+            "ks": ks,
+            "ks_critical": ks_critical,
+            "mean_shift": mean_shift,
+            "ref_mean": self.ref_mean,
+            "window_mean": mean,
+            "window_std": np.sqrt(var),
+            "window_n": n.astype(int),
+            "drift": enough & ((psi > psi_threshold) | (ks > ks_critical)),
+        }, index=pd.Index(FEATURES, name="feature"))
+
+    def save(self, path: str, key: str = None) -> str:
+        """Write the sketches (atomically; safe from several threads). Returns path."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            meta = {"version": DRIFT_VERSION, "key": key, "features": FEATURES, "n_bins": N_BINS,
+                    "window_size": self.window_size, "n_windows": self.n_windows,
+                    "current": self.current, "seen": self.seen, "last_id": self.last_id}
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp.npz")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, meta=json.dumps(meta), ref_hist=self.ref_hist, ref_n=self.ref_n,
+                             ref_mean=self.ref_mean, ref_m2=self.ref_m2, win_hist=self.win_hist, win_n=self.win_n,
+                             win_mean=self.win_mean, win_m2=self.win_m2, win_rows=self.win_rows)
+                os.chmod(tmp, FILE_MODE)
+                os.replace(tmp, path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        return path
+
+    @classmethod
+    def load(cls, path: str, key: str = None):
+        """Stored monitor, or None if missing or from another key/DRIFT_VERSION/bin layout."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if (meta["version"] != DRIFT_VERSION or meta["key"] != key or meta["features"] != FEATURES
+                    or meta["n_bins"] != N_BINS):
+                return None
+            monitor = cls(meta["window_size"], meta["n_windows"])
+            for name in ("ref_hist", "ref_n", "ref_mean", "ref_m2", "win_hist", "win_n", "win_mean", "win_m2",
+                         "win_rows"):
+                setattr(monitor, name, data[name])
+        monitor.current, monitor.seen, monitor.last_id = meta["current"], meta["seen"], meta["last_id"]
+        return monitor
+
+def load_or_build(artifact: Dict[str, Any], store=None, path: str = None, data_path: str = None,
+                  **kwargs) -> DriftMonitor:
+    """
+    The persisted monitor for an artifact (reference built from its training
+    CSV - or data_path - on first use), synced with the store's patients and
+    saved again if anything changed. kwargs go to DriftMonitor for new monitors.
+    """
+    path = path or drift_path(artifact["key"])
+    monitor = DriftMonitor.load(path, artifact["key"])
+    changed = monitor is None
+    if monitor is None:
+        monitor = DriftMonitor(**kwargs)
+        monitor.build_reference(data_path or artifact["data_path"])
+    if store is not None:
+        changed = monitor.sync(store) > 0 or changed
+    if changed:
+        monitor.save(path, artifact["key"])
+    return monitor
@@ -0,0 +1,110 @@
+"""
+Model evaluation metrics, computed once per model version and updated incrementally.
+
+Metrics are kept as sufficient statistics rather than raw scores:
+- confusion counts at the risk threshold
+- per-class histograms of the predicted probability (N_BINS fixed bins)
+ROC/AUC are derived from the histograms, so folding in newly labelled
+patients from the DB is O(new rows + bins) instead of rescoring the test set.
+The metrics live in a JSON sidecar next to the model artifact.
+"""
+import json
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+from .config import MODEL_DIR, RISK_THRESHOLD
+from .predictor import predict_risk
+
+N_BINS = 1000
+
+def _bin(prob: np.ndarray) -> np.ndarray:
+    return np.minimum((np.asarray(prob, dtype=float) * N_BINS).astype(int), N_BINS - 1)
+
+def empty_metrics(threshold: float = None) -> Dict[str, Any]:
+    return {
+        "threshold": RISK_THRESHOLD if threshold is None else threshold,
+        "confusion": [[0, 0], [0, 0]],  # rows = actual (0, 1), cols = predicted (0, 1)
+        "hist_neg": [0] * N_BINS,
+        "hist_pos": [0] * N_BINS,
+        "n_test": 0,
+        "n_live": 0,
+        "watermark": None,  # outcome_seq of the last DB row folded in
+    }
+
+def add_outcomes(metrics: Dict[str, Any], y_true, prob) -> Dict[str, Any]:
+    """Fold labelled predictions (y_true in {0, 1}, prob = P(disease)) into metrics in place."""
+    y_true = np.asarray(y_true, dtype=int)
+    prob = np.asarray(prob, dtype=float)
+    y_pred = (prob > metrics["threshold"]).astype(int)
+
+    confusion = np.asarray(metrics["confusion"])
+    np.add.at(confusion, (y_true, y_pred), 1)
+    metrics["confusion"] = confusion.tolist()
+
+    bins = _bin(prob)
+    metrics["hist_neg"] = (np.asarray(metrics["hist_neg"]) + np.bincount(bins[y_true == 0], minlength=N_BINS)).tolist()
+    metrics["hist_pos"] = (np.asarray(metrics["hist_pos"]) + np.bincount(bins[y_true == 1], minlength=N_BINS)).tolist()
+    return metrics
+
+def roc_from_metrics(metrics: Dict[str, Any]):
+    """Returns (fpr, tpr, auc) from the probability histograms (thresholds at bin edges)."""
+    neg = np.asarray(metrics["hist_neg"], dtype=float)[::-1]
+    pos = np.asarray(metrics["hist_pos"], dtype=float)[::-1]
+    fpr = np.concatenate([[0.0], np.cumsum(neg) / max(neg.sum(), 1)])
+    tpr = np.concatenate([[0.0], np.cumsum(pos) / max(pos.sum(), 1)])
+    keep = np.concatenate([[True], (neg + pos) > 0])  # drop empty bins
+    fpr, tpr = fpr[keep], tpr[keep]
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    return fpr, tpr, auc
+
+def evaluate_artifact(artifact: Dict[str, Any], threshold: float = None) -> Dict[str, Any]:
+    """Metrics for an artifact's held-out test set (one predict_risk pass)."""
+    metrics = empty_metrics(threshold)
+    result = predict_risk(artifact["model"], artifact["X_test"], metrics["threshold"])
+    add_outcomes(metrics, artifact["y_test"], result["probability"])
+    metrics["n_test"] = int(len(artifact["y_test"]))
+    return metrics
+
+def metrics_path(key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"svm_{key}.metrics.json")
+
+def save_metrics(metrics: Dict[str, Any], key: str, model_dir: str = None) -> str:
+    path = metrics_path(key, model_dir)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(metrics, f)
+    os.replace(tmp, path)
+    return path
+
+def load_metrics(artifact: Dict[str, Any], model_dir: str = None) -> Dict[str, Any]:
+    """Stored metrics for the artifact, computing and saving them on first use."""
+    path = metrics_path(artifact["key"], model_dir)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    metrics = evaluate_artifact(artifact)
+    save_metrics(metrics, artifact["key"], model_dir)
+    return metrics
+
+def update_from_db(metrics: Dict[str, Any], store, model_key: str, batch_size: int = 5000) -> int:
+    """
+    Fold in patients scored by model_key whose outcome was recorded since the
+    last update (db.PatientStore.iter_labelled). Updates metrics in place and
+    returns the number of new rows (each patient is counted once: the store
+    rejects relabelling, see db.PatientStore.set_outcomes).
+    """
+    y_true, prob, last = [], [], None
+    for row in store.iter_labelled(model_key, metrics["watermark"], batch_size):
+        last = row["outcome_seq"]
+        if row["disease_prob"] is not None:
+            y_true.append(row["outcome"])
+            prob.append(row["disease_prob"])
+
+    if y_true:
+        add_outcomes(metrics, y_true, prob)
+        metrics["n_live"] += len(y_true)
+    if last:
+        metrics["watermark"] = last
+    return len(y_true)
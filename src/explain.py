@@ -0,0 +1,287 @@
+"""
+Per-prediction feature attributions.
+
+Model-agnostic explainers would call the SVC thousands of times per patient.
+The RBF kernel factorizes over features instead,
+
+    k(z, sv) = exp(-gamma ||z - sv||^2) = prod_j exp(-gamma (z_j - sv_j)^2),
+
+so once the mean factor of a background sample is cached per feature and
+support vector, M[j, i] = mean_b exp(-gamma (b_j - sv_ij)^2), the expected
+decision value with any subset S of a patient's features kept (the others
+drawn from the background, features treated as independent) is
+
+    v(S) = sum_i alpha_i prod_{j in S} k_j(z_j, sv_ij) prod_{j not in S} M[j, i] + intercept
+
+- one sum of logs and an exp per coalition and support vector. With 10
+features all 2^10 coalitions fit in a few milliseconds, which gives exact
+Shapley values: per-feature contributions that add up to the patient's
+decision value minus the background's (base_score). Models whose 2^d x n_sv
+terms exceed EXACT_MAX_TERMS use leave-one-out occlusion over the same cached
+factors (d coalitions) instead, so the cost per patient stays bounded; models
+other than RBF SVCs use occlusion against the background rows themselves.
+
+build_explainer() runs at training time (model_registry.save_artifact) and
+the explainer is stored next to the artifact (explain_path) with the
+background sample, its kernel factors and the mean |contribution| per
+feature over a sample of the test set (global_importance). SVC explainers
+need only NumPy to load and evaluate, like svm_kernel.KernelSVM, and take
+raw (unscaled) rows.
+"""
+import json
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+from .config import MODEL_DIR
+from .predictor import _platt_params, platt_probability
+
+# Bump when the stored arrays change
+EXPLAIN_VERSION = 1
+
+# Background rows sampled from the training split
+BACKGROUND_SIZE = 100
+
+# Exact Shapley values while 2^n_features * n_support_vectors stays below this (per row)
+EXACT_MAX_TERMS = 1 << 22
+
+# float64 temporaries per evaluation chunk (rows are grouped up to this many terms)
+CHUNK_TERMS = 1 << 22
+
+def explain_path(key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"explain_{key}.npz")
+
+def background_sample(X_scaled: np.ndarray, size: int = BACKGROUND_SIZE, random_state: int = 0) -> np.ndarray:
+    """Up to `size` rows of a (scaled) training matrix, drawn without replacement."""
+    X_scaled = np.asarray(X_scaled, dtype=np.float64)
+    if len(X_scaled) <= size:
+        return X_scaled.copy()
+    rng = np.random.default_rng(random_state)
+    return X_scaled[np.sort(rng.choice(len(X_scaled), size, replace=False))]
+
+def _shapley_weights(n_features: int):
+    """Coalition masks (2^d, d) and the matrix W (d, 2^d) with phi = v(coalitions) @ W.T."""
+    from math import factorial
+
+    masks = ((np.arange(1 << n_features)[:, None] >> np.arange(n_features)) & 1).astype(np.float64)
+    size = masks.sum(axis=1).astype(int)
+    weight = np.array([factorial(s) * factorial(n_features - s - 1) / factorial(n_features)
+                       for s in range(n_features)] + [0.0])
+    # phi_j = sum_{S not containing j} w(|S|) (v(S + j) - v(S))
+    W = np.where(masks.T > 0, weight[np.maximum(size - 1, 0)], -weight[size])
+    return masks, W
+
+class Explainer:
+    """
+    Feature attributions for one model, in decision-function units (see
+    explain()). Build with build_explainer() or load with Explainer.load().
+    """
+
+    def __init__(self, arrays: Dict[str, Any], model=None):
+        meta = json.loads(str(arrays["meta"]))
+        if meta["version"] != EXPLAIN_VERSION:
+            raise ValueError(f"Explainer version {meta['version']} != {EXPLAIN_VERSION}")
+        self.key = meta["key"]
+        self.features = meta["features"]
+        self.method = meta["method"]
+        self.mean = np.asarray(arrays["mean"], dtype=np.float64)
+        self.scale = np.asarray(arrays["scale"], dtype=np.float64)
+        self.background = np.asarray(arrays["background"], dtype=np.float64)
+        self.base_score = float(arrays["base_score"])
+        self.base_probability = float(arrays["base_probability"])
+        self.global_importance = np.asarray(arrays["global_importance"], dtype=np.float64)
+        self.model = model
+        if self.method in ("shapley", "occlusion"):
+            self.sv = np.asarray(arrays["support_vectors"], dtype=np.float64)
+            self.dual_coef = np.asarray(arrays["dual_coef"], dtype=np.float64)
+            self.intercept = float(arrays["intercept"])
+            self.gamma = float(arrays["gamma"])
+            self.prob_a, self.prob_b = float(arrays["prob_a"]), float(arrays["prob_b"])
+            self.log_m = np.asarray(arrays["log_mean_factor"], dtype=np.float64)  # (d, n_sv)
+            self.log_m_sum = self.log_m.sum(axis=0)
+            if self.method == "shapley":
+                self.masks, self.weights = _shapley_weights(len(self.features))
+        elif model is None:
+            raise ValueError("Model-based explainers need the fitted model")
+
+    def _arrays(self) -> Dict[str, Any]:
+        meta = {"version": EXPLAIN_VERSION, "key": self.key, "features": self.features, "method": self.method}
+        arrays = {"meta": json.dumps(meta), "mean": self.mean, "scale": self.scale, "background": self.background,
+                  "base_score": np.float64(self.base_score), "base_probability": np.float64(self.base_probability),
+                  "global_importance": self.global_importance}
+        if self.method in ("shapley", "occlusion"):
+            arrays.update(support_vectors=self.sv, dual_coef=self.dual_coef, intercept=np.float64(self.intercept),
+                          gamma=np.float64(self.gamma), prob_a=np.float64(self.prob_a),
+                          prob_b=np.float64(self.prob_b), log_mean_factor=self.log_m)
+        return arrays
+
+    def _log_factor_gap(self, Z: np.ndarray) -> np.ndarray:
+        """log k_j(z_j, sv_ij) - log M[j, i] for scaled rows, shape (n, d, n_sv)."""
+        diff = Z[:, :, None] - self.sv.T[None, :, :]
+        diff *= diff
+        diff *= -self.gamma
+        diff -= self.log_m
+        return diff
+
+    def _kernel_scores(self, Z: np.ndarray):
+        """(score, contributions) for a chunk of scaled rows from the cached kernel factors."""
+        gap = self._log_factor_gap(Z)
+        if self.method == "shapley":
+            terms = np.matmul(self.masks, gap)  # (n, 2^d, n_sv)
+            terms += self.log_m_sum
+            np.exp(terms, out=terms)
+            values = terms @ self.dual_coef + self.intercept  # v(S) for every coalition
+            return values[:, -1], values @ self.weights.T
+        # leave-one-out: v(all features but j) against v(all features)
+        full = gap.sum(axis=1) + self.log_m_sum  # (n, n_sv)
+        score = np.exp(full) @ self.dual_coef + self.intercept
+        without = np.exp(full[:, None, :] - gap) @ self.dual_coef + self.intercept
+        return score, score[:, None] - without
+
+    def _model_scores(self, Z: np.ndarray):
+        """(score, contributions) for a chunk of scaled rows by occlusion against the background rows."""
+        n, d = Z.shape
+        hybrid = np.repeat(Z[:, None, None, :], d, axis=1).repeat(len(self.background), axis=2)
+        cols = np.arange(d)
+        hybrid[:, cols, :, cols] = self.background.T[:, None, :]  # feature j taken from each background row
+        score = self._score(Z)
+        without = self._score(hybrid.reshape(-1, d)).reshape(n, d, -1).mean(axis=2)
+        return score, score[:, None] - without
+
+    def _score(self, Z: np.ndarray) -> np.ndarray:
+        if hasattr(self.model, "decision_function"):
+            return np.asarray(self.model.decision_function(Z), dtype=np.float64)
+        return self.model.predict_proba(Z)[:, 1]
+
+    def _probability(self, score: np.ndarray, Z: np.ndarray) -> np.ndarray:
+        if self.model is None:
+            return platt_probability(score, self.prob_a, self.prob_b)
+        return self.model.predict_proba(Z)[:, 1]
+
+    def _terms_per_row(self) -> int:
+        d = len(self.features)
+        if self.method == "shapley":
+            return len(self.masks) * len(self.sv)
+        if self.method == "occlusion":
+            return d * len(self.sv)
+        return d * d * len(self.background)
+
+    def explain(self, X_raw) -> Dict[str, Any]:
+        """
+        Contributions for raw (unscaled) rows in features order, one row or a
+        batch (evaluated in chunks of CHUNK_TERMS). Returns dict of arrays:
+        score and probability (n,), contributions (n, d) in decision-function
+        units - for "shapley" they add up to score - base_score - and
+        probability_contributions (n, d), the same split of probability -
+        base_probability.
+        """
+        X = np.asarray(X_raw, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        Z = (X - self.mean) / self.scale
+        rows = max(1, CHUNK_TERMS // self._terms_per_row())
+        score, contributions = np.empty(len(Z)), np.empty(Z.shape)
+        evaluate = self._model_scores if self.model is not None else self._kernel_scores
+        for start in range(0, len(Z), rows):
+            score[start:start + rows], contributions[start:start + rows] = evaluate(Z[start:start + rows])
+
+        probability = self._probability(score, Z)
+        total = contributions.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(np.abs(total) > 1e-12, contributions / total, 0.0)
+        return {
+            "score": score,
+            "probability": probability,
+            "contributions": contributions,
+            "probability_contributions": share * (probability - self.base_probability)[:, None],
+        }
+
+    def top_features(self, result: Dict[str, Any], row: int = 0, k: int = 5):
+        """[(feature, probability contribution, score contribution)] of one explained row, largest |value| first."""
+        contrib = result["probability_contributions"][row]
+        order = np.argsort(-np.abs(contrib), kind="stable")[:k]
+        return [(self.features[j], float(contrib[j]), float(result["contributions"][row, j])) for j in order]
+
+    def save(self, path: str = None) -> str:
+        """Write the explainer (atomically). Returns the path (defaults to explain_path(key))."""
+        path = path or explain_path(self.key)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **self._arrays())
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, artifact: Dict[str, Any] = None):
+        """
+        Stored explainer, or None if missing or written for another model
+        key/EXPLAIN_VERSION. Model-based ("model" method) explainers need the
+        artifact for its fitted model; SVC ones load from the file alone.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files}
+        meta = json.loads(str(arrays["meta"]))
+        if meta["version"] != EXPLAIN_VERSION or (artifact is not None and meta["key"] != artifact["key"]):
+            return None
+        if meta["method"] == "model":
+            if artifact is None:
+                raise ValueError("Model-based explainers need the artifact to load")
+            return cls(arrays, artifact["model"])
+        return cls(arrays)
+
+def build_explainer(artifact: Dict[str, Any], background: np.ndarray = None) -> Explainer:
+    """
+    Explainer for an artifact from model_registry.
+    - background: scaled rows to explain against (defaults to the artifact's
+      "background" sample, or a sample of its test set for older artifacts)
+    """
+    model, scaler = artifact["model"], artifact["scaler"]
+    if background is None:
+        background = artifact.get("background")
+    if background is None:
+        background = background_sample(artifact["X_test"])
+    background = np.asarray(background, dtype=np.float64)
+    features = list(artifact["features"])
+    arrays = {"mean": np.asarray(scaler.mean_, dtype=np.float64), "scale": np.asarray(scaler.scale_, dtype=np.float64),
+              "background": background, "global_importance": np.zeros(len(features))}
+
+    platt = _platt_params(model) if getattr(model, "kernel", None) == "rbf" else None
+    if platt is not None and len(model.classes_) == 2:
+        sv = np.asarray(model.support_vectors_, dtype=np.float64)
+        gamma = float(model._gamma)
+        # mean over the background of each feature's kernel factor, per support vector
+        factors = np.exp(-gamma * (background[:, :, None] - sv.T[None, :, :]) ** 2).mean(axis=0)
+        method = "shapley" if (1 << len(features)) * len(sv) <= EXACT_MAX_TERMS else "occlusion"
+        log_m = np.log(np.maximum(factors, np.finfo(np.float64).tiny))
+        base_score = float(np.exp(log_m.sum(axis=0)) @ model.dual_coef_[0] + model.intercept_[0])
+        arrays.update(support_vectors=sv, dual_coef=np.asarray(model.dual_coef_[0], dtype=np.float64),
+                      intercept=np.float64(model.intercept_[0]), gamma=np.float64(gamma),
+                      prob_a=np.float64(platt[0]), prob_b=np.float64(platt[1]), log_mean_factor=log_m)
+        base_probability = float(platt_probability(model.decision_function(background), *platt).mean())
+    else:
+        method = "model"
+        base_score = float(np.mean(model.decision_function(background)) if hasattr(model, "decision_function")
+                           else model.predict_proba(background)[:, 1].mean())
+        base_probability = float(model.predict_proba(background)[:, 1].mean())
+
+    meta = {"version": EXPLAIN_VERSION, "key": artifact["key"], "features": features, "method": method}
+    arrays.update(meta=json.dumps(meta), base_score=np.float64(base_score), base_probability=np.float64(base_probability))
+    explainer = Explainer(arrays, model if method == "model" else None)
+
+    X_test = background_sample(artifact["X_test"])  # a sample is enough for the mean and bounds training time
+    if len(X_test):
+        result = explainer.explain(X_test * explainer.scale + explainer.mean)
+        explainer.global_importance = np.abs(result["contributions"]).mean(axis=0)
+    return explainer
+
+def load_or_build(artifact: Dict[str, Any], model_dir: str = None, path: str = None) -> Explainer:
+    """The stored explainer for an artifact, built and saved first if there is none yet."""
+    path = path or explain_path(artifact["key"], model_dir)
+    explainer = Explainer.load(path, artifact)
+    if explainer is None:
+        explainer = build_explainer(artifact)
+        explainer.save(path)
+    return explainer
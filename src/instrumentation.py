@@ -0,0 +1,216 @@
+"""
+Lightweight stage timing and counters.
+
+    from .instrumentation import count, timed
+
+    with timed("train.fit"):
+        model.fit(X, y)
+
+    @timed("rules")
+    def get_warnings(...): ...
+
+Latencies go into log-bucketed histograms (BUCKETS_PER_OCTAVE buckets per
+doubling, so quantiles are within ~9%), one per stage name. Recording is off
+unless enabled (config.METRICS_ENABLED or enable()); while off, timers skip
+the clock and decorated functions pay a single flag check. snapshot() returns
+p50/p95/p99 per stage, which can be written to a JSON file (export_json) or
+served over HTTP (serve_metrics, and /metrics on src.serve).
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from .config import METRICS_ENABLED
+
+BUCKETS_PER_OCTAVE = 8
+MIN_SECONDS = 1e-7  # bucket 0 holds everything faster than this
+N_BUCKETS = BUCKETS_PER_OCTAVE * 40  # up to ~1e-7 * 2**40 s (~30 hours)
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+class LogHistogram:
+    """Counts of durations in logarithmic buckets plus count/sum/min/max."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        i = int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_OCTAVE) if seconds > MIN_SECONDS else 0
+        self.buckets[i if i < N_BUCKETS else N_BUCKETS - 1] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Geometric middle of the bucket holding the q-quantile (clamped to min/max)."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                value = MIN_SECONDS * 2 ** ((i + 0.5) / BUCKETS_PER_OCTAVE)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else math.nan,
+            "p50_s": self.quantile(0.50),
+            "p95_s": self.quantile(0.95),
+            "p99_s": self.quantile(0.99),
+            "min_s": self.min if self.count else math.nan,
+            "max_s": self.max,
+        }
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+def observe(name: str, seconds: float):
+    """Record one duration for a stage."""
+    if not _enabled:
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = LogHistogram()
+        hist.add(seconds)
+
+def count(name: str, n: int = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+class _Timer:
+    """Context manager/decorator for one stage; see timed()."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+
+class _NoopTimer(_Timer):
+    """Returned by timed() while disabled: the block isn't timed (decorating still works)."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_noop_timers = {}
+
+def timed(name: str) -> _Timer:
+    """
+    Time a block (`with timed("stage"):`) or every call of a function
+    (`@timed("stage")`, which checks the enabled flag per call) into the
+    stage's histogram.
+    """
+    if _enabled:
+        return _Timer(name)
+    timer = _noop_timers.get(name)
+    if timer is None:
+        timer = _noop_timers[name] = _NoopTimer(name)
+    return timer
+
+def snapshot() -> Dict[str, Any]:
+    """Per-stage latency summaries and counters recorded so far."""
+    with _lock:
+        stages = {name: hist.summary() for name, hist in sorted(_histograms.items())}
+        counters = dict(sorted(_counters.items()))
+    return {"enabled": _enabled, "pid": os.getpid(), "time": time.time(), "stages": stages, "counters": counters}
+
+def export_json(path: str) -> str:
+    """Write snapshot() to a JSON file (atomically)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot(), f, indent=2, default=str)
+    os.replace(tmp, path)
+    return path
+
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler  # only needed when serving
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = json.dumps(snapshot(), default=str).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return MetricsHandler
+
+def serve_metrics(host: str = "127.0.0.1", port: int = 9100):
+    """Serve snapshot() as JSON on GET /metrics from a daemon thread. Call .shutdown() to stop."""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,401 @@
+"""
+Persisted, versioned model artifacts.
+
+Training (SMOTE + StandardScaler + SVC with Platt calibration, or an
+approximate-kernel model for large data, see approx_model.py) takes seconds,
+so it is done once by scripts/train_model.py and the result is written to
+MODEL_DIR. The app and scripts then call load_or_train(), which only retrains
+when the data file hash or the hyperparameters change.
+
+Oversampling uses resampling.IncrementalSMOTE, whose state is saved next to
+the artifact, so retrain_with_outcomes() can later fold in patients whose
+outcome was recorded in the database without redoing SMOTE from scratch.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Dict
+
+import joblib
+import numpy as np
+
+from .approx_model import APPROX_PARAMS, make_model
+from .config import DATA_FILE, FILE_MODE, MODEL_BACKEND, MODEL_DIR
+from .evaluation import evaluate_artifact, save_metrics
+from .instrumentation import count, timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bump when the artifact layout or preprocessing changes so old files are ignored
+ARTIFACT_VERSION = 3
+
+# Model input order (normalized column names)
+FEATURES = ["age", "gender", "total_bilirubin", "direct_bilirubin",
+            "alkaline_phosphotase", "alamine_aminotransferase",
+            "aspartate_aminotransferase", "total_protiens", "albumin",
+            "albumin_and_globulin_ratio"]
+TARGET = "dataset"
+
+DEFAULT_PARAMS = {
+    "backend": MODEL_BACKEND,
+    "kernel": "rbf",
+    "C": 1.0,
+    "gamma": "scale",
+    "smote_k_neighbors": 5,
+    "test_size": 0.2,
+    "random_state": 42,
+}
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file, read in chunks so large exports don't load into memory."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def artifact_key(data_hash: str, params: Dict[str, Any]) -> str:
+    """Stable key for a (data, hyperparameters, artifact version) combination."""
+    payload = json.dumps({"data": data_hash, "params": params, "version": ARTIFACT_VERSION},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def resolve_params(params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """DEFAULT_PARAMS overridden by params, plus APPROX_PARAMS for approximate backends."""
+    merged = dict(DEFAULT_PARAMS)
+    merged.update(params or {})
+    if merged["backend"] != "svc":
+        merged = {**APPROX_PARAMS, **merged}
+    return merged
+
+def _selected_path(model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, "selected_params.json")
+
+def select_params(params: Dict[str, Any], model_dir: str = None) -> str:
+    """Make params (e.g. the winner of training.search) the default for load_or_train()."""
+    model_dir = model_dir or MODEL_DIR
+    os.makedirs(model_dir, exist_ok=True)
+    path = _selected_path(model_dir)
+    with open(path + ".tmp", "w") as f:
+        json.dump(resolve_params(params), f, indent=2, default=str)
+    os.replace(path + ".tmp", path)
+    return path
+
+def selected_params(model_dir: str = None) -> Dict[str, Any]:
+    """Hyperparameters chosen with select_params(), else DEFAULT_PARAMS."""
+    path = _selected_path(model_dir)
+    if not os.path.exists(path):
+        return resolve_params()
+    with open(path, "r") as f:
+        return resolve_params(json.load(f))
+
+def prepare_training_data(df: "pd.DataFrame"):
+    """
+    Apply the training preprocessing to a frame from data_loader.load_data
+    (raw CSV frames are normalized first).
+    Returns (X, y) with X in FEATURES order (float64) and y as 1=disease, 0=healthy.
+    """
+    from .data_loader import normalize_frame
+
+    df = normalize_frame(df.copy())
+    df = df[df[TARGET].notna()]
+    X = df[FEATURES].astype("float64")
+    X = X.fillna(X.mean())
+    y = df[TARGET].map({"liver_disease": 1, "healthy": 0}).astype(int)  # 1=Disease, 0=Healthy
+    return X, y
+
+def labelled_training_data(store, model_key: str, after: int = None, fill_values: Dict[str, float] = None):
+    """
+    Training rows from patients whose outcome was recorded (db.PatientStore.iter_labelled)
+    after the outcome_seq watermark `after`, e.g. to feed resampling.IncrementalSMOTE.
+    - model_key: only patients scored by this model (None: any model)
+    - fill_values: per-feature values for missing labs (defaults to the batch means)
+    Returns (X, y, watermark) like prepare_training_data, plus the new watermark.
+    """
+    import pandas as pd
+
+    from .data_loader import normalize_frame
+
+    rows = list(store.iter_labelled(model_key, after))
+    if not rows:
+        return pd.DataFrame(columns=FEATURES, dtype="float64"), pd.Series(dtype=int), after
+    df = normalize_frame(pd.DataFrame(rows).rename(columns={"ag_ratio": "albumin_and_globulin_ratio"}))
+    X = df[FEATURES].astype("float64")
+    X = X.fillna(fill_values if fill_values is not None else X.mean())
+    y = df["outcome"].astype(int)
+    return X, y, rows[-1]["outcome_seq"]
+
+def _split(data_path: str, params: Dict[str, Any]):
+    """(X, X_train, X_test, y_train, y_test) of the data file, split as in train_model."""
+    from sklearn.model_selection import train_test_split
+
+    from .data_loader import load_data
+
+    X, y = prepare_training_data(load_data(data_path))
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=params["test_size"], random_state=params["random_state"], stratify=y)
+    return X, X_train, X_test, y_train, y_test
+
+def _fit(X_res: np.ndarray, y_res: np.ndarray, X_test: np.ndarray, params: Dict[str, Any]):
+    """Scale and fit the model on the resampled rows. Returns (scaler, model, scaled X_test)."""
+    from sklearn.preprocessing import StandardScaler
+
+    # Scaling
+    with timed("train.scale"):
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_res)
+        X_test_scaled = scaler.transform(X_test)
+
+    # Model Training
+    with timed("train.fit"):
+        model = make_model(params)
+        model.fit(X_train_scaled, y_res)
+    return scaler, model, X_test_scaled
+
+def train_model(data_path: str = None, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Train the SMOTE + StandardScaler + model pipeline.
+    - data_path: CSV to train on (defaults to config.DATA_FILE)
+    - params: hyperparameters overriding DEFAULT_PARAMS ("backend" picks SVC
+      or an approximate-kernel model, see approx_model.make_model)
+    Returns an artifact dict (model, scaler, features, data hash, held-out test
+    set, ...). "resampler" holds the fitted IncrementalSMOTE; save_artifact
+    writes it to its own file.
+    """
+    from .explain import background_sample
+    from .resampling import IncrementalSMOTE
+
+    data_path = data_path or DATA_FILE
+    params = resolve_params(params)
+    data_hash = file_hash(data_path)
+    key = artifact_key(data_hash, params)
+    X, X_train, X_test, y_train, y_test = _split(data_path, params)
+
+    # SMOTE (Critical Step)
+    with timed("train.smote"):
+        smote = IncrementalSMOTE(k_neighbors=params["smote_k_neighbors"], random_state=params["random_state"])
+        X_res, y_res = smote.fit_resample(X_train.to_numpy(), y_train.to_numpy())
+
+    scaler, model, X_test_scaled = _fit(X_res, y_res, X_test.to_numpy(), params)
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "key": key,
+        "base_key": key,
+        "data_hash": data_hash,
+        "data_path": os.path.abspath(data_path),
+        "params": params,
+        "features": list(FEATURES),
+        "fill_values": X.mean().to_dict(),
+        "model": model,
+        "scaler": scaler,
+        "X_test": X_test_scaled,
+        "y_test": y_test.to_numpy(),
+        # explanation baseline: real (not SMOTE) training rows, see explain.py
+        "background": background_sample(scaler.transform(X_train.to_numpy()), random_state=params["random_state"]),
+        "outcome_watermark": 0,
+        "resampler": smote,
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def resampler_path(key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"smote_{key}.joblib")
+
+def load_resampler(artifact: Dict[str, Any], model_dir: str = None):
+    """
+    The IncrementalSMOTE state saved with the artifact. Artifacts trained
+    straight from the data file get it refitted if the file is missing.
+    """
+    from .resampling import IncrementalSMOTE
+
+    path = resampler_path(artifact["key"], model_dir)
+    if os.path.exists(path):
+        return IncrementalSMOTE.load(path)
+    if artifact.get("outcome_watermark") or file_hash(artifact["data_path"]) != artifact["data_hash"]:
+        raise FileNotFoundError(f"No resampler state for artifact {artifact['key']}: {path}")
+    params = artifact["params"]
+    _, X_train, _, y_train, _ = _split(artifact["data_path"], params)
+    smote = IncrementalSMOTE(k_neighbors=params["smote_k_neighbors"], random_state=params["random_state"])
+    smote.fit_resample(X_train.to_numpy(), y_train.to_numpy())
+    return smote
+
+def retrain_with_outcomes(artifact: Dict[str, Any], store, model_dir: str = None) -> Dict[str, Any]:
+    """
+    Add patients whose outcome was recorded in store (db.PatientStore) since
+    the artifact was trained to its training set and refit. The saved
+    IncrementalSMOTE only generates synthetic rows for the new patients; the
+    held-out test set is kept, so metrics stay comparable. The result is saved
+    and returned by load_or_train() for the same data file and params from now on.
+    Returns the new artifact, or None if no outcomes were recorded since.
+    """
+    from .explain import background_sample
+
+    model_dir = model_dir or MODEL_DIR
+    after = artifact.get("outcome_watermark", 0)
+    X_new, y_new, watermark = labelled_training_data(store, None, after, artifact["fill_values"])
+    if not len(y_new):
+        return None
+
+    smote = load_resampler(artifact, model_dir)
+    with timed("train.smote"):
+        X_res, y_res = smote.partial_fit_resample(X_new[artifact["features"]].to_numpy(), y_new.to_numpy())
+    params = artifact["params"]
+    X_test = artifact["scaler"].inverse_transform(artifact["X_test"])
+    scaler, model, X_test_scaled = _fit(X_res, y_res, X_test, params)
+
+    retrained = dict(
+        artifact,
+        key=artifact_key(f"{artifact['data_hash']}+outcomes:{watermark}", params),
+        base_key=artifact.get("base_key", artifact["key"]),
+        model=model,
+        scaler=scaler,
+        X_test=X_test_scaled,
+        background=background_sample(scaler.transform(smote.X_), random_state=params["random_state"]),
+        outcome_watermark=watermark,
+        resampler=smote,
+        trained_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+    save_artifact(retrained, model_dir)
+    _set_retrained(retrained["base_key"], retrained["key"], model_dir)
+    return retrained
+
+def _retrained_path(base_key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"retrained_{base_key}.json")
+
+def _set_retrained(base_key: str, key: str, model_dir: str = None):
+    path = _retrained_path(base_key, model_dir)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"key": key}, f)
+    os.replace(path + ".tmp", path)
+
+def _retrained_key(base_key: str, model_dir: str = None):
+    path = _retrained_path(base_key, model_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)["key"]
+
+def artifact_path(key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"svm_{key}.joblib")
+
+def save_artifact(artifact: Dict[str, Any], model_dir: str = None) -> str:
+    """
+    Write the artifact (uncompressed, so arrays can be memory-mapped on load)
+    plus small JSON sidecars with its metadata (incl. scaler stats) and test-set metrics
+    (see evaluation.py), the IncrementalSMOTE state (if artifact["resampler"]
+    is set), the feature explainer (see explain.py) and, for binary RBF SVCs,
+    the NumPy-only export (see svm_kernel.py). Writes are atomic.
+    Returns the artifact path.
+    """
+    model_dir = model_dir or MODEL_DIR
+    os.makedirs(model_dir, exist_ok=True)
+    path = artifact_path(artifact["key"], model_dir)
+
+    fd, tmp = tempfile.mkstemp(dir=model_dir, suffix=".tmp")
+    os.close(fd)
+    joblib.dump({k: v for k, v in artifact.items() if k != "resampler"}, tmp)
+    os.chmod(tmp, FILE_MODE)
+    os.replace(tmp, path)
+    if artifact.get("resampler") is not None:
+        artifact["resampler"].save(resampler_path(artifact["key"], model_dir))
+
+    meta = {k: artifact.get(k) for k in ("version", "key", "base_key", "data_hash", "data_path", "params",
+                                         "features", "fill_values", "outcome_watermark", "trained_at")}
+    # scaler stats, so load_model_info() can serve the app without unpickling the artifact
+    meta["scaler"] = {"mean": artifact["scaler"].mean_.tolist(), "scale": artifact["scaler"].scale_.tolist()}
+    with open(path.replace(".joblib", ".json"), "w") as f:
+        json.dump(meta, f, indent=2, default=str)
+    save_metrics(evaluate_artifact(artifact), artifact["key"], model_dir)
+    from .svm_kernel import export_kernel, exportable, kernel_path
+    if exportable(artifact["model"]):
+        export_kernel(artifact, kernel_path(artifact["key"], model_dir))
+    from .explain import build_explainer, explain_path
+    build_explainer(artifact).save(explain_path(artifact["key"], model_dir))
+    return path
+
+def load_artifact(path: str, mmap: bool = True) -> Dict[str, Any]:
+    """
+    Load an artifact. With mmap=True numpy arrays (support vectors, test set)
+    are memory-mapped copy-on-write: libsvm needs writable buffers, but pages
+    are only copied if something actually writes to them.
+    """
+    return joblib.load(path, mmap_mode="c" if mmap else None)
+
+def current_key(data_path: str = None, params: Dict[str, Any] = None, model_dir: str = None) -> str:
+    """
+    Key of the artifact load_or_train() returns for the data file and params
+    (params=None: the selected params): the latest retrain_with_outcomes()
+    update if there is one, else the key trained from the data file.
+    """
+    params = selected_params(model_dir) if params is None else resolve_params(params)
+    key = artifact_key(file_hash(data_path or DATA_FILE), params)
+    retrained = _retrained_key(key, model_dir)
+    if retrained and os.path.exists(artifact_path(retrained, model_dir)):
+        return retrained
+    return key
+
+class ScalerStats:
+    """The fitted StandardScaler's mean_/scale_ (from the JSON sidecar) with its transforms, no sklearn needed."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def inverse_transform(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.mean_
+
+def load_model_info(data_path: str = None, params: Dict[str, Any] = None, model_dir: str = None) -> Dict[str, Any]:
+    """
+    Metadata of the artifact load_or_train() would return, read from its JSON
+    sidecar without unpickling the model: key, features, fill_values, data
+    path, params, ... and "scaler" as ScalerStats. Enough for the NumPy
+    export (svm_kernel.py), the stored explainer, the similarity index and
+    the drift monitor; the fitted model needs load_or_train().
+    Returns None if the artifact hasn't been trained yet.
+    """
+    key = current_key(data_path, params, model_dir)
+    path = artifact_path(key, model_dir).replace(".joblib", ".json")
+    if not os.path.exists(artifact_path(key, model_dir)) or not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        info = json.load(f)
+    if info.get("version") != ARTIFACT_VERSION or "scaler" not in info:
+        return None
+    info["scaler"] = ScalerStats(info["scaler"]["mean"], info["scaler"]["scale"])
+    return info
+
+def load_or_train(data_path: str = None, params: Dict[str, Any] = None,
+                  model_dir: str = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Return the artifact for the current data file and hyperparameters
+    (params=None: the selected params, see select_params), training and
+    saving it only if it doesn't exist yet (or force=True). If it was
+    updated with retrain_with_outcomes(), the latest update is returned;
+    force=True starts over from the data file.
+    """
+    data_path = data_path or DATA_FILE
+    params = selected_params(model_dir) if params is None else resolve_params(params)
+    if force:
+        key = artifact_key(file_hash(data_path), params)
+        if os.path.exists(_retrained_path(key, model_dir)):
+            os.remove(_retrained_path(key, model_dir))
+    else:
+        key = current_key(data_path, params, model_dir)
+    path = artifact_path(key, model_dir)
+
+    if not force and os.path.exists(path):
+        count("model.loaded")
+        with timed("model.load"):
+            return load_artifact(path)
+
+    count("model.trained")
+    with timed("model.train"):
+        artifact = train_model(data_path, params)
+        save_artifact(artifact, model_dir)
+    return artifact
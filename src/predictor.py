@@ -0,0 +1,98 @@
+"""
+Single-pass prediction for the trained SVC.
+
+SVC.predict_proba and SVC.predict each evaluate the kernel against every
+support vector, and predict() can disagree with the calibrated probability.
+predict_risk() evaluates the kernel once (decision_function), applies the
+model's Platt calibration in NumPy and derives the label from the probability.
+"""
+import warnings
+from typing import Any, Dict
+
+import numpy as np
+
+from .config import RISK_THRESHOLD
+from .instrumentation import count, timed
+
+# libsvm clamps pairwise probabilities to [MIN_PROB, 1 - MIN_PROB]
+MIN_PROB = 1e-7
+
+def _platt_params(model):
+    """Platt sigmoid (A, B) of a binary SVC fitted with probability=True, else None."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # probA_/probB_ are deprecated in newer sklearn
+        for a, b in (("_probA", "_probB"), ("probA_", "probB_")):
+            prob_a, prob_b = getattr(model, a, None), getattr(model, b, None)
+            if prob_a is not None and np.size(prob_a) == 1:
+                return float(np.ravel(prob_a)[0]), float(np.ravel(prob_b)[0])
+    return None
+
+def platt_probability(decision: np.ndarray, prob_a: float, prob_b: float) -> np.ndarray:
+    """
+    P(classes_[1]) from SVC decision_function values, reproducing libsvm's
+    predict_probability for two classes (sigmoid, clamping and the iterative
+    pairwise coupling, whose early stop leaves values near 0.5 at exactly 0.5).
+    """
+    # libsvm's decision value is the negated sklearn one; r01 = P(class 0)
+    f_ab = -np.asarray(decision, dtype=float) * prob_a + prob_b
+    with np.errstate(over="ignore"):
+        r01 = np.where(f_ab >= 0, np.exp(-f_ab) / (1.0 + np.exp(-f_ab)), 1.0 / (1.0 + np.exp(f_ab)))
+    r01 = np.clip(r01, MIN_PROB, 1 - MIN_PROB)
+    r10 = 1.0 - r01
+
+    # multiclass_probability() from libsvm specialised to k=2
+    q00, q11, q01 = r10 * r10, r01 * r01, -r10 * r01
+    p0 = np.full_like(r01, 0.5)
+    p1 = np.full_like(r01, 0.5)
+    eps = 0.005 / 2
+    active = np.ones(r01.shape, dtype=bool)
+    for _ in range(100):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        active &= np.maximum(np.abs(qp0 - pqp), np.abs(qp1 - pqp)) >= eps
+        if not active.any():
+            break
+        # coordinate update for t = 0 ...
+        diff = np.where(active, (-qp0 + pqp) / q00, 0.0)
+        p0 = p0 + diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp0, qp1 = (qp0 + diff * q00) / (1 + diff), (qp1 + diff * q01) / (1 + diff)
+        p0, p1 = p0 / (1 + diff), p1 / (1 + diff)
+
+        # ... then t = 1
+        diff = np.where(active, (-qp1 + pqp) / q11, 0.0)
+        p1 = p1 + diff
+        pqp = (pqp + diff * (diff * q11 + 2 * qp1)) / (1 + diff) / (1 + diff)
+        qp0, qp1 = (qp0 + diff * q01) / (1 + diff), (qp1 + diff * q11) / (1 + diff)
+        p0, p1 = p0 / (1 + diff), p1 / (1 + diff)
+    return p1
+
+@timed("predict")
+def predict_risk(model, X_scaled: np.ndarray, threshold: float = None) -> Dict[str, Any]:
+    """
+    Score already-scaled rows with one model evaluation.
+    - model: fitted SVC (probability=True), a model with probability_from_score
+      (approx_model.ApproxKernelClassifier) or any classifier with predict_proba
+    - threshold: label cut-off on the probability (defaults to config.RISK_THRESHOLD)
+    Returns dict of arrays: score (decision value; the probability itself for
+    plain predict_proba classifiers), probability (P(disease)) and label
+    (1 if probability > threshold).
+    """
+    threshold = RISK_THRESHOLD if threshold is None else threshold
+    count("predict.rows", len(X_scaled))
+    params = _platt_params(model)
+    if params is not None:
+        score = model.decision_function(X_scaled)
+        probability = platt_probability(score, *params)
+    elif hasattr(model, "probability_from_score"):
+        score = model.decision_function(X_scaled)
+        probability = model.probability_from_score(score)
+    else:
+        probability = model.predict_proba(X_scaled)[:, 1]
+        score = probability
+    return {
+        "score": score,
+        "probability": probability,
+        "label": (probability > threshold).astype(int),
+    }
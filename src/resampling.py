@@ -0,0 +1,152 @@
+"""
+Incremental SMOTE oversampling.
+
+imblearn's SMOTE rebuilds the k-nearest-neighbour search over the whole
+minority class on every fit_resample. IncrementalSMOTE keeps the minority
+samples in a MinorityIndex (a KD-tree over a base set plus a small brute-force
+delta buffer that is merged into the tree once it grows past a fraction of
+the base), so newly labelled rows are inserted without a rebuild and only the
+synthetic samples needed for them are generated. Synthetic samples use the
+same interpolation as SMOTE (x + u * (neighbour - x), u ~ U[0, 1)) and each
+update draws from its own seeded generator, so results are reproducible.
+The whole state can be persisted with save()/load().
+"""
+import os
+from typing import Tuple
+
+import joblib
+import numpy as np
+
+class MinorityIndex:
+    """
+    k-nearest-neighbour index with cheap appends.
+    - rebuild_ratio: merge the delta buffer into the KD-tree once it holds
+      more than this fraction of the tree's points ...
+    - max_delta: ... or more than this many points (brute force cost cap)
+    """
+
+    def __init__(self, X: np.ndarray, rebuild_ratio: float = 0.25, max_delta: int = 4096, leaf_size: int = 40):
+        self.rebuild_ratio = rebuild_ratio
+        self.max_delta = max_delta
+        self.leaf_size = leaf_size
+        self.rebuilds = 0
+        self._build(np.asarray(X, dtype=np.float64))
+
+    def _build(self, points: np.ndarray):
+        from sklearn.neighbors import KDTree
+        self.base = points
+        self.delta = points[:0]
+        self.tree = KDTree(points, leaf_size=self.leaf_size)
+        self.rebuilds += 1
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.delta)
+
+    @property
+    def points(self) -> np.ndarray:
+        return np.vstack([self.base, self.delta]) if len(self.delta) else self.base
+
+    def take(self, idx: np.ndarray) -> np.ndarray:
+        """Rows of self.points without materializing it."""
+        in_base = idx < len(self.base)
+        out = np.empty((len(idx), self.base.shape[1]))
+        out[in_base] = self.base[idx[in_base]]
+        out[~in_base] = self.delta[idx[~in_base] - len(self.base)]
+        return out
+
+    def add(self, X: np.ndarray):
+        self.delta = np.vstack([self.delta, np.asarray(X, dtype=np.float64)])
+        if len(self.delta) > min(self.rebuild_ratio * len(self.base), self.max_delta):
+            self._build(self.points)
+
+    def kneighbors(self, X: np.ndarray, k: int) -> np.ndarray:
+        """Indices (into self.points) of the k nearest points to each row of X, nearest first."""
+        X = np.asarray(X, dtype=np.float64)
+        dist, idx = self.tree.query(X, k=min(k, len(self.base)))
+        if not len(self.delta):
+            return idx
+        d_delta = np.sqrt(np.maximum(
+            (X ** 2).sum(axis=1)[:, None] - 2 * X @ self.delta.T + (self.delta ** 2).sum(axis=1), 0))
+        kd = min(k, len(self.delta))
+        part = np.argpartition(d_delta, kd - 1, axis=1)[:, :kd]
+        dist = np.hstack([dist, np.take_along_axis(d_delta, part, axis=1)])
+        idx = np.hstack([idx, part + len(self.base)])
+        order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(idx, order, axis=1)
+
+class IncrementalSMOTE:
+    """
+    SMOTE that can take new rows without starting over.
+    fit_resample(X, y) oversamples from scratch; partial_fit_resample(X_new, y_new)
+    adds rows and returns the updated resampled set (all original rows followed
+    by the synthetic ones).
+    """
+
+    def __init__(self, k_neighbors: int = 5, random_state: int = 42, rebuild_ratio: float = 0.25):
+        self.k_neighbors = k_neighbors
+        self.random_state = random_state
+        self.rebuild_ratio = rebuild_ratio
+
+    def fit_resample(self, X, y) -> Tuple[np.ndarray, np.ndarray]:
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        labels, counts = np.unique(y, return_counts=True)
+        if len(labels) != 2:
+            raise ValueError(f"IncrementalSMOTE needs exactly two classes, got {len(labels)}")
+        self.minority_ = labels[np.argmin(counts)]
+        self.X_, self.y_ = X, y
+        self.index_ = MinorityIndex(X[y == self.minority_], self.rebuild_ratio)
+        self.synthetic_ = X[:0]
+        self.step_ = 0
+        self._generate(np.arange(len(self.index_)))
+        return self.resampled()
+
+    def partial_fit_resample(self, X_new, y_new) -> Tuple[np.ndarray, np.ndarray]:
+        X_new = np.asarray(X_new, dtype=np.float64)
+        y_new = np.asarray(y_new)
+        X, y = np.vstack([self.X_, X_new]), np.concatenate([self.y_, y_new])
+        if (y == self.minority_).sum() > (y != self.minority_).sum():
+            return self.fit_resample(X, y)  # the other class became the minority
+
+        self.X_, self.y_ = X, y
+        start = len(self.index_)
+        new_minority = X_new[y_new == self.minority_]
+        if len(new_minority):
+            self.index_.add(new_minority)
+        # new synthetic samples are seeded from the new minority rows only
+        seeds = np.arange(start, len(self.index_)) if len(new_minority) else np.arange(len(self.index_))
+        self._generate(seeds)
+        return self.resampled()
+
+    def _generate(self, seeds: np.ndarray):
+        """Top the synthetic set up (or trim it) to balance the classes, seeding from `seeds`."""
+        needed = int((self.y_ != self.minority_).sum() - len(self.index_)) - len(self.synthetic_)
+        self.step_ += 1
+        if needed <= 0:
+            self.synthetic_ = self.synthetic_[:len(self.synthetic_) + needed]
+            return
+        rng = np.random.default_rng([self.random_state, self.step_])
+        chosen = seeds[rng.integers(len(seeds), size=needed)]
+        unique, inverse = np.unique(chosen, return_inverse=True)
+        # k + 1 neighbours: the nearest is the seed itself
+        x_unique = self.index_.take(unique)
+        neighbours = self.index_.kneighbors(x_unique, self.k_neighbors + 1)[:, 1:]
+        picks = neighbours[inverse, rng.integers(neighbours.shape[1], size=needed)]
+        gap = rng.random(needed)[:, None]
+        x = x_unique[inverse]
+        self.synthetic_ = np.vstack([self.synthetic_, x + gap * (self.index_.take(picks) - x)])
+
+    def resampled(self) -> Tuple[np.ndarray, np.ndarray]:
+        X = np.vstack([self.X_, self.synthetic_])
+        y = np.concatenate([self.y_, np.full(len(self.synthetic_), self.minority_, dtype=self.y_.dtype)])
+        return X, y
+
+    def save(self, path: str) -> str:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp)
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def load(path: str) -> "IncrementalSMOTE":
+        return joblib.load(path)
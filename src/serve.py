@@ -0,0 +1,278 @@
+"""
+Standalone asyncio HTTP inference service.
+
+Loads the model artifact once and serves:
+- GET  /health
+- GET  /metrics        stage latencies (see instrumentation.py; start with --metrics)
+- POST /predict        body: one patient as a JSON object
+- POST /predict_batch  body: {"patients": [...]} (or a JSON list)
+
+Concurrent requests are coalesced by MicroBatcher into one model evaluation
+per micro-batch; if that evaluation fails, each request in the batch is
+retried on its own so one bad record can't fail its neighbours. Run locally with:
+    python -m src.serve --port 8000
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from .batch_scoring import feature_matrix
+from .clinical_rules import get_warnings
+from .data_loader import _normalize_columns
+from . import instrumentation
+from .model_registry import load_or_train
+from .predictor import predict_risk
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+def make_predict_fn(artifact: Dict[str, Any]) -> Callable[[List[dict]], List[dict]]:
+    """Vectorized scorer for a list of patient dicts (one model call for the whole list)."""
+    model, scaler = artifact["model"], artifact["scaler"]
+
+    def predict(records: List[dict]) -> List[dict]:
+        df = _normalize_columns(pd.DataFrame.from_records(records))
+        result = predict_risk(model, scaler.transform(feature_matrix(df, artifact)))
+        return [{"disease_prob": float(p), "prediction": int(y), "warnings": get_warnings(r)}
+                for p, y, r in zip(result["probability"], result["label"], records)]
+    return predict
+
+def _is_finite_number(value) -> bool:
+    """None (missing, filled like training data), or a number / numeric string that is finite."""
+    if value is None:
+        return True
+    try:
+        return math.isfinite(float(value))
+    except (TypeError, ValueError):
+        return False
+
+class MicroBatcher:
+    """
+    Collects concurrent submissions into micro-batches: a batch is flushed once
+    it holds max_batch rows or max_wait_ms has passed since its first row.
+    The predict function runs in a worker thread so the event loop stays free.
+    """
+
+    def __init__(self, predict_fn: Callable[[List[dict]], List[dict]],
+                 max_batch: int = 64, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self.max_requests = 0  # most submissions coalesced into one batch so far
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, records: List[dict]) -> List[dict]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        size = len(items[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while size < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    async def _score(self, items):
+        """Evaluate a micro-batch and resolve its futures; on failure retry each submission alone."""
+        records = [r for recs, _ in items for r in recs]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, self.predict_fn, records)
+        except Exception as e:
+            if len(items) > 1:
+                instrumentation.count("serve.batch_retries")
+                for item in items:
+                    await self._score([item])
+                return
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(records)
+        self.max_requests = max(self.max_requests, len(items))
+        instrumentation.count("serve.batches")
+        offset = 0
+        for recs, future in items:
+            if not future.done():
+                future.set_result(results[offset:offset + len(recs)])
+            offset += len(recs)
+
+    async def _run(self):
+        while True:
+            await self._score(await self._collect())
+
+class InferenceServer:
+    """HTTP/1.1 (keep-alive) front end over a MicroBatcher."""
+
+    def __init__(self, artifact: Dict[str, Any], max_batch: int = 64, max_wait_ms: float = 2.0):
+        self.features = artifact["features"]
+        self.batcher = MicroBatcher(make_predict_fn(artifact), max_batch, max_wait_ms)
+        self.started = time.time()
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    def _validate(self, records) -> List[dict]:
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("expected a patient object or a list of patient objects")
+        for r in records:
+            values = {k.strip().lower().replace(" ", "_"): v for k, v in r.items()}
+            missing = [c for c in self.features if c not in values]
+            if missing:
+                raise ValueError(f"missing required fields: {missing}")
+            invalid = [c for c in self.features if c != "gender" and not _is_finite_number(values[c])]
+            if invalid:
+                raise ValueError(f"fields must be finite numbers (or null): {invalid}")
+        return records
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if path == "/health":
+            return 200, {"status": "ok", "uptime_s": round(time.time() - self.started, 1),
+                         "batches": self.batcher.batches, "rows": self.batcher.rows}
+        if path == "/metrics":
+            return 200, instrumentation.snapshot()
+        if path not in ("/predict", "/predict_batch"):
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        try:
+            payload = json.loads(body or b"null")
+            if path == "/predict":
+                records = self._validate([payload])
+            else:
+                records = self._validate(payload.get("patients") if isinstance(payload, dict) else payload)
+        except ValueError as e:  # includes JSONDecodeError
+            return 400, {"error": str(e)}
+
+        if not records:
+            return 200, {"results": []}
+        with instrumentation.timed("serve.request"):
+            results = await self.batcher.submit(records)
+        return 200, results[0] if path == "/predict" else {"results": results}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # the body can't be framed, so the connection can't be reused either
+                    status, payload = 400, {"error": "invalid Content-Length header"}
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, payload = 413, {"error": "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self._route(method.upper(), target.split("?", 1)[0], body)
+                    except Exception as e:
+                        status, payload = 500, {"error": str(e)}
+                    keep_alive = (headers.get("connection", "").lower() != "close"
+                                  and version.strip().upper() == "HTTP/1.1")
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host: str = "127.0.0.1", port: int = 8000, max_batch: int = 64, max_wait_ms: float = 2.0):
+    server = InferenceServer(load_or_train(), max_batch=max_batch, max_wait_ms=max_wait_ms)
+    await server.start(host, port)
+    print(f"Serving on http://{host}:{server.port} (max_batch={max_batch}, max_wait_ms={max_wait_ms})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HepaGuard inference service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--metrics", action="store_true", help="record stage latencies (GET /metrics)")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        instrumentation.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Dependency-light inference for the trained RBF SVC.
+
+export_kernel() flattens an SVC artifact into an .npz of plain arrays:
+support vectors, dual coefficients, intercept, gamma, the Platt sigmoid (A, B)
+and the StandardScaler mean/scale. KernelSVM evaluates it with NumPy only
+(no sklearn, pandas or joblib needed to load or predict), with the scaling
+folded into the kernel terms:
+
+    z = (x - mean) / scale
+    ||z - sv||^2 = ||z||^2 + ||sv||^2 - 2 x . (sv / scale) + 2 (mean / scale) . sv
+
+so each batch costs one matrix product against the support vectors, done in
+row blocks to bound memory. Scores and probabilities match
+predictor.predict_risk on the sklearn model to floating point tolerance.
+"""
+import json
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+from .config import MODEL_DIR, RISK_THRESHOLD
+from .predictor import _platt_params, platt_probability
+
+# Bump when the exported arrays change
+KERNEL_VERSION = 1
+
+# Rows per kernel block: BLOCK_ROWS x n_support_vectors float64 temporaries
+BLOCK_ROWS = 4096
+
+def kernel_path(key: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, f"svm_{key}.npz")
+
+def exportable(model) -> bool:
+    """True for the models export_kernel supports: binary RBF SVCs fitted with probability=True."""
+    return (getattr(model, "kernel", None) == "rbf" and len(getattr(model, "classes_", ())) == 2
+            and _platt_params(model) is not None)
+
+def export_kernel(artifact: Dict[str, Any], path: str = None) -> str:
+    """
+    Write the arrays KernelSVM needs for an artifact from model_registry
+    (SVC with an RBF kernel and probability=True). Writes are atomic.
+    Returns the .npz path (defaults to kernel_path(artifact["key"])).
+    """
+    model, scaler = artifact["model"], artifact["scaler"]
+    if getattr(model, "kernel", None) != "rbf" or len(getattr(model, "classes_", ())) != 2:
+        raise ValueError("Only binary RBF SVC models can be exported")
+    platt = _platt_params(model)
+    if platt is None:
+        raise ValueError("Model was fitted without probability=True (no Platt calibration)")
+
+    path = path or kernel_path(artifact["key"])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    meta = {"version": KERNEL_VERSION, "key": artifact["key"], "features": list(artifact["features"])}
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        tmp,
+        meta=json.dumps(meta),
+        support_vectors=np.asarray(model.support_vectors_, dtype=np.float64),
+        dual_coef=np.asarray(model.dual_coef_, dtype=np.float64).ravel(),
+        intercept=np.float64(model.intercept_[0]),
+        gamma=np.float64(model._gamma),  # the resolved value, also for gamma="scale"
+        prob_a=np.float64(platt[0]),
+        prob_b=np.float64(platt[1]),
+        classes=np.asarray(model.classes_),
+        mean=np.asarray(scaler.mean_, dtype=np.float64),
+        scale=np.asarray(scaler.scale_, dtype=np.float64),
+    )
+    os.replace(tmp, path)
+    return path
+
+class KernelSVM:
+    """
+    Exported SVC + scaler, evaluated on unscaled feature rows (features order).
+    decision_function/predict_proba/predict_risk mirror the sklearn model and
+    predictor.predict_risk, but take raw values: the scaler is folded in.
+    """
+
+    def __init__(self, arrays: Dict[str, Any]):
+        meta = json.loads(str(arrays["meta"]))
+        if meta["version"] != KERNEL_VERSION:
+            raise ValueError(f"Exported kernel version {meta['version']} != {KERNEL_VERSION}")
+        self.key = meta["key"]
+        self.features = meta["features"]
+        self.classes_ = np.asarray(arrays["classes"])
+        self.gamma = float(arrays["gamma"])
+        self.intercept = float(arrays["intercept"])
+        self.prob_a, self.prob_b = float(arrays["prob_a"]), float(arrays["prob_b"])
+        self.dual_coef = np.asarray(arrays["dual_coef"], dtype=np.float64)
+
+        sv = np.asarray(arrays["support_vectors"], dtype=np.float64)
+        mean = np.asarray(arrays["mean"], dtype=np.float64)
+        scale = np.asarray(arrays["scale"], dtype=np.float64)
+        self.n_support = len(sv)
+        # folded scaler: z = x * inv_scale - shift
+        self.inv_scale = 1.0 / scale
+        self.shift = mean / scale
+        # ||z - sv||^2 = ||z||^2 + sv_const - 2 x @ sv_t, with sv_t = (sv / scale).T
+        self.sv_t = np.ascontiguousarray((sv * self.inv_scale).T)
+        self.sv_const = (sv * sv).sum(axis=1) + 2.0 * (sv @ self.shift)
+
+    def decision_function(self, X) -> np.ndarray:
+        """SVC decision values for raw (unscaled) rows, shape (n,)."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty(len(X))
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            z = block * self.inv_scale - self.shift
+            d2 = block @ self.sv_t
+            d2 *= -2.0
+            d2 += self.sv_const
+            d2 += np.einsum("ij,ij->i", z, z)[:, None]
+            np.maximum(d2, 0.0, out=d2)  # rounding can leave tiny negatives
+            d2 *= -self.gamma
+            np.exp(d2, out=d2)
+            out[start:start + len(block)] = d2 @ self.dual_coef + self.intercept
+        return out
+
+    def predict_proba(self, X) -> np.ndarray:
+        p1 = platt_probability(self.decision_function(X), self.prob_a, self.prob_b)
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict_risk(self, X, threshold: float = None) -> Dict[str, Any]:
+        """Same dict as predictor.predict_risk (score, probability, label) for raw rows."""
+        threshold = RISK_THRESHOLD if threshold is None else threshold
+        score = self.decision_function(X)
+        probability = platt_probability(score, self.prob_a, self.prob_b)
+        return {"score": score, "probability": probability, "label": (probability > threshold).astype(int)}
+
+    def nbytes(self) -> int:
+        return self.sv_t.nbytes + self.sv_const.nbytes + self.dual_coef.nbytes + self.inv_scale.nbytes + self.shift.nbytes
+
+def load_kernel(path: str) -> KernelSVM:
+    with np.load(path, allow_pickle=False) as data:
+        return KernelSVM({k: data[k] for k in data.files})
+
+def load_or_export(artifact: Dict[str, Any], model_dir: str = None) -> KernelSVM:
+    """KernelSVM for an artifact, exporting it first if there is no .npz yet."""
+    path = kernel_path(artifact["key"], model_dir)
+    if not os.path.exists(path):
+        export_kernel(artifact, path)
+    return load_kernel(path)
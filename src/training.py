@@ -0,0 +1,150 @@
+"""
+Cross-validated hyperparameter search for the SMOTE + scaler + model pipeline
+(SVC or an approximate-kernel backend, see approx_model.py).
+
+Each (params, fold) pair is one task. Tasks run in a process pool whose
+workers memory-map the training matrix from a temporary .npy file once
+(initializer), so the data is shared through the page cache instead of being
+pickled per task. Fold scores are cached on disk by data hash, params and
+fold, so re-running a search only computes new combinations. The best
+params are exported as the app's model through the model registry.
+"""
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .approx_model import make_model
+from .config import DATA_FILE, MODEL_DIR
+from .data_loader import load_data
+from .model_registry import ARTIFACT_VERSION, file_hash, load_or_train, prepare_training_data, resolve_params, select_params
+from .resampling import IncrementalSMOTE
+
+DEFAULT_GRID = {
+    "kernel": ["rbf"],
+    "C": [0.5, 1.0, 2.0, 4.0],
+    "gamma": ["scale", 0.05, 0.2],
+    "smote_k_neighbors": [3, 5, 7],
+}
+
+# Set in each worker by _init_worker
+_X = None
+_y = None
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict[str, Any]]:
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def _init_worker(data_dir: str):
+    global _X, _y
+    _X = np.load(os.path.join(data_dir, "X.npy"), mmap_mode="r")
+    _y = np.load(os.path.join(data_dir, "y.npy"), mmap_mode="r")
+
+def _fold_score(params: Dict[str, Any], fold: int, n_splits: int, seed: int) -> float:
+    """ROC AUC of one CV fold (SMOTE and scaling fitted on the training part only)."""
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.preprocessing import StandardScaler
+
+    splits = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed).split(_X, _y)
+    train_idx, val_idx = next(itertools.islice(splits, fold, None))
+
+    smote = IncrementalSMOTE(k_neighbors=params["smote_k_neighbors"], random_state=seed)
+    X_res, y_res = smote.fit_resample(_X[train_idx], _y[train_idx])
+    scaler = StandardScaler()
+    model = make_model(params, probability=False)
+    model.fit(scaler.fit_transform(X_res), y_res)
+    return float(roc_auc_score(_y[val_idx], model.decision_function(scaler.transform(_X[val_idx]))))
+
+def _task_key(data_hash: str, params: Dict[str, Any], fold: int, n_splits: int, seed: int, test_size: float) -> str:
+    # ARTIFACT_VERSION: scores are stale when the preprocessing changes
+    payload = json.dumps([data_hash, params, fold, n_splits, seed, test_size, ARTIFACT_VERSION],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+def _load_cache(path: str) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _save_cache(cache: Dict[str, float], path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(cache, f)
+    os.replace(path + ".tmp", path)
+
+def search(data_path: str = None, grid: Dict[str, list] = None, n_splits: int = 5, workers: int = 1,
+           model_dir: str = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Grid-search hyperparameters with stratified k-fold CV on the training split
+    (the registry's held-out test set is never touched).
+    - grid: lists of values per param (defaults to DEFAULT_GRID)
+    - workers: processes for fold tasks (1 runs in-process)
+    - use_cache: reuse/store fold scores in model_dir/cv_cache.json
+    Returns dict with best params, per-params mean/std AUC, tasks computed vs cached and seconds.
+    """
+    from sklearn.model_selection import train_test_split
+
+    start = time.perf_counter()
+    data_path = data_path or DATA_FILE
+    base = resolve_params()
+    data_hash = file_hash(data_path)
+    candidates = [resolve_params(p) for p in expand_grid(grid or DEFAULT_GRID)]
+    seed, test_size = base["random_state"], base["test_size"]
+
+    cache_path = os.path.join(model_dir or MODEL_DIR, "cv_cache.json")
+    cache = _load_cache(cache_path) if use_cache else {}
+    tasks = [(p, fold) for p in candidates for fold in range(n_splits)]
+    todo = [(p, fold) for p, fold in tasks
+            if _task_key(data_hash, p, fold, n_splits, seed, test_size) not in cache]
+
+    if todo:
+        X, y = prepare_training_data(load_data(data_path))
+        X_train, _, y_train, _ = train_test_split(X, y, test_size=test_size, random_state=seed, stratify=y)
+        with tempfile.TemporaryDirectory() as data_dir:
+            np.save(os.path.join(data_dir, "X.npy"), X_train.to_numpy(dtype=np.float64))
+            np.save(os.path.join(data_dir, "y.npy"), y_train.to_numpy(dtype=np.int64))
+
+            def record(params, fold, score):
+                cache[_task_key(data_hash, params, fold, n_splits, seed, test_size)] = score
+
+            if workers <= 1:
+                _init_worker(data_dir)
+                for p, fold in todo:
+                    record(p, fold, _fold_score(p, fold, n_splits, seed))
+            else:
+                with concurrent.futures.ProcessPoolExecutor(
+                        max_workers=workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+                    futures = {pool.submit(_fold_score, p, fold, n_splits, seed): (p, fold) for p, fold in todo}
+                    for future in concurrent.futures.as_completed(futures):
+                        record(*futures[future], future.result())
+        if use_cache:
+            _save_cache(cache, cache_path)
+
+    results = []
+    for p in candidates:
+        scores = [cache[_task_key(data_hash, p, fold, n_splits, seed, test_size)] for fold in range(n_splits)]
+        results.append({"params": p, "mean_auc": float(np.mean(scores)), "std_auc": float(np.std(scores))})
+    results.sort(key=lambda r: r["mean_auc"], reverse=True)
+
+    return {
+        "best_params": results[0]["params"],
+        "results": results,
+        "tasks": len(tasks),
+        "computed": len(todo),
+        "seconds": time.perf_counter() - start,
+    }
+
+def export_best(search_result: Dict[str, Any], data_path: str = None, model_dir: str = None) -> Dict[str, Any]:
+    """Train the best params through the registry and make them the app's default model."""
+    params = search_result["best_params"]
+    artifact = load_or_train(data_path, params, model_dir=model_dir)
+    select_params(params, model_dir)
+    return artifact
@@ -0,0 +1,127 @@
+"""
+Streaming (out-of-core) validation of lab exports.
+
+validate_csv() walks a CSV chunk by chunk via data_loader.iter_chunks and
+accumulates a report: required columns, lab values that are not numbers,
+PHYSICAL_BOUNDS range violations, null rates and duplicate rows. Only one chunk (per worker) is held in memory;
+duplicates are found through a set of 64-bit row hashes. Chunks can be
+validated in parallel across a process pool.
+"""
+import concurrent.futures
+from collections import deque
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from .clinical_rules import PHYSICAL_BOUNDS
+from .data_loader import SCHEMA, iter_chunks, normalize_frame
+
+# Columns every export must have (same set tests/test_data_validation.py checks)
+REQUIRED_COLUMNS = {"dataset", "gender", "total_bilirubin", "alamine_aminotransferase", "albumin"}
+
+# Columns whose values must parse as numbers (gender and dataset are mapped labels)
+LAB_COLUMNS = [c for c in SCHEMA if c not in ("gender", "dataset")]
+
+def chunk_stats(chunk: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Per-chunk counts plus row hashes for a raw chunk (iter_chunks(normalize=False));
+    module-level so it can run in a worker process. Bounds are checked on the
+    raw numbers, before normalize_frame narrows them to the compact schema;
+    lab cells that don't parse as numbers are counted as invalid.
+    """
+    out_of_range, invalid = {}, {}
+    for raw, c in zip(chunk.columns, (c.strip().lower().replace(" ", "_") for c in chunk.columns)):
+        if c not in LAB_COLUMNS:
+            continue
+        values = pd.to_numeric(chunk[raw], errors="coerce")
+        invalid[c] = int((values.isna() & chunk[raw].notna()).sum())
+        if c in PHYSICAL_BOUNDS:
+            low, high = PHYSICAL_BOUNDS[c]
+            out_of_range[c] = (int((values < low).sum()), int((values > high).sum()))
+    chunk = normalize_frame(chunk)
+    return {
+        "columns": list(chunk.columns),
+        "rows": len(chunk),
+        "nulls": chunk.isna().sum().astype(int).to_dict(),
+        "invalid": invalid,
+        "out_of_range": out_of_range,
+        "hashes": pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64),
+    }
+
+def _empty_report() -> Dict[str, Any]:
+    return {"rows": 0, "chunks": 0, "columns": None, "nulls": {}, "invalid": {}, "out_of_range": {},
+            "duplicate_rows": 0}
+
+def _merge(report: Dict[str, Any], stats: Dict[str, Any], seen: set):
+    report["chunks"] += 1
+    report["rows"] += stats["rows"]
+    if report["columns"] is None:
+        report["columns"] = stats["columns"]
+    for c, n in stats["nulls"].items():
+        report["nulls"][c] = report["nulls"].get(c, 0) + n
+    for c, n in stats["invalid"].items():
+        report["invalid"][c] = report["invalid"].get(c, 0) + n
+    for c, (below, above) in stats["out_of_range"].items():
+        prev = report["out_of_range"].get(c, {"below": 0, "above": 0})
+        report["out_of_range"][c] = {"below": prev["below"] + below, "above": prev["above"] + above}
+    for h in stats["hashes"].tolist():
+        if h in seen:
+            report["duplicate_rows"] += 1
+        else:
+            seen.add(h)
+
+def _finish(report: Dict[str, Any]) -> Dict[str, Any]:
+    rows = max(report["rows"], 1)
+    columns = report["columns"] or []
+    report["missing_required"] = sorted(REQUIRED_COLUMNS - set(columns))
+    report["null_rates"] = {c: n / rows for c, n in report["nulls"].items()}
+    report["duplicate_rate"] = report["duplicate_rows"] / rows
+    report["out_of_range_rows"] = sum(v["below"] + v["above"] for v in report["out_of_range"].values())
+    report["invalid_values"] = sum(report["invalid"].values())
+    report["passed"] = (not report["missing_required"] and report["out_of_range_rows"] == 0
+                        and report["invalid_values"] == 0)
+    return report
+
+def validate_csv(path: str = None, chunksize: int = 100_000, workers: int = None) -> Dict[str, Any]:
+    """
+    Validate a CSV without loading it whole.
+    - path: CSV path (defaults to config.DATA_FILE)
+    - chunksize: rows per chunk
+    - workers: >1 validates chunks in a process pool (at most 2 chunks per worker in flight)
+    Returns the validation report dict (see print_report).
+    """
+    report, seen = _empty_report(), set()
+
+    if not workers or workers <= 1:
+        for chunk in iter_chunks(path, chunksize, normalize=False):
+            _merge(report, chunk_stats(chunk), seen)
+        return _finish(report)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in iter_chunks(path, chunksize, normalize=False):
+            pending.append(pool.submit(chunk_stats, chunk))
+            if len(pending) >= 2 * workers:
+                _merge(report, pending.popleft().result(), seen)
+        while pending:
+            _merge(report, pending.popleft().result(), seen)
+    return _finish(report)
+
+def print_report(report: Dict[str, Any]):
+    print(f"Rows: {report['rows']} in {report['chunks']} chunks")
+    print(f"Missing required columns: {report['missing_required'] or 'none'}")
+    print(f"Duplicate rows: {report['duplicate_rows']} ({report['duplicate_rate']:.2%})")
+    print("Null rates:")
+    for c, rate in report["null_rates"].items():
+        if rate:
+            print(f" - {c}: {rate:.2%}")
+    print("Not a number:")
+    for c, n in report["invalid"].items():
+        if n:
+            print(f" - {c}: {n}")
+    print("Out of physical bounds:")
+    for c, counts in report["out_of_range"].items():
+        if counts["below"] or counts["above"]:
+            print(f" - {c}: {counts['below']} below, {counts['above']} above")
+    print("PASSED" if report["passed"] else "FAILED")
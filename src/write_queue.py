@@ -0,0 +1,124 @@
+"""
+Write-behind persistence for patient records.
+
+The app should not wait on a connect, commit and fsync per prediction.
+WriteBehindQueue accepts records into a bounded in-process queue and a
+worker thread writes them with PatientStore.insert_many, one transaction per
+batch of up to batch_size records or whatever arrived within flush_interval
+seconds of the first pending record. When the queue is full, submit() blocks
+(backpressure) instead of growing memory without bound. close() - also
+registered with atexit - drains the queue before the process exits.
+"""
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Dict
+
+from .instrumentation import count, observe
+
+_STOP = object()
+
+class WriteBehindQueue:
+    """
+    Background batch writer for a db.PatientStore.
+    - store: PatientStore the records are written to
+    - batch_size: write as soon as this many records are pending
+    - flush_interval: ... or this many seconds after the first pending record
+    - max_pending: queue capacity; submit() blocks while it is full
+    - retries: attempts per batch before its records are dropped (counted in .dropped)
+    """
+
+    def __init__(self, store, batch_size: int = 100, flush_interval: float = 0.2, max_pending: int = 10_000,
+                 retries: int = 3):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.written = 0
+        self.dropped = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, record: Dict[str, Any], timeout: float = None):
+        """
+        Queue a record (db column names) for writing. Blocks while the queue is
+        full; raises queue.Full if it is still full after timeout seconds.
+        """
+        # under the close lock, so no record can land behind close()'s stop marker
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self._queue.put(record, timeout=timeout)
+        count("write_queue.submitted")
+
+    def pending(self) -> int:
+        """Records queued but not yet taken by the worker."""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until every record submitted so far has been written (or dropped)."""
+        self._queue.join()
+
+    def close(self):
+        """Stop accepting records, write everything pending and stop the worker."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+        atexit.unregister(self.close)
+
+    def _next_batch(self):
+        """Wait for a record, then collect more until batch_size or flush_interval. Returns (batch, stop)."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is _STOP:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        for attempt in range(self.retries):
+            try:
+                self.store.insert_many(batch)
+                self.written += len(batch)
+                observe("write_queue.flush", time.perf_counter() - start)
+                count("write_queue.batches")
+                return
+            except Exception as e:  # keep the worker alive; the app must not lose its writer
+                self.last_error = e
+                time.sleep(0.05 * (attempt + 1))
+        self.dropped += len(batch)
+        count("write_queue.dropped", len(batch))
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from src.config import DATA_FILE
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache(tmp_path_factory):
+    """Keep load_data's cache (also used indirectly, e.g. by training) out of the repo's .cache/."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.data_loader.CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        yield
+
+@pytest.fixture(scope="session")
+def small_csv(tmp_path_factory):
+    """A 600-row sample of the bundled CSV so model tests train in well under a second."""
+    df = pd.read_csv(DATA_FILE).sample(n=600, random_state=0)
+    path = tmp_path_factory.mktemp("data") / "liver_sample.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+@pytest.fixture(scope="session")
+def small_artifact(small_csv, tmp_path_factory):
+    from src.model_registry import load_or_train
+    return load_or_train(small_csv, model_dir=str(tmp_path_factory.mktemp("models")))
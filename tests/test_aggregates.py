@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.aggregates import (CLASSES, FEATURES, add_rows, build_aggregates, correlation, empty_aggregates,
+                            feature_summary, histogram, load_aggregates, quantiles, rule_rates, save_aggregates,
+                            sync_aggregates)
+from src.clinical_rules import rule_flags
+from src.data_loader import load_data
+from src.db import PatientStore, create_db, insert_patient
+
+def test_chunked_build_matches_single_pass(small_csv):
+    streamed = build_aggregates(small_csv, chunksize=97)
+    whole = add_rows(empty_aggregates(), load_data(small_csv, use_cache=False))
+    for key in ("hist", "missing", "rows", "rule_counts", "pair_n"):
+        np.testing.assert_array_equal(streamed[key], whole[key])
+    np.testing.assert_allclose(streamed["pair_sxy"], whole["pair_sxy"])
+
+def test_derived_views_match_raw_data(small_csv):
+    df = load_data(small_csv, use_cache=False)
+    agg = build_aggregates(small_csv)
+
+    assert agg["rows"].tolist() == [(df["dataset"] == "liver_disease").sum(), (df["dataset"] == "healthy").sum(), 0]
+    np.testing.assert_allclose(correlation(agg).to_numpy(), df[FEATURES].astype(float).corr().to_numpy(), atol=1e-9)
+
+    flags = rule_flags(df)
+    np.testing.assert_allclose(rule_rates(agg)["all"].to_numpy(), flags.mean().to_numpy())
+
+    values = df["albumin"].astype(float).dropna()
+    edges, counts = histogram(agg, "albumin")
+    assert counts.sum() == len(values)
+    width = edges[1] - edges[0]
+    np.testing.assert_allclose(quantiles(agg, "albumin"), values.quantile([0.05, 0.25, 0.5, 0.75, 0.95]), atol=width)
+
+    summary = feature_summary(agg)
+    assert summary.loc["age", "count"] == df["age"].notna().sum()
+    np.testing.assert_allclose(summary.loc["total_bilirubin", "mean"], df["total_bilirubin"].astype(float).mean())
+
+def test_sync_folds_in_new_patients(small_csv, tmp_path):
+    agg_path = str(tmp_path / "aggregates.npz")
+    save_aggregates(build_aggregates(small_csv), agg_path)
+    before = load_aggregates(agg_path)
+
+    db_path = create_db(str(tmp_path / "app.db"))
+    record = {"name": "A", "age": 50, "gender": "Male", "total_bilirubin": 3.0, "alamine_aminotransferase": 80,
+              "albumin": 3.0, "ag_ratio": 0.9, "disease_prob": 0.7}
+    insert_patient(record, db_path=db_path)
+    with PatientStore(db_path) as store:
+        store.insert_many([record, dict(record, albumin=4.0)])
+        assert load_aggregates(agg_path)["rows"].sum() == before["rows"].sum()  # inserts don't touch the file
+        assert sync_aggregates(store, agg_path, batch_size=2) == 3
+        assert sync_aggregates(store, agg_path) == 0
+
+    after = load_aggregates(agg_path)
+    unlabelled = CLASSES.index("unlabelled")
+    assert after["rows"][unlabelled] == 3
+    assert (after["rows"] - before["rows"]).sum() == 3
+    rates = rule_rates(after)["unlabelled"]
+    assert rates["high_bilirubin"] == 1.0 and rates["low_albumin"] == 2 / 3
+
+def test_sync_without_aggregates_file(tmp_path):
+    db_path = create_db(str(tmp_path / "app.db"))
+    insert_patient({"name": "A", "age": 50}, db_path=db_path)
+    with PatientStore(db_path) as store:
+        assert sync_aggregates(store, str(tmp_path / "missing.npz")) == 0
+    assert not (tmp_path / "missing.npz").exists()
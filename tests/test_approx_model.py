@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.approx_model import ApproxKernelClassifier, make_model
+from src.evaluation import evaluate_artifact, roc_from_metrics
+from src.model_registry import load_or_train, resolve_params
+from src.predictor import predict_risk
+
+def _blobs(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = (np.linalg.norm(X[:, :2], axis=1) > 1.2).astype(int)  # non-linear boundary
+    return X, y
+
+@pytest.mark.parametrize("method", ["nystroem", "rff"])
+def test_learns_nonlinear_boundary(method):
+    X, y = _blobs()
+    model = ApproxKernelClassifier(method, gamma=0.5, n_components=200, batch_size=256, epochs=10,
+                                   random_state=0).fit(X, y)
+    X_test, y_test = _blobs(seed=1)
+    assert (model.predict(X_test) == y_test).mean() > 0.85
+    proba = model.predict_proba(X_test)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(model.predict(X_test), (proba[:, 1] > 0.5).astype(int))
+
+def test_make_model_backends():
+    assert type(make_model(resolve_params({"backend": "svc"}))).__name__ == "SVC"
+    params = resolve_params({"backend": "rff"})
+    assert params["n_components"] == 300
+    assert make_model(params).method == "rff"
+    with pytest.raises(ValueError):
+        make_model(resolve_params({"backend": "forest"}))
+
+def test_registry_trains_approx_backend(small_csv, tmp_path):
+    artifact = load_or_train(small_csv, {"backend": "nystroem", "n_components": 100}, model_dir=str(tmp_path))
+    assert isinstance(artifact["model"], ApproxKernelClassifier)
+
+    loaded = load_or_train(small_csv, {"backend": "nystroem", "n_components": 100}, model_dir=str(tmp_path))
+    result = predict_risk(loaded["model"], loaded["X_test"])
+    np.testing.assert_allclose(result["probability"], artifact["model"].predict_proba(artifact["X_test"])[:, 1])
+    assert roc_from_metrics(evaluate_artifact(loaded))[2] > 0.7
+
+@pytest.mark.parametrize("method", ["nystroem", "rff"])
+def test_numpy_path_matches_sklearn(method):
+    X, y = _blobs(500)
+    model = ApproxKernelClassifier(method, n_components=50, random_state=0).fit(X, y)
+    np.testing.assert_allclose(model.transform(X), model.feature_map_.transform(X), atol=1e-10)
+    expected = model.classifier_.decision_function(model.feature_map_.transform(X))
+    np.testing.assert_allclose(model.decision_function(X), expected, atol=1e-9)
+
+def test_predict_risk_evaluates_approx_model_once():
+    X, y = _blobs(500)
+    model = ApproxKernelClassifier("rff", n_components=50, random_state=0).fit(X, y)
+    calls = []
+    transform = model.transform
+    model.transform = lambda rows: calls.append(len(rows)) or transform(rows)
+    result = predict_risk(model, X)
+    assert calls == [len(X)]
+    np.testing.assert_allclose(result["probability"], model.predict_proba(X)[:, 1])
+    np.testing.assert_allclose(result["score"], model.decision_function(X))
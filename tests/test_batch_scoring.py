@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from src.batch_scoring import score_batch, score_csv
+from src.model_registry import prepare_training_data
+
+def test_score_batch_matches_row_by_row(small_csv, small_artifact):
+    raw = pd.read_csv(small_csv).dropna().head(20)
+    scored = score_batch(raw, small_artifact)
+
+    X, _ = prepare_training_data(raw)
+    X_scaled = small_artifact["scaler"].transform(X.to_numpy())
+    expected = [small_artifact["model"].predict_proba(X_scaled[i:i + 1])[0][1] for i in range(len(raw))]
+    np.testing.assert_allclose(scored["disease_prob"].to_numpy(), expected, rtol=1e-5)
+    assert set(scored["prediction"]) <= {0, 1}
+
+def test_score_csv_chunks_match_single_batch(small_csv, small_artifact, tmp_path):
+    out = tmp_path / "scored.csv"
+    stats = score_csv(small_csv, str(out), small_artifact, chunksize=128)
+
+    raw = pd.read_csv(small_csv)
+    result = pd.read_csv(out, keep_default_na=False)
+    assert stats["rows"] == len(raw) == len(result)
+    assert stats["rows_per_sec"] > 0
+    np.testing.assert_allclose(result["disease_prob"].astype(float), score_batch(raw, small_artifact)["disease_prob"])
+    assert "Jaundice" in " ".join(result["warnings"])
@@ -1,5 +1,7 @@
+import pandas as pd
 import pytest
-from src.clinical_rules import get_warnings
+from src.clinical_rules import RULES, evaluate_rules, get_warnings
+from src.data_loader import load_data
 
 def test_no_warnings_for_normal_values():
     patient = {
@@ -28,4 +30,24 @@ def test_low_albumin_warning():
 def test_ast_alt_ratio_warning():
     patient = {"aspartate_aminotransferase": 200, "alamine_aminotransferase": 50}
     ws = get_warnings(patient)
-    assert any("AST/ALT ratio" in w for w in ws)
\ No newline at end of file
+    assert any("AST/ALT ratio" in w for w in ws)
+
+def test_evaluate_rules_matches_get_warnings():
+    df = load_data().head(500)
+    # messy values the scalar path tolerates: strings, missing, zero denominator
+    df = df.astype(object)
+    df.loc[df.index[0], "total_bilirubin"] = "2.5"
+    df.loc[df.index[1], "albumin"] = "n/a"
+    df.loc[df.index[2], "alamine_aminotransferase"] = 0
+    df.loc[df.index[3], "aspartate_aminotransferase"] = None
+
+    flags, messages = evaluate_rules(df)
+    assert list(flags.columns) == [r["name"] for r in RULES]
+    assert messages == [get_warnings(r) for r in df.to_dict("records")]
+    assert flags.sum().sum() == sum(len(m) for m in messages)
+
+def test_evaluate_rules_original_column_names():
+    df = pd.DataFrame({"Total_Bilirubin": [2.5, 0.5], "Albumin": [4.0, 2.0]})
+    flags, messages = evaluate_rules(df)
+    assert flags["high_bilirubin"].tolist() == [True, False]
+    assert messages == [get_warnings(r) for r in df.to_dict("records")]
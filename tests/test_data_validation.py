@@ -1,5 +1,6 @@
 import pytest
-from src.data_loader import load_data
+from src.data_loader import load_data, memory_footprint
+from src.validation import validate_csv
 
 def test_required_columns_exist():
     df = load_data()
@@ -9,4 +10,95 @@ def test_required_columns_exist():
 def test_no_negative_values_for_bilirubin():
     df = load_data()
     if "total_bilirubin" in df.columns:
-        assert (df["total_bilirubin"].dropna() >= 0).all(), "Negative total_bilirubin values found"
\ No newline at end of file
+        assert (df["total_bilirubin"].dropna() >= 0).all(), "Negative total_bilirubin values found"
+
+def test_typed_schema_and_cache(tmp_path):
+    df = load_data(use_cache=False)
+    assert str(df["total_bilirubin"].dtype) == "float32"
+    assert str(df["age"].dtype) == "int16"
+    assert set(df["gender"].unique()) <= {0, 1}
+    assert set(df["dataset"].dropna().unique()) == {"liver_disease", "healthy"}
+
+    first = load_data(cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    cached = load_data(cache_dir=str(tmp_path))
+    assert cached.equals(first) and cached.equals(df)
+
+    # a changed source replaces its old cache entry instead of adding one
+    source = tmp_path / "source.csv"
+    source.write_text("Age,Gender,Dataset\n45,Male,1\n")
+    load_data(str(source), cache_dir=str(tmp_path))
+    source.write_text("Age,Gender,Dataset\n45,Male,1\n50,Female,2\n")
+    assert len(load_data(str(source), cache_dir=str(tmp_path))) == 2
+    assert len([p for p in tmp_path.iterdir() if p.name.startswith("source_")]) == 1
+
+    usage = memory_footprint()
+    assert usage["typed_bytes"] < usage["inferred_bytes"]
+
+def test_values_outside_compact_dtypes_are_kept(tmp_path):
+    from src.clinical_rules import get_warnings
+
+    path = tmp_path / "wide.csv"
+    path.write_text("Age,Gender,Alkaline_Phosphotase,Alamine_Aminotransferase,Aspartate_Aminotransferase,Dataset\n"
+                    "45,Male,200.9,50,40000,1\n50,Female,180,60,70000,2\n")
+    df = load_data(str(path), use_cache=False)
+    assert str(df["age"].dtype) == "int16"
+    assert str(df["aspartate_aminotransferase"].dtype) == "int32"
+    assert df["aspartate_aminotransferase"].tolist() == [40000, 70000]
+    assert str(df["alkaline_phosphotase"].dtype) == "float32"
+    assert df["alkaline_phosphotase"].iloc[0] == pytest.approx(200.9, rel=1e-6)
+    assert df["alamine_aminotransferase"].tolist() == [50, 60]
+    assert any(w.startswith("AST/ALT") for w in get_warnings(df.iloc[1].to_dict()))
+
+def test_non_numeric_lab_cells_load_as_missing(tmp_path):
+    path = tmp_path / "malformed.csv"
+    path.write_text("Age,Gender,Total_Bilirubin,Alamine_Aminotransferase,Dataset\n"
+                    "45,Male,0.9,abc,1\n50,Female,high,30,2\n")
+    df = load_data(str(path), use_cache=False)
+    assert str(df["total_bilirubin"].dtype) == "float32"
+    assert df["total_bilirubin"].isna().tolist() == [False, True]
+    assert df["alamine_aminotransferase"].isna().tolist() == [True, False]
+    assert df["age"].tolist() == [45, 50]
+
+def test_streaming_validation_matches_full_load():
+    df = load_data()
+    report = validate_csv(chunksize=700)
+    assert report["rows"] == len(df)
+    assert report["chunks"] == -(-len(df) // 700)
+    assert report["missing_required"] == []
+    assert report["duplicate_rows"] == df.duplicated().sum()
+    assert report["nulls"] == df.isna().sum().to_dict()
+    assert report["out_of_range"]["total_bilirubin"]["below"] == 0
+
+def test_streaming_validation_flags_bad_rows(tmp_path):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("Gender,Total_Bilirubin,Albumin\nMale,-1,4.0\nMale,-1,4.0\nFemale,0.5,\n")
+    report = validate_csv(str(bad), chunksize=2)
+    assert set(report["missing_required"]) == {"dataset", "alamine_aminotransferase"}
+    assert report["out_of_range"]["total_bilirubin"]["below"] == 2
+    assert report["duplicate_rows"] == 1
+    assert report["null_rates"]["albumin"] == 1 / 3
+    assert not report["passed"]
+
+def test_bounds_are_checked_before_narrowing(tmp_path):
+    corrupt = tmp_path / "corrupt.csv"
+    corrupt.write_text("Dataset,Gender,Total_Bilirubin,Alamine_Aminotransferase,Aspartate_Aminotransferase,Albumin\n"
+                       "1,Male,0.9,40,70000,4.0\n2,Female,0.7,30,40000.5,3.9\n1,Male,0.8,25,30,4.1\n")
+    report = validate_csv(str(corrupt))
+    assert report["out_of_range"]["aspartate_aminotransferase"] == {"below": 0, "above": 2}
+    assert not report["passed"]
+
+def test_non_numeric_lab_values_are_reported(tmp_path):
+    malformed = tmp_path / "malformed.csv"
+    malformed.write_text("Dataset,Gender,Total_Bilirubin,Alamine_Aminotransferase,Albumin\n"
+                         "1,Male,0.9,abc,4.0\n2,Female,high,30,3.9\n1,Male,0.8,25,\n")
+    report = validate_csv(str(malformed), chunksize=2)
+    assert report["invalid"]["alamine_aminotransferase"] == 1
+    assert report["invalid"]["total_bilirubin"] == 1
+    assert report["invalid"]["albumin"] == 0  # empty cells are nulls, not invalid
+    assert report["invalid_values"] == 2 and not report["passed"]
+
+def test_parallel_validation_matches_serial():
+    serial = validate_csv(chunksize=1000)
+    parallel = validate_csv(chunksize=1000, workers=2)
+    assert parallel == serial
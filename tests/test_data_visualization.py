@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+from src import data_visualization
+from src.data_visualization import _pairplot_mode, generate_plots
+
+def test_pairplot_mode():
+    assert _pairplot_mode(1000, "auto", 5000) == "full"
+    assert _pairplot_mode(100_000, "auto", 5000) == "hist"
+    assert _pairplot_mode(100_000, "sample", 5000) == "sample"
+    with pytest.raises(ValueError):
+        _pairplot_mode(10, "hexbin", 5000)
+    # the bundled dataset keeps the full scatter/KDE pairplot by default
+    with open(data_visualization.DATA_FILE) as f:
+        rows = sum(1 for _ in f) - 1
+    assert _pairplot_mode(rows, "auto", data_visualization.PAIRPLOT_MAX_POINTS) == "full"
+
+def test_unchanged_plots_are_skipped(small_csv, tmp_path, monkeypatch):
+    out = str(tmp_path)
+    vars_ = ["total_bilirubin", "albumin"]
+    paths = generate_plots(small_csv, out, pairplot_vars=vars_, workers=1)
+    assert all(os.path.exists(p) for p in paths.values())
+    manifest = json.loads((tmp_path / "plots_manifest.json").read_text())
+    assert set(manifest) == {"heatmap", "pairplot"}
+
+    rendered = []
+    monkeypatch.setattr(data_visualization, "_render_job", lambda name, *args: rendered.append(name) or 0.0)
+    generate_plots(small_csv, out, pairplot_vars=vars_, workers=1)
+    assert rendered == []
+
+    generate_plots(small_csv, out, pairplot_vars=vars_, pairplot_mode="hist", workers=1)
+    assert rendered == ["pairplot"]
@@ -0,0 +1,157 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.db import PatientStore, create_db, get_patient, insert_patient, parse_prob
+
+def _record(i, **overrides):
+    record = {
+        "name": f"Patient {i}",
+        "disease_prob": "12.3%",
+        "risk_label": "High Risk" if i % 2 else "Low Risk",
+        "age": 40 + i % 30,
+        "gender": i % 2,
+        "total_bilirubin": 0.8,
+        "albumin": 4.0,
+    }
+    record.update(overrides)
+    return record
+
+@pytest.fixture
+def db_path(tmp_path):
+    return create_db(str(tmp_path / "app.db"))
+
+def test_insert_and_get_patient(db_path):
+    rowid = insert_patient(_record(1), db_path=db_path)
+    row = get_patient(rowid, db_path=db_path)
+    assert row["name"] == "Patient 1"
+    assert row["albumin"] == 4.0
+
+def test_store_insert_many_and_iter(db_path):
+    with PatientStore(db_path) as store:
+        assert store.insert_many(_record(i) for i in range(1000)) == 1000
+        rows = list(store.iter_patients(batch_size=64))
+        assert len(rows) == 1000
+        assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+
+        high = list(store.iter_patients({"risk_label": "High Risk"}, batch_size=10))
+        assert len(high) == 500
+        assert store.get(high[0]["id"])["risk_label"] == "High Risk"
+
+        with pytest.raises(ValueError):
+            list(store.iter_patients({"name; DROP TABLE patients": 1}))
+
+def test_store_concurrent_writers(db_path):
+    store = PatientStore(db_path, pool_size=2)
+    errors = []
+
+    def worker(offset):
+        try:
+            store.insert_many(_record(offset + i) for i in range(50))
+            store.insert(_record(offset))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n * 100,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.close()
+
+    assert not errors
+    with PatientStore(db_path) as reader:
+        assert sum(1 for _ in reader.iter_patients()) == 8 * 51
+
+LEGACY_SCHEMA = """
+CREATE TABLE patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    date DATETIME DEFAULT CURRENT_TIMESTAMP,
+    disease_prob TEXT,
+    risk_label TEXT,
+    age INTEGER, gender INTEGER, total_bilirubin REAL, direct_bilirubin REAL,
+    alkaline_phosphotase INTEGER, alamine_aminotransferase INTEGER,
+    aspartate_aminotransferase INTEGER, total_protiens REAL, albumin REAL, ag_ratio REAL
+);
+"""
+
+def _schema(path):
+    conn = sqlite3.connect(path)
+    columns = [(r[1], r[2]) for r in conn.execute("PRAGMA table_info(patients)")]
+    indexes = sorted(r[1] for r in conn.execute("PRAGMA index_list(patients)"))
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    return columns, indexes, version
+
+def test_legacy_db_migrates_in_place(tmp_path):
+    legacy = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(legacy)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO patients (name, disease_prob, risk_label) VALUES ('Old', '85.2%', 'High Risk')")
+    conn.commit()
+    conn.close()
+
+    create_db(legacy)
+    fresh = create_db(str(tmp_path / "fresh.db"))
+    assert _schema(legacy) == _schema(fresh)
+    assert _schema(fresh)[2] == 3
+    assert _schema(legacy)[0][3] == ("disease_prob", "REAL")
+
+    row = get_patient(1, db_path=legacy)
+    assert row["name"] == "Old"
+    assert row["disease_prob"] == pytest.approx(0.852)
+    create_db(legacy)  # already current: no-op
+
+def test_parse_prob():
+    assert parse_prob("85.2%") == pytest.approx(0.852)
+    assert parse_prob(0.3) == 0.3
+    assert parse_prob(42) == pytest.approx(0.42)
+    assert parse_prob(None) is None
+
+def test_history_queries_use_indexes(db_path):
+    with PatientStore(db_path) as store:
+        store.insert_many([
+            _record(1, name="Alice", disease_prob=0.9),
+            _record(2, name="Albert", disease_prob="70%"),
+            _record(3, name="Bob", disease_prob=0.1),
+        ])
+        with store.connection() as conn:
+            conn.execute("UPDATE patients SET date = '2020-01-01 00:00:00' WHERE name = 'Albert'")
+            conn.commit()
+
+        assert {p["name"] for p in store.patients_by_name_prefix("Al")} == {"Alice", "Albert"}
+        assert [p["name"] for p in store.high_risk_patients(0.6)] == ["Alice", "Albert"]
+        assert [p["name"] for p in store.high_risk_patients(0.6, days=30)] == ["Alice"]
+        assert [p["name"] for p in store.patients_between("2019-01-01", "2021-01-01")] == ["Albert"]
+        assert store.count_patients() == 3
+        assert len(store.page_patients(page=2, page_size=2)) == 1
+
+        with store.connection() as conn:
+            plan = " ".join(r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM patients WHERE disease_prob >= 0.6"))
+        assert "idx_patients_disease_prob" in plan
+
+def test_outcome_watermark_does_not_skip_same_second_updates(db_path):
+    with PatientStore(db_path) as store:
+        ids = [store.insert(_record(i, model_key="m")) for i in range(3)]
+        store.set_outcome(ids[2], 1)
+        watermark = [r["outcome_seq"] for r in store.iter_outcomes()][-1]
+        store.set_outcome(ids[0], 0)  # lower id, (almost certainly) the same CURRENT_TIMESTAMP second
+        assert [r["id"] for r in store.iter_outcomes(watermark)] == [ids[0]]
+        assert [r["id"] for r in store.iter_labelled("m", watermark)] == [ids[0]]
+
+def test_outcomes_are_recorded_once(db_path):
+    with PatientStore(db_path) as store:
+        ids = [store.insert(_record(i, model_key="m")) for i in range(3)]
+        store.set_outcome(ids[0], 1)
+        store.set_outcome(ids[0], 1)  # same label again: no new outcome_seq
+        assert [r["id"] for r in store.iter_labelled("m")] == [ids[0]]
+
+        with pytest.raises(ValueError):
+            store.set_outcomes([(ids[1], 0), (ids[0], 0)])
+        with pytest.raises(KeyError):
+            store.set_outcome(999, 0)
+        # the failed batch wrote nothing
+        assert [(r["id"], r["outcome"]) for r in store.iter_outcomes()] == [(ids[0], 1)]
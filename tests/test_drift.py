@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.config import FILE_MODE
+from src.data_loader import load_data
+from src.db import PatientStore, create_db
+from src.drift import DriftMonitor, load_or_build
+
+@pytest.fixture(scope="module")
+def reference_df(small_csv):
+    return load_data(small_csv)
+
+def _sketch_bytes(monitor):
+    return sum(a.nbytes for a in (monitor.win_hist, monitor.win_n, monitor.win_mean, monitor.win_m2, monitor.ref_hist))
+
+def test_running_moments_and_sliding_window(reference_df, small_csv):
+    monitor = DriftMonitor(window_size=100, n_windows=5)
+    monitor.build_reference(small_csv)
+    np.testing.assert_allclose(monitor.ref_mean[0], reference_df["age"].mean())
+    np.testing.assert_allclose(monitor.ref_m2[0] / (monitor.ref_n[0] - 1), reference_df["age"].var())
+
+    size = _sketch_bytes(monitor)
+    live = reference_df.iloc[:260]
+    monitor.update(live.iloc[:7])
+    monitor.update(live.iloc[7:])
+    hist, n, mean, var = monitor.window()
+    # 13 sub-windows of 20 were filled; the ring keeps the last 5 = the last 100 rows
+    recent = live.tail(100)
+    assert n[0] == 100 and monitor.seen == 260
+    np.testing.assert_allclose(mean[0], recent["age"].mean())
+    np.testing.assert_allclose(var[0], recent["age"].var())
+    assert hist[0].sum() == 100
+    assert _sketch_bytes(monitor) == size  # memory does not grow with the stream
+
+def test_flags_shifted_feature_only(reference_df, small_csv):
+    monitor = DriftMonitor(window_size=1000, n_windows=10)
+    monitor.build_reference(small_csv)
+    assert not monitor.scores()["drift"].any()  # empty window: nothing to flag
+
+    same = reference_df.sample(500, replace=True, random_state=0)
+    monitor.update(same)
+    assert not monitor.scores()["drift"].any()
+
+    shifted = reference_df.sample(1000, replace=True, random_state=1).copy()
+    shifted["albumin"] = shifted["albumin"] - 1.0
+    monitor.update(shifted)
+    report = monitor.scores()
+    assert report.index[report["drift"]].tolist() == ["albumin"]
+    assert report.loc["albumin", "psi"] > 0.2 and report.loc["albumin", "mean_shift"] < -1
+
+def test_sync_and_persistence(small_artifact, small_csv, tmp_path):
+    db_path = create_db(str(tmp_path / "app.db"))
+    path = str(tmp_path / "drift.npz")
+    with PatientStore(db_path) as store:
+        store.insert_many([{"name": f"P{i}", "age": 30 + i % 40, "albumin": 3.5, "model_key": "m"} for i in range(150)])
+        monitor = load_or_build(small_artifact, store, path=path, data_path=small_csv)
+        assert monitor.last_id == 150 and monitor.window()[1][0] == 150
+
+        store.insert({"name": "late", "age": 60, "albumin": 3.0})
+        monitor = load_or_build(small_artifact, store, path=path, data_path=small_csv)
+        assert monitor.seen == 151 and monitor.sync(store) == 0
+    assert DriftMonitor.load(path, key="another-model") is None
+
+def test_concurrent_saves(small_csv, tmp_path):
+    import threading
+
+    monitor = DriftMonitor()
+    monitor.build_reference(small_csv)
+    path = str(tmp_path / "drift.npz")
+    errors = []
+
+    def save():
+        try:
+            for _ in range(5):
+                monitor.save(path, "k")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert [p.name for p in tmp_path.iterdir()] == ["drift.npz"]
+    assert os.stat(path).st_mode & 0o777 == FILE_MODE
+    np.testing.assert_array_equal(DriftMonitor.load(path, "k").ref_hist, monitor.ref_hist)
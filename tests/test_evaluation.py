@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.metrics import confusion_matrix, roc_auc_score
+
+from src.db import PatientStore, create_db
+from src.evaluation import evaluate_artifact, load_metrics, roc_from_metrics, update_from_db
+from src.predictor import predict_risk
+
+def test_stored_metrics_match_sklearn(small_artifact):
+    metrics = evaluate_artifact(small_artifact)
+    result = predict_risk(small_artifact["model"], small_artifact["X_test"])
+    y_test = small_artifact["y_test"]
+
+    assert metrics["confusion"] == confusion_matrix(y_test, result["label"], labels=[0, 1]).tolist()
+    _, _, auc = roc_from_metrics(metrics)
+    assert abs(auc - roc_auc_score(y_test, result["probability"])) < 0.01
+
+def test_metrics_saved_once_per_model(small_artifact, tmp_path):
+    metrics = load_metrics(small_artifact, model_dir=str(tmp_path))
+    assert metrics["n_test"] == len(small_artifact["y_test"])
+    assert (tmp_path / f"svm_{small_artifact['key']}.metrics.json").exists()
+    assert load_metrics(small_artifact, model_dir=str(tmp_path)) == metrics
+
+def test_update_from_db_is_incremental(small_artifact, tmp_path):
+    db_path = create_db(str(tmp_path / "app.db"))
+    metrics = evaluate_artifact(small_artifact)
+    before = np.asarray(metrics["confusion"]).sum()
+
+    with PatientStore(db_path) as store:
+        ids = [store.insert({"name": f"P{i}", "disease_prob": p, "model_key": small_artifact["key"]})
+               for i, p in enumerate([0.9, 0.8, 0.1])]
+        store.insert({"name": "other model", "disease_prob": 0.9, "model_key": "something-else"})
+        store.insert({"name": "no outcome yet", "disease_prob": 0.9, "model_key": small_artifact["key"]})
+        store.set_outcome(ids[2], 0)
+        store.set_outcome(ids[1], 0)
+
+        assert update_from_db(metrics, store, small_artifact["key"]) == 2
+        assert update_from_db(metrics, store, small_artifact["key"]) == 0
+
+        store.set_outcome(ids[0], 1)  # lower id within the same second as the watermark row
+        assert update_from_db(metrics, store, small_artifact["key"]) == 1
+
+    assert metrics["n_live"] == 3
+    assert np.asarray(metrics["confusion"]).sum() == before + 3
@@ -0,0 +1,92 @@
+import itertools
+from math import factorial
+
+import numpy as np
+
+from src.explain import Explainer, build_explainer, explain_path, load_or_build
+
+def _raw(artifact, X_scaled):
+    scaler = artifact["scaler"]
+    return X_scaled * scaler.scale_ + scaler.mean_
+
+def test_shapley_matches_brute_force(small_artifact):
+    # with a single background row the cached factors are exact, so brute force on the SVC must agree
+    model = small_artifact["model"]
+    b, x = small_artifact["X_test"][:1], small_artifact["X_test"][3]
+    explainer = build_explainer(small_artifact, background=b)
+    assert explainer.method == "shapley"
+    result = explainer.explain(_raw(small_artifact, x))
+
+    d = len(x)
+    expected = np.zeros(d)
+    for j in range(d):
+        others = [k for k in range(d) if k != j]
+        for s in range(d):
+            for S in itertools.combinations(others, s):
+                without = b[0].copy()
+                without[list(S)] = x[list(S)]
+                with_j = without.copy()
+                with_j[j] = x[j]
+                expected[j] += (factorial(s) * factorial(d - s - 1) / factorial(d)
+                                * (model.decision_function(np.vstack([with_j, without])) @ [1, -1]))
+    np.testing.assert_allclose(result["contributions"][0], expected, atol=1e-9)
+    np.testing.assert_allclose(result["score"], model.decision_function(x[None, :]), atol=1e-9)
+
+def test_batches_and_single_rows_agree(small_artifact, monkeypatch):
+    from src import explain
+
+    explainer = build_explainer(small_artifact)
+    X_raw = _raw(small_artifact, small_artifact["X_test"][:20])
+    full = explainer.explain(X_raw)
+    np.testing.assert_allclose(full["contributions"].sum(axis=1), full["score"] - explainer.base_score, atol=1e-9)
+    np.testing.assert_allclose(full["probability_contributions"].sum(axis=1),
+                               full["probability"] - explainer.base_probability, atol=1e-9)
+
+    monkeypatch.setattr(explain, "CHUNK_TERMS", 1)
+    np.testing.assert_allclose(explainer.explain(X_raw)["contributions"], full["contributions"])
+    np.testing.assert_allclose(explainer.explain(X_raw[7])["contributions"], full["contributions"][7:8])
+
+def test_occlusion_fallbacks(small_artifact, monkeypatch):
+    from src import explain
+
+    model = small_artifact["model"]
+    b, x = small_artifact["X_test"][:1], small_artifact["X_test"][3]
+    occluded = np.repeat(x[None, :], len(x), axis=0)
+    np.fill_diagonal(occluded, b[0])
+    expected = model.decision_function(x[None, :]) - model.decision_function(occluded)
+
+    monkeypatch.setattr(explain, "EXACT_MAX_TERMS", 0)
+    explainer = build_explainer(small_artifact, background=b)
+    assert explainer.method == "occlusion"
+    np.testing.assert_allclose(explainer.explain(_raw(small_artifact, x))["contributions"][0], expected, atol=1e-9)
+
+    # models without an RBF kernel are occluded against the background rows
+    explainer = build_explainer(dict(small_artifact, model=_OpaqueModel(model)), background=b)
+    assert explainer.method == "model"
+    np.testing.assert_allclose(explainer.explain(_raw(small_artifact, x))["contributions"][0], expected, atol=1e-9)
+
+class _OpaqueModel:
+    """Wraps the SVC without exposing its kernel, to exercise the model-based path."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def decision_function(self, X):
+        return self.model.decision_function(X)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+def test_saved_with_artifact_and_reloaded(small_artifact, tmp_path):
+    from src.model_registry import save_artifact
+
+    save_artifact(small_artifact, str(tmp_path))
+    path = explain_path(small_artifact["key"], str(tmp_path))
+    loaded = Explainer.load(path)
+    assert loaded.key == small_artifact["key"] and loaded.global_importance.shape == (len(loaded.features),)
+    assert Explainer.load(path, dict(small_artifact, key="other")) is None
+
+    X_raw = _raw(small_artifact, small_artifact["X_test"][:5])
+    built = build_explainer(small_artifact)
+    np.testing.assert_allclose(loaded.explain(X_raw)["contributions"], built.explain(X_raw)["contributions"])
+    assert load_or_build(small_artifact, str(tmp_path)).base_score == loaded.base_score
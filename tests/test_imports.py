@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY = ["pandas", "sklearn", "imblearn", "scipy", "matplotlib", "seaborn", "plotly", "http.server"]
+
+def loaded_heavy_modules(code: str) -> list:
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("module", ["src.db", "src.clinical_rules", "src.predictor", "src.instrumentation",
+                                    "src.model_registry"])
+def test_light_modules_import_no_heavy_libraries(module):
+    assert loaded_heavy_modules(f"import {module}") == []
+
+def test_per_row_rules_do_not_need_pandas():
+    code = "from src.clinical_rules import get_warnings\nget_warnings({'total_bilirubin': 2.0, 'albumin': 3.0})"
+    assert "pandas" not in loaded_heavy_modules(code)
+
+def test_app_default_path_does_not_unpickle_sklearn(small_csv, tmp_path):
+    from src.model_registry import load_or_train
+
+    load_or_train(small_csv, model_dir=str(tmp_path))
+    code = f"""
+import numpy as np
+from src.explain import Explainer, explain_path
+from src.model_registry import load_model_info
+from src.svm_kernel import kernel_path, load_kernel
+info = load_model_info({small_csv!r}, model_dir={str(tmp_path)!r})
+x = np.array([[45, 1, 0.9, 0.2, 200, 25, 30, 6.5, 3.3, 0.9]], dtype=float)
+load_kernel(kernel_path(info["key"], {str(tmp_path)!r})).predict_risk(x)
+Explainer.load(explain_path(info["key"], {str(tmp_path)!r})).explain(x)
+info["scaler"].transform(x)
+"""
+    assert loaded_heavy_modules(code) == []
@@ -0,0 +1,68 @@
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+
+from src import instrumentation
+from src.instrumentation import LogHistogram, count, observe, snapshot, timed
+from src.model_registry import train_model
+
+@pytest.fixture
+def metrics():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_disabled_records_nothing():
+    instrumentation.reset()
+    with timed("block"):
+        pass
+    timed("fn")(lambda: None)()
+    observe("direct", 1.0)
+    count("things")
+    snap = snapshot()
+    assert snap["stages"] == {} and snap["counters"] == {}
+
+def test_timed_block_and_decorator(metrics):
+    @timed("fn")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    with timed("block"):
+        add(3, 4)
+    count("things", 5)
+
+    snap = snapshot()
+    assert snap["stages"]["fn"]["count"] == 2
+    assert snap["stages"]["block"]["count"] == 1
+    assert snap["counters"] == {"things": 5}
+
+def test_log_histogram_quantiles():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=-6, sigma=1.5, size=20_000)
+    hist = LogHistogram()
+    for v in values:
+        hist.add(float(v))
+    for q in (0.5, 0.95, 0.99):
+        assert hist.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.1)
+    assert hist.count == len(values) and hist.max == values.max()
+
+def test_training_stages_and_exports(metrics, small_csv, tmp_path):
+    train_model(small_csv)
+    stages = snapshot()["stages"]
+    assert {"load", "train.smote", "train.scale", "train.fit"} <= set(stages)
+
+    path = instrumentation.export_json(str(tmp_path / "metrics.json"))
+    assert json.loads(open(path).read())["stages"]["train.fit"]["count"] == 1
+
+    server = instrumentation.serve_metrics(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert "train.smote" in json.loads(response.read())["stages"]
+    finally:
+        server.shutdown()
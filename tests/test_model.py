@@ -21,7 +21,7 @@ def test_svm_runs_and_returns_accuracy():
     else:
         y = df["dataset"]
 
-    X = df.select_dtypes(include=[np.number]).drop(columns=["dataset"], errors=True) if "dataset" in df.columns else df.select_dtypes(include=[np.number])
+    X = df.select_dtypes(include=[np.number]).drop(columns=["dataset"], errors="ignore") if "dataset" in df.columns else df.select_dtypes(include=[np.number])
     assert len(X) >= 10, "Not enough numeric rows to run model test (need >=10)."
 
     # Align rows with labels (drop any rows with missing y)
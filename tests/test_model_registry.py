@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+
+from src import model_registry
+from src.config import FILE_MODE
+from src.model_registry import FEATURES, artifact_key, load_or_train
+
+def test_artifact_round_trip(small_csv, tmp_path):
+    artifact = load_or_train(small_csv, model_dir=str(tmp_path))
+    assert artifact["features"] == FEATURES
+    assert (tmp_path / f"svm_{artifact['key']}.joblib").exists()
+    assert os.stat(tmp_path / f"svm_{artifact['key']}.joblib").st_mode & 0o777 == FILE_MODE
+
+    loaded = load_or_train(small_csv, model_dir=str(tmp_path))
+    assert loaded["key"] == artifact["key"]
+    X = loaded["X_test"][:5]
+    np.testing.assert_allclose(loaded["model"].predict_proba(X), artifact["model"].predict_proba(X))
+
+def test_no_retrain_when_unchanged(small_csv, tmp_path, monkeypatch):
+    load_or_train(small_csv, model_dir=str(tmp_path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("model was retrained")
+    monkeypatch.setattr(model_registry, "train_model", fail)
+    load_or_train(small_csv, model_dir=str(tmp_path))
+
+def test_key_changes_with_data_or_params():
+    base = artifact_key("abc", {"C": 1.0})
+    assert artifact_key("abd", {"C": 1.0}) != base
+    assert artifact_key("abc", {"C": 2.0}) != base
+    assert artifact_key("abc", {"C": 1.0}) == base
+
+def test_retrain_with_outcomes(small_csv, tmp_path):
+    from src.db import PatientStore, create_db
+    from src.resampling import IncrementalSMOTE
+
+    artifact = load_or_train(small_csv, model_dir=str(tmp_path))
+    smote = IncrementalSMOTE.load(model_registry.resampler_path(artifact["key"], str(tmp_path)))
+    n_train = len(smote.X_)
+
+    with PatientStore(create_db(str(tmp_path / "app.db"))) as store:
+        assert model_registry.retrain_with_outcomes(artifact, store, str(tmp_path)) is None
+        ids = [store.insert({"name": f"P{i}", "age": 30 + i, "gender": "Female", "total_bilirubin": 0.8,
+                             "disease_prob": 0.5, "model_key": artifact["key"]}) for i in range(6)]
+        store.set_outcomes([(i, n % 2) for n, i in enumerate(ids)])
+        retrained = model_registry.retrain_with_outcomes(artifact, store, str(tmp_path))
+        assert retrained["key"] != artifact["key"] and retrained["base_key"] == artifact["key"]
+        assert retrained["outcome_watermark"] > 0
+        assert model_registry.retrain_with_outcomes(retrained, store, str(tmp_path)) is None
+
+    # the saved resampler holds the new patients; the held-out test set is unchanged
+    smote = IncrementalSMOTE.load(model_registry.resampler_path(retrained["key"], str(tmp_path)))
+    assert len(smote.X_) == n_train + len(ids)
+    np.testing.assert_allclose(retrained["scaler"].inverse_transform(retrained["X_test"]),
+                               artifact["scaler"].inverse_transform(artifact["X_test"]))
+
+    # load_or_train now returns the retrained artifact, until force=True starts over
+    assert load_or_train(small_csv, model_dir=str(tmp_path))["key"] == retrained["key"]
+    assert load_or_train(small_csv, model_dir=str(tmp_path), force=True)["key"] == artifact["key"]
+    assert load_or_train(small_csv, model_dir=str(tmp_path))["key"] == artifact["key"]
+
+def test_model_info_from_sidecar(small_csv, tmp_path):
+    assert model_registry.load_model_info(small_csv, model_dir=str(tmp_path)) is None
+    artifact = load_or_train(small_csv, model_dir=str(tmp_path))
+    info = model_registry.load_model_info(small_csv, model_dir=str(tmp_path))
+    assert info["key"] == artifact["key"] and info["features"] == FEATURES
+    assert info["fill_values"] == artifact["fill_values"]
+    X = artifact["X_test"][:5]
+    raw = artifact["scaler"].inverse_transform(X)
+    np.testing.assert_allclose(info["scaler"].transform(raw), X)
+    np.testing.assert_allclose(info["scaler"].inverse_transform(X), raw)
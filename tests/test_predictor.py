@@ -0,0 +1,18 @@
+import numpy as np
+
+from src.predictor import predict_risk
+
+def test_predict_risk_matches_predict_proba(small_artifact):
+    model, X = small_artifact["model"], small_artifact["X_test"]
+    rng = np.random.default_rng(0)
+    X = np.vstack([X, rng.normal(scale=3.0, size=(500, X.shape[1]))])
+
+    result = predict_risk(model, X)
+    np.testing.assert_allclose(result["probability"], model.predict_proba(X)[:, 1], atol=1e-12)
+    np.testing.assert_allclose(result["score"], model.decision_function(X))
+
+def test_label_follows_threshold(small_artifact):
+    model, X = small_artifact["model"], small_artifact["X_test"]
+    result = predict_risk(model, X, threshold=0.6)
+    assert (result["label"] == (result["probability"] > 0.6)).all()
+    assert predict_risk(model, X, threshold=1.0)["label"].sum() == 0
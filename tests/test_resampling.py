@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.db import PatientStore, create_db
+from src.model_registry import FEATURES, labelled_training_data
+from src.resampling import IncrementalSMOTE, MinorityIndex
+
+def _data(n=400, seed=0, minority_rate=0.3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    y = (rng.random(n) < minority_rate).astype(int)
+    return X, y
+
+def _brute_knn(points, X, k):
+    d = ((X[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+    return np.argsort(d, axis=1, kind="stable")[:, :k]
+
+def test_minority_index_matches_brute_force():
+    rng = np.random.default_rng(1)
+    index = MinorityIndex(rng.normal(size=(100, 3)), rebuild_ratio=0.5)
+    index.add(rng.normal(size=(30, 3)))
+    assert index.rebuilds == 1 and len(index.delta) == 30
+    queries = rng.normal(size=(20, 3))
+    np.testing.assert_array_equal(index.kneighbors(queries, 6), _brute_knn(index.points, queries, 6))
+
+    index.add(rng.normal(size=(30, 3)))  # delta now exceeds half the base: merged into the tree
+    assert index.rebuilds == 2 and len(index.delta) == 0
+    np.testing.assert_array_equal(index.kneighbors(queries, 6), _brute_knn(index.points, queries, 6))
+
+def test_fit_resample_is_comparable_to_smote():
+    from imblearn.over_sampling import SMOTE
+
+    X, y = _data(10_000)
+    X_res, y_res = IncrementalSMOTE(random_state=0).fit_resample(X, y)
+    X_ref, y_ref = SMOTE(random_state=0).fit_resample(X, y)
+    assert np.bincount(y_res).tolist() == np.bincount(y_ref).tolist()
+    np.testing.assert_array_equal(X_res[:len(X)], X)
+
+    synthetic, reference = X_res[len(X):], X_ref[len(X):]
+    np.testing.assert_allclose(synthetic.mean(axis=0), reference.mean(axis=0), atol=0.05)
+    np.testing.assert_allclose(synthetic.std(axis=0), reference.std(axis=0), rtol=0.05)
+
+def test_partial_fit_only_adds_delta_and_is_reproducible(tmp_path):
+    X, y = _data()
+    X_new, y_new = _data(100, seed=1)
+
+    smote = IncrementalSMOTE(random_state=0)
+    X_res, _ = smote.fit_resample(X, y)
+    before = smote.synthetic_.copy()
+    smote.save(str(tmp_path / "smote.joblib"))
+
+    X_res2, y_res2 = smote.partial_fit_resample(X_new, y_new)
+    assert np.bincount(y_res2)[0] == np.bincount(y_res2)[1]
+    np.testing.assert_array_equal(smote.synthetic_[:len(before)], before)
+    np.testing.assert_array_equal(X_res2[:len(X) + len(X_new)], np.vstack([X, X_new]))
+
+    restored = IncrementalSMOTE.load(str(tmp_path / "smote.joblib"))
+    X_res3, y_res3 = restored.partial_fit_resample(X_new, y_new)
+    np.testing.assert_array_equal(X_res3, X_res2)
+    np.testing.assert_array_equal(y_res3, y_res2)
+
+def test_partial_fit_trims_when_minority_grows():
+    X, y = _data()
+    smote = IncrementalSMOTE(random_state=0)
+    smote.fit_resample(X, y)
+    n_synthetic = len(smote.synthetic_)
+    _, y_res = smote.partial_fit_resample(X[:20], np.ones(20, dtype=int))
+    assert len(smote.synthetic_) == n_synthetic - 20
+    assert np.bincount(y_res)[0] == np.bincount(y_res)[1]
+
+def test_needs_two_classes():
+    with pytest.raises(ValueError):
+        IncrementalSMOTE().fit_resample(np.zeros((5, 2)), np.ones(5))
+
+def test_labelled_training_data(tmp_path):
+    db_path = create_db(str(tmp_path / "app.db"))
+    with PatientStore(db_path) as store:
+        ids = [store.insert({"name": f"P{i}", "age": 40 + i, "gender": "Male", "ag_ratio": 1.1,
+                             "disease_prob": 0.5, "model_key": "m"}) for i in range(3)]
+        store.set_outcome(ids[0], 1)
+        store.set_outcome(ids[2], 0)
+        X, y, watermark = labelled_training_data(store, "m")
+        assert list(X.columns) == FEATURES and y.tolist() == [1, 0]
+        assert X["age"].tolist() == [40.0, 42.0] and X["gender"].tolist() == [1.0, 1.0]
+        np.testing.assert_allclose(X["albumin_and_globulin_ratio"], [1.1, 1.1], rtol=1e-6)
+
+        X, y, _ = labelled_training_data(store, "m", after=watermark)
+        assert len(X) == 0
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.batch_scoring import score_batch
+from src.serve import InferenceServer, MicroBatcher
+
+async def _post(port, path, payload, content_length=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    length = len(body) if content_length is None else content_length
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+def test_predict_endpoints_batch_concurrent_requests(small_csv, small_artifact):
+    patients = pd.read_csv(small_csv).dropna().head(16).drop(columns=["Dataset"])
+    records = patients.to_dict("records")
+    expected = score_batch(patients, small_artifact)["disease_prob"].to_numpy()
+
+    async def scenario():
+        server = InferenceServer(small_artifact, max_batch=64, max_wait_ms=20)
+        await server.start("127.0.0.1", 0)
+        try:
+            single = await asyncio.gather(*(_post(server.port, "/predict", r) for r in records))
+            status, batch = await _post(server.port, "/predict_batch", {"patients": records})
+            bad = await _post(server.port, "/predict", {"age": 40})
+            return single, (status, batch), bad, server.batcher.max_requests
+        finally:
+            await server.stop()
+
+    single, (status, batch), bad, max_requests = asyncio.run(scenario())
+
+    assert all(s == 200 for s, _ in single)
+    np.testing.assert_allclose([r["disease_prob"] for _, r in single], expected)
+    assert max_requests > 1  # concurrent /predict calls shared a micro-batch
+    assert status == 200
+    np.testing.assert_allclose([r["disease_prob"] for r in batch["results"]], expected)
+    assert isinstance(batch["results"][0]["warnings"], list)
+    assert bad[0] == 400
+
+def test_bad_requests_only_fail_themselves(small_csv, small_artifact):
+    records = pd.read_csv(small_csv).dropna().head(3).drop(columns=["Dataset"]).to_dict("records")
+
+    async def scenario():
+        server = InferenceServer(small_artifact, max_batch=64, max_wait_ms=20)
+        await server.start("127.0.0.1", 0)
+        try:
+            infinite = dict(records[0], Age=float("inf"))  # serialized as Infinity, which json accepts
+            responses = await asyncio.gather(_post(server.port, "/predict", infinite),
+                                             *(_post(server.port, "/predict", r) for r in records))
+            garbled = await _post(server.port, "/predict", records[0], content_length="abc")
+            return responses, garbled
+        finally:
+            await server.stop()
+
+    responses, garbled = asyncio.run(scenario())
+    assert [status for status, _ in responses] == [400, 200, 200, 200]
+    assert garbled[0] == 400
+
+def test_failed_batch_is_retried_per_submission():
+    def predict(records):
+        if any(r.get("poison") for r in records):
+            raise ValueError("bad record")
+        return [{"ok": r["i"]} for r in records]
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch=64, max_wait_ms=20)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit([{"i": i, "poison": i == 1}]) for i in range(3)),
+                                        return_exceptions=True), batcher.batches
+        finally:
+            await batcher.stop()
+
+    results, batches = asyncio.run(scenario())
+    assert results[0] == [{"ok": 0}] and results[2] == [{"ok": 2}]
+    assert isinstance(results[1], ValueError)
+    assert batches == 2
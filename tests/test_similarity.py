@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from src.db import PatientStore, create_db
+from src.similarity import SimilarityIndex, index_path, load_or_build
+
+def _patient(i, **overrides):
+    record = {"name": f"P{i}", "disease_prob": 0.5, "risk_label": "Low Risk", "age": 30 + i, "gender": 1,
+              "total_bilirubin": 0.7 + i, "direct_bilirubin": 0.2, "alkaline_phosphotase": 180,
+              "alamine_aminotransferase": 25, "aspartate_aminotransferase": 30, "total_protiens": 6.8,
+              "albumin": 3.4, "ag_ratio": 1.0, "model_key": "m"}
+    record.update(overrides)
+    return record
+
+def test_query_matches_exhaustive_search(small_artifact, small_csv, monkeypatch):
+    from src import similarity
+
+    monkeypatch.setattr(similarity, "BLOCK_ROWS", 64)  # several blocks
+    index = SimilarityIndex(small_artifact, capacity=8)  # forces growth
+    index.add_dataset(small_csv)
+    assert len(index) == len(pd.read_csv(small_csv))
+
+    points = index.vectors().astype(np.float64)
+    query = index.query(index.mean, k=7)  # the scaled-space origin
+    expected = np.argsort((points ** 2).sum(axis=1))[:7]
+    assert [m["ref"] for m in query] == index._ref[expected].tolist()
+    assert all(m["source"] == "dataset" and m["outcome"] in (0, 1) for m in query)
+    assert np.all(np.diff([m["distance"] for m in query]) >= 0)
+
+def test_nearest_row_is_itself(small_artifact, small_csv):
+    index = SimilarityIndex(small_artifact)
+    index.add_dataset(small_csv)
+    row = index.vectors()[42].astype(np.float64) * index.scale + index.mean
+    best = index.query(row, k=1)[0]
+    assert best["ref"] == 42 and best["distance"] < 1e-3
+    np.testing.assert_allclose([best[f] for f in index.features], row, rtol=1e-5)
+
+def test_sync_persist_and_outcomes(small_artifact, small_csv, tmp_path):
+    db_path = create_db(str(tmp_path / "app.db"))
+    path = str(tmp_path / "index.npz")
+    with PatientStore(db_path) as store:
+        store.insert_many([_patient(i) for i in range(3)])
+        index = load_or_build(small_artifact, store, data_path=small_csv, path=path)
+        n_dataset = len(pd.read_csv(small_csv))
+        assert len(index) == n_dataset + 3 and index.last_id == 3
+
+        store.insert(_patient(10, age=80, total_bilirubin=25.0))
+        store.set_outcome(4, 1)
+        index = load_or_build(small_artifact, store, data_path=small_csv, path=path)
+        assert len(index) == n_dataset + 4
+        best = index.query([80, 1, 25.0, 0.2, 180, 25, 30, 6.8, 3.4, 1.0], k=1)[0]
+        assert (best["source"], best["ref"], best["outcome"]) == ("patients", 4, 1)
+
+        assert index.sync(store) == 0  # nothing new
+        other = dict(small_artifact, key="other")
+        assert SimilarityIndex.load(path, other) is None
+    assert index_path("abc", str(tmp_path)).endswith("similar_abc.npz")
+
+def test_concurrent_saves_and_autosave(small_artifact, small_csv, tmp_path):
+    import threading
+    import time
+
+    path = str(tmp_path / "index.npz")
+    index = SimilarityIndex(small_artifact)
+    index.add_dataset(small_csv)
+    errors = []
+
+    def save():
+        try:
+            for _ in range(5):
+                index.save(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and not index.dirty
+    assert [p.name for p in tmp_path.iterdir()] == ["index.npz"]  # no leftover tmp files
+    assert not index.save_if_changed(path)
+
+    index.start_autosave(path, interval=0.01)
+    index.add(index.vectors()[:1] * index.scale + index.mean, "patients", [99], [1])
+    deadline = time.monotonic() + 5
+    while index.dirty and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not index.dirty  # written by the autosave thread
+    index.stop_autosave(path)
+    assert len(SimilarityIndex.load(path, small_artifact)) == len(index)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from src.predictor import predict_risk
+from src.svm_kernel import export_kernel, kernel_path, load_kernel
+
+def test_kernel_matches_sklearn(small_artifact, tmp_path):
+    model, scaler = small_artifact["model"], small_artifact["scaler"]
+    kernel = load_kernel(export_kernel(small_artifact, str(tmp_path / "kernel.npz")))
+
+    rng = np.random.default_rng(0)
+    X_raw = scaler.inverse_transform(small_artifact["X_test"])
+    X_raw = np.vstack([X_raw, X_raw * rng.uniform(0.2, 5.0, X_raw.shape)])
+
+    expected = predict_risk(model, scaler.transform(X_raw))
+    result = kernel.predict_risk(X_raw)
+    np.testing.assert_allclose(result["score"], expected["score"], atol=1e-9)
+    np.testing.assert_allclose(result["probability"], expected["probability"], atol=1e-9)
+    assert (result["label"] == expected["label"]).all()
+    np.testing.assert_allclose(kernel.predict_proba(X_raw[:5])[:, 1], model.predict_proba(scaler.transform(X_raw[:5]))[:, 1],
+                               atol=1e-9)
+
+def test_blocks_and_single_rows_agree(small_artifact, tmp_path, monkeypatch):
+    from src import svm_kernel
+
+    kernel = load_kernel(export_kernel(small_artifact, str(tmp_path / "kernel.npz")))
+    X_raw = small_artifact["scaler"].inverse_transform(small_artifact["X_test"])
+    full = kernel.decision_function(X_raw)
+    monkeypatch.setattr(svm_kernel, "BLOCK_ROWS", 7)
+    np.testing.assert_allclose(kernel.decision_function(X_raw), full)
+    np.testing.assert_allclose(kernel.decision_function(X_raw[3]), full[3:4])
+
+def test_saved_svc_artifacts_are_exported(small_artifact, tmp_path):
+    from src.model_registry import save_artifact
+
+    save_artifact(small_artifact, str(tmp_path))
+    assert load_kernel(kernel_path(small_artifact["key"], str(tmp_path))).key == small_artifact["key"]
+
+def test_non_svc_models_are_rejected(small_artifact):
+    from sklearn.linear_model import LogisticRegression
+
+    artifact = dict(small_artifact, model=LogisticRegression())
+    with pytest.raises(ValueError):
+        export_kernel(artifact, "unused.npz")
+
+def test_non_rbf_svc_artifacts_save_without_export(small_csv, tmp_path):
+    import os
+
+    from src.model_registry import artifact_path, load_artifact, load_or_train
+
+    artifact = load_or_train(small_csv, params={"kernel": "linear"}, model_dir=str(tmp_path))
+    assert os.path.exists(artifact_path(artifact["key"], str(tmp_path)))
+    assert not os.path.exists(kernel_path(artifact["key"], str(tmp_path)))
+    assert load_artifact(artifact_path(artifact["key"], str(tmp_path)))["model"].kernel == "linear"
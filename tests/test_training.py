@@ -0,0 +1,35 @@
+import json
+
+from src.model_registry import selected_params
+from src.training import expand_grid, export_best, search
+
+GRID = {"kernel": ["rbf"], "C": [0.5, 2.0], "gamma": ["scale"], "smote_k_neighbors": [3, 5]}
+
+def test_expand_grid():
+    combos = expand_grid(GRID)
+    assert len(combos) == 4
+    assert {"kernel": "rbf", "C": 2.0, "gamma": "scale", "smote_k_neighbors": 3} in combos
+
+def test_search_reuses_cached_folds(small_csv, tmp_path):
+    first = search(small_csv, GRID, n_splits=3, model_dir=str(tmp_path))
+    assert first["computed"] == first["tasks"] == 12
+    assert len(json.loads((tmp_path / "cv_cache.json").read_text())) == 12
+
+    again = search(small_csv, GRID, n_splits=3, model_dir=str(tmp_path))
+    assert again["computed"] == 0
+    assert again["results"] == first["results"]
+
+    wider = search(small_csv, dict(GRID, C=[0.5, 2.0, 8.0]), n_splits=3, model_dir=str(tmp_path))
+    assert wider["computed"] == 6
+
+def test_parallel_matches_serial(small_csv):
+    serial = search(small_csv, GRID, n_splits=3, workers=1, use_cache=False)
+    parallel = search(small_csv, GRID, n_splits=3, workers=2, use_cache=False)
+    assert parallel["results"] == serial["results"]
+    assert 0.5 < serial["results"][0]["mean_auc"] <= 1.0
+
+def test_export_best_selects_params(small_csv, tmp_path):
+    result = search(small_csv, GRID, n_splits=3, model_dir=str(tmp_path))
+    artifact = export_best(result, small_csv, str(tmp_path))
+    assert artifact["params"] == result["best_params"]
+    assert selected_params(str(tmp_path)) == result["best_params"]
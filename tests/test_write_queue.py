@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from src.db import PatientStore, create_db
+from src.write_queue import WriteBehindQueue
+
+def _record(i):
+    return {"name": f"Patient {i}", "disease_prob": 0.4, "risk_label": "Low Risk", "age": 50, "gender": 1,
+            "albumin": 3.9, "model_key": "test"}
+
+class SlowStore(PatientStore):
+    """Every transaction takes at least `delay` seconds (a slow disk)."""
+
+    def __init__(self, *args, delay=0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.batches = []
+
+    def insert_many(self, records):
+        time.sleep(self.delay)
+        records = list(records)
+        self.batches.append(len(records))
+        return super().insert_many(records)
+
+class GatedStore(SlowStore):
+    """Transactions block until `release` is set; `started` is set once the first one begins."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, delay=0.0, **kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def insert_many(self, records):
+        self.started.set()
+        assert self.release.wait(10)
+        return super().insert_many(records)
+
+@pytest.fixture
+def db_path(tmp_path):
+    return create_db(str(tmp_path / "app.db"))
+
+def test_records_are_batched_and_flushed_on_close(db_path):
+    store = SlowStore(db_path, delay=0.0)
+    with WriteBehindQueue(store, batch_size=50, flush_interval=10.0) as writer:
+        for i in range(100):
+            writer.submit(_record(i))
+        writer.flush()
+        assert store.batches == [50, 50]
+        for i in range(20):
+            writer.submit(_record(100 + i))  # waits for the interval; close() writes it right away
+    assert store.count_patients() == 120
+    assert sum(store.batches) == 120 and writer.written == 120
+
+def test_partial_batch_is_written_after_interval(db_path):
+    store = SlowStore(db_path, delay=0.0)
+    writer = WriteBehindQueue(store, batch_size=100, flush_interval=0.05)
+    writer.submit(_record(1))
+    deadline = time.monotonic() + 5
+    while store.count_patients() == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.count_patients() == 1
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit(_record(2))
+
+def test_backpressure_when_full(db_path):
+    store = GatedStore(db_path)
+    writer = WriteBehindQueue(store, batch_size=1, flush_interval=0.0, max_pending=2)
+    writer.submit(_record(0))
+    assert store.started.wait(5)  # worker is now inside the (blocked) write
+    writer.submit(_record(1))
+    writer.submit(_record(2))
+    with pytest.raises(queue.Full):
+        writer.submit(_record(3), timeout=0.05)
+    store.release.set()
+    writer.close()
+    assert store.count_patients() == 3
+
+def test_sessions_do_not_wait_for_the_write(db_path):
+    # while the worker's transaction is blocked, every session's submit() still returns
+    store = GatedStore(db_path)
+    writer = WriteBehindQueue(store, batch_size=100, flush_interval=0.05)
+
+    def session(offset):
+        for i in range(100):
+            writer.submit(_record(offset + i))
+
+    threads = [threading.Thread(target=session, args=(n * 1000,)) for n in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert not any(t.is_alive() for t in threads)
+    assert store.started.is_set() and store.count_patients() == 0
+
+    store.release.set()
+    writer.close()  # flushes everything still queued
+    assert store.count_patients() == 1600 and writer.written == 1600
+    assert len(store.batches) < 1600 / 10
+
+def test_close_does_not_lose_a_concurrent_submit(db_path):
+    store = SlowStore(db_path, delay=0.0)
+    writer = WriteBehindQueue(store, batch_size=100, flush_interval=0.0)
+    in_put, resume = threading.Event(), threading.Event()
+    put = writer._queue.put
+
+    def paused_put(item, *args, **kwargs):
+        if isinstance(item, dict):  # a record: pause between submit()'s closed check and the put
+            in_put.set()
+            resume.wait(5)
+        put(item, *args, **kwargs)
+
+    writer._queue.put = paused_put
+    submitter = threading.Thread(target=writer.submit, args=(_record(0),))
+    submitter.start()
+    assert in_put.wait(5)
+    closer = threading.Thread(target=writer.close)
+    closer.start()
+    time.sleep(0.05)  # close() must wait for the submit instead of queueing its stop marker first
+    resume.set()
+    submitter.join(5)
+    closer.join(5)
+    assert store.count_patients() == 1 and writer.written == 1
+    writer.flush()  # returns: nothing is left unprocessed